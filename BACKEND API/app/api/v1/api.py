@@ -1,9 +1,21 @@
 from fastapi import APIRouter
 from app.api.v1.routes import (
     evento_routes,
-    evaluacion_routes  
+    evaluacion_routes,
+    admin_routes,
+    estadistica_routes,
+    instalacion_routes,
+    trabajo_routes,
+    busqueda_routes,
+    exportacion_routes
 )
 api_router_v1 = APIRouter()
 
 api_router_v1.include_router(evento_routes.router, prefix="/eventos", tags=["Eventos"])
-api_router_v1.include_router(evaluacion_routes.router, prefix="/evaluaciones", tags=["Evaluaciones"])
\ No newline at end of file
+api_router_v1.include_router(evaluacion_routes.router, prefix="/evaluaciones", tags=["Evaluaciones"])
+api_router_v1.include_router(instalacion_routes.router, prefix="/instalaciones", tags=["Instalaciones"])
+api_router_v1.include_router(estadistica_routes.router, prefix="/estadisticas", tags=["Estadísticas"])
+api_router_v1.include_router(trabajo_routes.router, prefix="/trabajos", tags=["Trabajos"])
+api_router_v1.include_router(busqueda_routes.router, prefix="/buscar", tags=["Búsqueda"])
+api_router_v1.include_router(exportacion_routes.router, prefix="/export", tags=["Exportación"])
+api_router_v1.include_router(admin_routes.router, prefix="/admin", tags=["Administración"])
\ No newline at end of file
@@ -0,0 +1,58 @@
+from fastapi import APIRouter, status
+
+from app.services.usuario_service import invalidar_usuario
+from app.core.cache import cache_lecturas
+from app.crud.indice_crud import reporte_indices
+from app.crud.estadistica_crud import cache_estadisticas
+from app.services.instalacion_service import catalogo_instalaciones
+from app.core.instrumentacion import RutaInstrumentada, resumen_latencias
+
+router = APIRouter(route_class=RutaInstrumentada)
+
+
+# ✅ Estadísticas de las cachés
+@router.get(
+    "/cache",
+    summary="Estado de las cachés",
+    description="Devuelve aciertos, fallos y tasa de aciertos de la caché de lecturas por prefijo de clave "
+                "(evento, evaluacion, usuario), de la caché de /estadisticas y del catálogo de instalaciones en memoria. "
+                "Los conteos son de este proceso."
+)
+async def estado_cache():
+    return {
+        "lecturas": cache_lecturas.estadisticas(),
+        "estadisticas": cache_estadisticas.estadisticas(),
+        "instalaciones": catalogo_instalaciones.estadisticas(),
+    }
+
+
+# ✅ Invalidar la caché de roles (toda o un usuario)
+@router.delete(
+    "/cache/usuarios",
+    status_code=status.HTTP_200_OK,
+    summary="Invalidar la caché de roles",
+    description="Invalida un usuario concreto con ?usuarioId= o toda la caché si no se indica."
+)
+async def invalidar_cache_usuarios(usuarioId: int | None = None):
+    await invalidar_usuario(usuarioId)
+    return {"mensaje": "Caché de roles invalidada"}
+
+
+# ✅ Uso de los índices declarados en los modelos
+@router.get(
+    "/indexes",
+    summary="Uso de índices por colección",
+    description="Devuelve, para cada colección, sus índices y cuántas operaciones los usaron desde el arranque del servidor ($indexStats)."
+)
+async def uso_indices():
+    return await reporte_indices()
+
+
+# ✅ Percentiles de latencia por ruta (los mismos histogramas que publica /metrics)
+@router.get(
+    "/latencias",
+    summary="Latencia por ruta",
+    description="p50/p95/p99 por método, plantilla de ruta y código de estado, con el promedio de cada fase (mongo, validacion, serializacion, app)."
+)
+async def latencias():
+    return resumen_latencias()
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Query
+from typing import List, Literal, Optional
+
+from app.core.instrumentacion import RutaInstrumentada
+from app.core.respuestas import RespuestaJSON
+from app.crud.busqueda_crud import COLECCIONES_BUSQUEDA, buscar
+
+router = APIRouter(route_class=RutaInstrumentada)
+
+ColeccionBusqueda = Literal["evento", "organizacion"]
+
+
+# ✅ Buscar eventos y organizaciones (el cursor de la siguiente página va en X-Cursor-Siguiente)
+@router.get(
+    "/",
+    summary="Buscar eventos y organizaciones",
+    description="Busca en el nombre y las organizaciones participantes de los eventos, y en el nombre y el sector "
+                "económico de las organizaciones. Cada palabra de q puede estar incompleta (autocompletado); no se "
+                "distinguen mayúsculas ni tildes. Los resultados se ordenan por relevancia (campo puntaje). Si hay más "
+                "coincidencias de las que se ordenan (BUSQUEDA_MAX_CANDIDATOS por colección), la respuesta lleva "
+                "X-Resultados-Truncados: true; conviene escribir más palabras."
+)
+async def busqueda(
+    q: str = Query(..., min_length=1, max_length=200, description="Palabras a buscar"),
+    coleccion: Optional[List[ColeccionBusqueda]] = Query(None, description="Colecciones en las que buscar (por defecto ambas)"),
+    limit: int = Query(20, ge=1, le=100, description="Cantidad máxima de resultados por página"),
+    after: Optional[str] = Query(None, description="Valor de X-Cursor-Siguiente de la página anterior"),
+):
+    resultados, siguiente, truncados = await buscar(q, coleccion or list(COLECCIONES_BUSQUEDA), limit, after)
+    headers = {"X-Cursor-Siguiente": siguiente} if siguiente else {}
+    if truncados:
+        headers["X-Resultados-Truncados"] = "true"
+    return RespuestaJSON(resultados, headers=headers or None)
@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Query
+from typing import Optional
+from datetime import date
+
+from app.core.instrumentacion import RutaInstrumentada
+from app.core.respuestas import RespuestaJSON
+from app.crud.estadistica_crud import (
+    eventos_por_estado_tipo_mes,
+    ocupacion_instalaciones,
+    evaluaciones_por_evaluador,
+    organizadores_por_facultad
+)
+
+router = APIRouter(route_class=RutaInstrumentada)
+
+
+# ✅ Eventos por estado, tipo y mes
+@router.get(
+    "/eventos",
+    summary="Eventos por estado, tipo y mes",
+    description="Conteos agregados en MongoDB sobre la fecha de realización. Se cachean unos segundos."
+)
+async def estadisticas_eventos(
+    desde: Optional[date] = Query(None, description="Fecha mínima de realización"),
+    hasta: Optional[date] = Query(None, description="Fecha máxima de realización"),
+):
+    return RespuestaJSON(await eventos_por_estado_tipo_mes(desde, hasta))
+
+
+# ✅ Ocupación de instalaciones por día
+@router.get(
+    "/ocupacion",
+    summary="Tasa de ocupación de instalaciones por día",
+    description="Minutos reservados dentro de la jornada configurada dividido por la duración de la jornada."
+)
+async def estadisticas_ocupacion(
+    desde: Optional[date] = Query(None, description="Primer día"),
+    hasta: Optional[date] = Query(None, description="Último día"),
+    instalacionId: Optional[str] = Query(None, description="Limitar a una instalación"),
+):
+    return RespuestaJSON(await ocupacion_instalaciones(desde, hasta, instalacionId))
+
+
+# ✅ Aprobaciones y rechazos por evaluador
+@router.get(
+    "/evaluadores",
+    summary="Aprobaciones y rechazos por evaluador",
+    description="Total de evaluaciones, aprobadas, rechazadas y tasa de aprobación de cada evaluador."
+)
+async def estadisticas_evaluadores(
+    desde: Optional[date] = Query(None, description="Fecha mínima de evaluación"),
+    hasta: Optional[date] = Query(None, description="Fecha máxima de evaluación"),
+):
+    return RespuestaJSON(await evaluaciones_por_evaluador(desde, hasta))
+
+
+# ✅ Organizadores por facultad
+@router.get(
+    "/facultades",
+    summary="Organizadores por facultad",
+    description="Organizadores distintos y eventos organizados por facultad, según la vinculación activa de cada usuario."
+)
+async def estadisticas_facultades():
+    return RespuestaJSON(await organizadores_por_facultad())
@@ -1,45 +1,92 @@
-from fastapi import APIRouter, status
-from typing import List
+from fastapi import APIRouter, Query, Request, Response, status
+from typing import List, Optional
 
 from app.schemas.evaluacion_schema import (
     EvaluacionCrear,
     EvaluacionActualizar,
+    EvaluacionLote,
+    EvaluacionModificada,
     Evaluacion
 )
 from app.crud.evaluacion_crud import (
-    crear_evaluacion,
     listar_evaluaciones,
-    obtener_evaluacion,
+    obtener_evaluacion_json,
+    obtener_validadores_evaluacion,
     actualizar_evaluacion,
-    eliminar_evaluacion
+    parchear_evaluacion,
+    subir_acta_evaluacion,
+    obtener_acta_evaluacion
 )
+from app.crud.adjunto_crud import descargar_adjunto
+from app.services.evaluacion_service import eliminar_evaluacion, evaluar_evento, evaluar_eventos
+from app.models.evaluaciones import EstadoEvaluacionEnum
+from app.core.respuestas import RespuestaJSON
+from app.core.condicional import (
+    encabezados_documento,
+    es_condicional,
+    no_modificado,
+    respuesta_no_modificado,
+    version_esperada
+)
+from app.core.instrumentacion import RutaInstrumentada
 
 router = APIRouter(
     prefix="/evaluaciones",
-    tags=["Evaluaciones"]
+    tags=["Evaluaciones"],
+    route_class=RutaInstrumentada
 )
 
+# 🔹 Cuerpo binario del PDF para la documentación OpenAPI
+CUERPO_PDF = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/pdf": {"schema": {"type": "string", "format": "binary"}}},
+    }
+}
+
 # ✅ Crear evaluación
 @router.post(
     "/",
     response_model=Evaluacion,
     status_code=status.HTTP_201_CREATED,
     summary="Crear una nueva evaluación",
-    description="Crea una evaluación asociada a un evento y un usuario evaluador."
+    description="Crea una evaluación asociada a un evento y un usuario evaluador. En la misma transacción el "
+                "evento pasa a 'aprovado' (evaluación aprobada) o a 'enRevision' (rechazada); un evento ya "
+                "aprobado no admite más evaluaciones (409)."
 )
 async def crear_evaluacion_endpoint(data: EvaluacionCrear):
-    return await crear_evaluacion(data)
+    evaluacion = await evaluar_evento(data)
+    return RespuestaJSON(evaluacion, status_code=status.HTTP_201_CREATED, headers=encabezados_documento(evaluacion))
+
+
+# ✅ Evaluar varios eventos en una sola petición
+@router.post(
+    "/lote",
+    summary="Evaluar varios eventos",
+    description="Registra una decisión por evento para el mismo evaluador y fecha. Cada evento se evalúa en "
+                "su propia transacción: el resultado de cada uno (evaluado o error) va en 'resultados'."
+)
+async def evaluar_lote_endpoint(lote: EvaluacionLote):
+    return RespuestaJSON(await evaluar_eventos(lote))
 
 
-# ✅ Listar todas las evaluaciones
+# ✅ Listar evaluaciones (filtradas y paginadas)
 @router.get(
     "/",
     response_model=List[Evaluacion],
-    summary="Listar todas las evaluaciones",
-    description="Devuelve todas las evaluaciones registradas en el sistema."
+    summary="Listar evaluaciones",
+    description="Devuelve las evaluaciones paginadas por cursor, filtradas por evento, evaluador o estado. "
+                "El cursor de la siguiente página va en el encabezado X-Cursor-Siguiente."
 )
-async def listar_evaluaciones_endpoint():
-    return await listar_evaluaciones()
+async def listar_evaluaciones_endpoint(
+    limit: int = Query(50, ge=1, le=500, description="Cantidad máxima de evaluaciones por página"),
+    after: Optional[str] = Query(None, description="ID de la última evaluación de la página anterior"),
+    eventoId: Optional[str] = Query(None, description="Solo las evaluaciones de este evento"),
+    usuarioId: Optional[int] = Query(None, description="Solo las evaluaciones de este evaluador"),
+    estado: Optional[EstadoEvaluacionEnum] = None,
+):
+    evaluaciones, siguiente = await listar_evaluaciones(limit, after, eventoId, usuarioId, estado)
+    return RespuestaJSON(evaluaciones, headers={"X-Cursor-Siguiente": siguiente} if siguiente else None)
 
 
 # ✅ Obtener evaluación por ID
@@ -47,10 +94,17 @@ async def listar_evaluaciones_endpoint():
     "/{id}",
     response_model=Evaluacion,
     summary="Obtener una evaluación por ID",
-    description="Devuelve los detalles de una evaluación específica según su ID."
+    description="Devuelve los detalles de una evaluación específica según su ID. Incluye ETag y Last-Modified; "
+                "con If-None-Match o If-Modified-Since responde 304 si no ha cambiado."
 )
-async def obtener_evaluacion_endpoint(id: str):
-    return await obtener_evaluacion(id)
+async def obtener_evaluacion_endpoint(id: str, request: Request):
+    if es_condicional(request):
+        version, modificado = await obtener_validadores_evaluacion(id)
+        if no_modificado(request, version, modificado):
+            return respuesta_no_modificado(version, modificado)
+
+    evaluacion = await obtener_evaluacion_json(id)
+    return RespuestaJSON(evaluacion, headers=encabezados_documento(evaluacion))
 
 
 # ✅ Actualizar evaluación
@@ -58,10 +112,29 @@ async def obtener_evaluacion_endpoint(id: str):
     "/{id}",
     response_model=Evaluacion,
     summary="Actualizar una evaluación",
-    description="Permite modificar los campos de una evaluación existente."
+    description="Permite modificar la fecha, la justificación y el acta de una evaluación existente (estado, "
+                "eventoId y usuarioId solo cambian registrando una nueva evaluación). Con If-Match solo se aplica "
+                "si la evaluación no cambió desde que se leyó (412 en caso contrario)."
 )
-async def actualizar_evaluacion_endpoint(id: str, data: EvaluacionActualizar):
-    return await actualizar_evaluacion(id, data)
+async def actualizar_evaluacion_endpoint(id: str, data: EvaluacionActualizar, request: Request):
+    evaluacion = await actualizar_evaluacion(id, data, version_esperada(request))
+    return RespuestaJSON(evaluacion, headers=encabezados_documento(evaluacion))
+
+
+# ✅ Modificar solo algunos campos (una sola escritura; la respuesta trae solo lo modificado)
+@router.patch(
+    "/{id}",
+    response_model=EvaluacionModificada,
+    response_model_exclude_unset=True,
+    summary="Modificar campos de una evaluación",
+    description="Aplica los campos enviados con una sola operación en MongoDB, sin leer antes la evaluación, y "
+                "devuelve solo esos campos con version y actualizadoEn. Como en PUT, estado, eventoId y usuarioId "
+                "no se pueden modificar. Con If-Match solo se aplica si la evaluación no cambió desde que se leyó "
+                "(412 en caso contrario)."
+)
+async def parchear_evaluacion_endpoint(id: str, data: EvaluacionActualizar, request: Request):
+    evaluacion = await parchear_evaluacion(id, data, version_esperada(request))
+    return RespuestaJSON(evaluacion, headers=encabezados_documento(evaluacion))
 
 
 # ✅ Eliminar evaluación
@@ -69,7 +142,31 @@ async def actualizar_evaluacion_endpoint(id: str, data: EvaluacionActualizar):
     "/{id}",
     status_code=status.HTTP_200_OK,
     summary="Eliminar una evaluación",
-    description="Elimina una evaluación existente del sistema."
+    description="Elimina una evaluación existente del sistema. El evento vuelve al estado que decidió su "
+                "evaluación más reciente restante (registrado si no le queda ninguna)."
 )
 async def eliminar_evaluacion_endpoint(id: str):
     return await eliminar_evaluacion(id)
+
+
+# ✅ Subir el acta de aprobación
+@router.put(
+    "/{id}/acta",
+    summary="Subir el acta de aprobación",
+    description="Recibe el PDF como cuerpo binario y lo guarda por fragmentos en GridFS, reemplazando el anterior.",
+    openapi_extra=CUERPO_PDF
+)
+async def subir_acta_endpoint(id: str, request: Request):
+    return await subir_acta_evaluacion(id, request.stream(), request.headers.get("content-type"))
+
+
+# ✅ Descargar el acta de aprobación
+@router.get(
+    "/{id}/acta",
+    response_class=Response,
+    summary="Descargar el acta de aprobación",
+    description="Transmite el PDF por fragmentos. Admite el encabezado Range para descargas parciales."
+)
+async def descargar_acta_endpoint(id: str, request: Request):
+    archivo_id = await obtener_acta_evaluacion(id)
+    return await descargar_adjunto(archivo_id, request.headers.get("range"))
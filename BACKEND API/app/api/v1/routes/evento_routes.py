@@ -1,43 +1,305 @@
-from fastapi import APIRouter, status
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, Request, Response, WebSocket, status
+from fastapi.responses import StreamingResponse
+from typing import List, Literal, Optional
+from contextlib import aclosing
+from datetime import date, datetime
+import asyncio
+import orjson
 
 from app.crud.evento_crud import (
     crear_evento,
     listar_eventos,
-    obtener_evento,
+    obtener_evento_json,
+    obtener_evento_expandido,
+    obtener_validadores_evento,
     actualizar_evento,
-    eliminar_evento
+    parchear_evento,
+    eliminar_evento,
+    subir_aval_organizador,
+    obtener_aval_organizador,
+    subir_certificado_organizacion,
+    obtener_certificado_organizacion
 )
-from app.schemas.evento_schema import EventoCreate, EventoUpdate, EventoResponse
+from app.crud.adjunto_crud import descargar_adjunto
+from app.crud.importacion_crud import importar_eventos
+from app.crud.evaluacion_crud import listar_evaluaciones_evento
+from app.core.respuestas import RespuestaJSON, a_json
+from app.core.condicional import (
+    encabezados_documento,
+    es_condicional,
+    no_modificado,
+    respuesta_no_modificado,
+    version_esperada
+)
+from app.core.instrumentacion import RutaInstrumentada
+from app.models.eventos import EstadoEventoEnum, TipoEventoEnum
+from app.schemas.evento_schema import EventoCreate, EventoUpdate, EventoResponse, EventoResumen
+from app.schemas.evaluacion_schema import EvaluacionesEvento
+from app.services.cambios_service import DESBORDE, FiltroCambios, difusor_cambios
+
+router = APIRouter(prefix="/eventos", tags=["Eventos"], route_class=RutaInstrumentada)
+
+# 🔹 Cuerpo binario del PDF para la documentación OpenAPI
+CUERPO_PDF = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/pdf": {"schema": {"type": "string", "format": "binary"}}},
+    }
+}
+
+
+# 🔹 Parámetro expand compartido por las lecturas de eventos
+DESCRIPCION_EXPAND = "Relaciones a incluir separadas por coma (evaluaciones)."
+
+
+def separar_valores(valor: Optional[str]) -> Optional[List[str]]:
+    return [v.strip() for v in valor.split(",") if v.strip()] if valor else None
+
+
+# 🔹 Con PDFs en línea la respuesta es 202: el trabajo que los valida y asocia se consulta en Location
+RESPUESTA_TRABAJO = {
+    status.HTTP_202_ACCEPTED: {
+        "model": EventoResponse,
+        "description": "Evento guardado; sus PDFs se procesan en segundo plano (X-Trabajo-Id, Location: /api/v1/trabajos/{id}).",
+    }
+}
+
+
+def respuesta_evento(evento, trabajo, codigo: int) -> RespuestaJSON:
+    headers = encabezados_documento(evento)
+    if trabajo is None:
+        return RespuestaJSON(evento, status_code=codigo, headers=headers)
 
-router = APIRouter(prefix="/eventos", tags=["Eventos"])
+    headers.update({"X-Trabajo-Id": str(trabajo.id), "Location": f"/api/v1/trabajos/{trabajo.id}"})
+    return RespuestaJSON(evento, status_code=status.HTTP_202_ACCEPTED, headers=headers)
 
 
 # ✅ Crear evento
-@router.post("/", response_model=EventoResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/", response_model=EventoResponse, status_code=status.HTTP_201_CREATED, responses=RESPUESTA_TRABAJO)
 async def crear(data: EventoCreate):
-    return await crear_evento(data)
+    evento, trabajo = await crear_evento(data)
+    return respuesta_evento(evento, trabajo, status.HTTP_201_CREATED)
+
+
+# ✅ Importación masiva (arreglo JSON o NDJSON, un evento por línea)
+@router.post(
+    "/bulk",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"type": "array", "items": {"type": "object"}}},
+                "application/x-ndjson": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def importar(
+    request: Request,
+    ordenado: bool = Query(False, description="Detenerse en el primer evento con errores (insert_many ordered)"),
+):
+    cuerpo = await request.body()
+    tipo_contenido = request.headers.get("content-type", "")
+    try:
+        if "ndjson" in tipo_contenido or "jsonl" in tipo_contenido:
+            datos = [orjson.loads(linea) for linea in cuerpo.splitlines() if linea.strip()]
+        else:
+            datos = orjson.loads(cuerpo)
+    except orjson.JSONDecodeError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"JSON inválido: {e}")
+
+    if not isinstance(datos, list):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Se esperaba un arreglo de eventos.")
+    return RespuestaJSON(await importar_eventos(datos, ordenado))
+
+
+# ✅ Listar eventos paginados (el cursor de la siguiente página va en X-Cursor-Siguiente)
+@router.get("/", response_model=List[EventoResumen], response_model_exclude_unset=True)
+async def listar(
+    limit: int = Query(50, ge=1, le=500, description="Cantidad máxima de eventos por página"),
+    after: Optional[str] = Query(None, description="ID del último evento de la página anterior"),
+    estado: Optional[EstadoEventoEnum] = None,
+    tipo: Optional[TipoEventoEnum] = None,
+    desde: Optional[date] = Query(None, description="Fecha mínima de realización"),
+    hasta: Optional[date] = Query(None, description="Fecha máxima de realización"),
+    inicioDesde: Optional[datetime] = Query(None, description="Eventos que empiezan en este instante o después (ISO 8601; sin zona, UTC)"),
+    inicioHasta: Optional[datetime] = Query(None, description="Eventos que empiezan antes de este instante (ISO 8601; sin zona, UTC)"),
+    fields: Optional[str] = Query(
+        None,
+        description="Campos a devolver separados por coma (nombre, estado, tipo, realizacion, "
+                    "organizador, organizacion, capacidad).",
+    ),
+    expand: Optional[str] = Query(None, description=DESCRIPCION_EXPAND),
+):
+    eventos, siguiente = await listar_eventos(
+        limit, after, estado, tipo, desde, hasta, separar_valores(fields), separar_valores(expand),
+        inicioDesde, inicioHasta
+    )
+    # Documentos crudos de Motor: se serializan con orjson sin pasar por response_model
+    return RespuestaJSON(eventos, headers={"X-Cursor-Siguiente": siguiente} if siguiente else None)
+
+
+# 🔹 Flujo de cambios: filtro común a SSE y WebSocket
+ColeccionFlujo = Literal["evento", "evaluacion"]
+
+
+def filtro_flujo(
+    coleccion: Optional[List[ColeccionFlujo]],
+    estado: Optional[List[EstadoEventoEnum]],
+    tipo: Optional[List[TipoEventoEnum]],
+) -> FiltroCambios:
+    return FiltroCambios(
+        colecciones=set(coleccion or ["evento", "evaluacion"]),
+        estados={e.value for e in estado or []},
+        tipos={t.value for t in tipo or []},
+    )
+
 
+def mensaje_sse(cambio: Optional[dict]) -> bytes:
+    if cambio is None:
+        return b": latido\n\n"
+    if "control" in cambio:
+        return f"event: {cambio['control']}\ndata: {{}}\n\n".encode()
+    return (
+        b"id: " + cambio["id"].encode()
+        + b"\nevent: " + cambio["coleccion"].encode()
+        + b"\ndata: " + a_json(cambio) + b"\n\n"
+    )
 
-# ✅ Listar todos los eventos
-@router.get("/", response_model=List[EventoResponse])
-async def listar():
-    return await listar_eventos()
 
+# ✅ Cambios de eventos y evaluaciones en vivo por Server-Sent Events (reemplaza el sondeo de GET /eventos)
+@router.get("/stream", response_class=StreamingResponse)
+async def flujo_sse(
+    request: Request,
+    coleccion: Optional[List[ColeccionFlujo]] = Query(None, description="Colecciones a seguir (por defecto ambas)"),
+    estado: Optional[List[EstadoEventoEnum]] = Query(None, description="Solo eventos en estos estados"),
+    tipo: Optional[List[TipoEventoEnum]] = Query(None, description="Solo eventos de estos tipos"),
+    desde: Optional[str] = Query(None, description="ID del último cambio recibido (o el encabezado Last-Event-ID)"),
+):
+    filtro = filtro_flujo(coleccion, estado, tipo)
+    desde = request.headers.get("last-event-id") or desde or difusor_cambios.ultimo_id()
 
-# ✅ Obtener evento por ID
-@router.get("/{id}", response_model=EventoResponse)
-async def obtener(id: str):
-    return await obtener_evento(id)
+    async def mensajes():
+        # Con "reinicio" el cliente recarga el listado; con "desborde" reconecta con su último ID
+        yield b"retry: 3000\n\n"
+        async with aclosing(difusor_cambios.suscribir(filtro, desde)) as cambios:
+            async for cambio in cambios:
+                yield mensaje_sse(cambio)
 
+    return StreamingResponse(
+        mensajes(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
-# ✅ Actualizar evento
-@router.put("/{id}", response_model=EventoResponse)
-async def actualizar(id: str, data: EventoUpdate):
-    return await actualizar_evento(id, data)
+
+async def esperar_cierre(websocket: WebSocket):
+    # Los mensajes del cliente no se usan: solo se espera a que cierre
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+
+
+# ✅ El mismo flujo por WebSocket (un mensaje JSON por cambio)
+@router.websocket("/stream")
+async def flujo_websocket(
+    websocket: WebSocket,
+    coleccion: Optional[List[ColeccionFlujo]] = Query(None),
+    estado: Optional[List[EstadoEventoEnum]] = Query(None),
+    tipo: Optional[List[TipoEventoEnum]] = Query(None),
+    desde: Optional[str] = Query(None),
+):
+    desde = desde or difusor_cambios.ultimo_id()
+    await websocket.accept()
+    cierre = asyncio.create_task(esperar_cierre(websocket))
+    try:
+        async with aclosing(difusor_cambios.suscribir(filtro_flujo(coleccion, estado, tipo), desde)) as cambios:
+            async for cambio in cambios:
+                if cierre.done():
+                    return
+                if cambio is None:
+                    continue
+                await websocket.send_text(a_json(cambio).decode())
+                if cambio is DESBORDE:
+                    # 1013: reintentar más tarde (con ?desde= el último ID recibido)
+                    await websocket.close(code=1013)
+                    return
+    finally:
+        cierre.cancel()
+
+
+# ✅ Obtener evento por ID (ETag / Last-Modified; If-None-Match responde 304 sin leer el documento completo)
+@router.get("/{id}", response_model=EventoResponse, response_model_exclude_unset=True)
+async def obtener(id: str, request: Request, expand: Optional[str] = Query(None, description=DESCRIPCION_EXPAND)):
+    expandir = separar_valores(expand)
+    if expandir:
+        # Las evaluaciones cambian sin cambiar la versión del evento: sin validadores
+        return RespuestaJSON(await obtener_evento_expandido(id, expandir))
+
+    if es_condicional(request):
+        version, modificado = await obtener_validadores_evento(id)
+        if no_modificado(request, version, modificado):
+            return respuesta_no_modificado(version, modificado)
+
+    evento = await obtener_evento_json(id)
+    return RespuestaJSON(evento, headers=encabezados_documento(evento))
+
+
+# ✅ Evaluaciones de un evento, de la más reciente a la más antigua, con su resumen
+@router.get("/{id}/evaluaciones", response_model=EvaluacionesEvento)
+async def evaluaciones_evento(id: str):
+    return RespuestaJSON(await listar_evaluaciones_evento(id))
+
+
+# ✅ Actualizar evento (If-Match con el ETag leído: 412 si otra petición lo modificó antes)
+@router.put("/{id}", response_model=EventoResponse, responses=RESPUESTA_TRABAJO)
+async def actualizar(id: str, data: EventoUpdate, request: Request):
+    evento, trabajo = await actualizar_evento(id, data, version_esperada(request))
+    return respuesta_evento(evento, trabajo, status.HTTP_200_OK)
+
+
+# ✅ Modificar solo algunos campos (una sola escritura; la respuesta trae solo lo modificado)
+@router.patch(
+    "/{id}",
+    response_model=EventoResumen,
+    response_model_exclude_unset=True,
+    responses=RESPUESTA_TRABAJO,
+    summary="Modificar campos de un evento",
+    description="Solo se validan los campos enviados (con los datos guardados que hagan falta, p. ej. la "
+                "realización al cambiar la capacidad). Devuelve los campos modificados, estado, tipo y los "
+                "validadores (ETag). Con If-Match solo se aplica si el evento no cambió (412)."
+)
+async def parchear(id: str, data: EventoUpdate, request: Request):
+    evento, trabajo = await parchear_evento(id, data, version_esperada(request))
+    return respuesta_evento(evento, trabajo, status.HTTP_200_OK)
 
 
 # ✅ Eliminar evento
 @router.delete("/{id}", status_code=status.HTTP_200_OK)
 async def eliminar(id: str):
     return await eliminar_evento(id)
+
+
+# ✅ Subir el aval en PDF de un organizador (cuerpo binario, se guarda por fragmentos en GridFS)
+@router.put("/{id}/organizadores/{usuarioId}/aval", openapi_extra=CUERPO_PDF)
+async def subir_aval(id: str, usuarioId: int, request: Request):
+    return await subir_aval_organizador(id, usuarioId, request.stream(), request.headers.get("content-type"))
+
+
+# ✅ Descargar el aval de un organizador (admite Range)
+@router.get("/{id}/organizadores/{usuarioId}/aval", response_class=Response)
+async def descargar_aval(id: str, usuarioId: int, request: Request):
+    archivo_id = await obtener_aval_organizador(id, usuarioId)
+    return await descargar_adjunto(archivo_id, request.headers.get("range"))
+
+
+# ✅ Subir el certificado de participación de una organización
+@router.put("/{id}/organizaciones/{organizacionId}/certificado", openapi_extra=CUERPO_PDF)
+async def subir_certificado(id: str, organizacionId: str, request: Request):
+    return await subir_certificado_organizacion(id, organizacionId, request.stream(), request.headers.get("content-type"))
+
+
+# ✅ Descargar el certificado de participación de una organización (admite Range)
+@router.get("/{id}/organizaciones/{organizacionId}/certificado", response_class=Response)
+async def descargar_certificado(id: str, organizacionId: str, request: Request):
+    archivo_id = await obtener_certificado_organizacion(id, organizacionId)
+    return await descargar_adjunto(archivo_id, request.headers.get("range"))
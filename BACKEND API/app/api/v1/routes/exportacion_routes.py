@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+from typing import Literal
+
+from app.core.instrumentacion import RutaInstrumentada
+from app.crud.exportacion_crud import exportar
+
+router = APIRouter(route_class=RutaInstrumentada)
+
+ColeccionExportacion = Literal["eventos", "evaluaciones"]
+FormatoExportacion = Literal["ndjson", "csv", "parquet"]
+
+
+# ✅ Volcado completo de una colección (se transmite mientras se lee: memoria constante)
+@router.get(
+    "/{coleccion}",
+    response_class=StreamingResponse,
+    summary="Exportar eventos o evaluaciones",
+    description="Descarga todos los documentos ordenados por _id. Los subdocumentos se aplanan en columnas con el "
+                "nombre de su ruta (realizacion.fecha, organizador.usuarioId...); los valores de arreglos van como "
+                "listas en NDJSON y Parquet, y separados por | en CSV. "
+                "Parquet requiere el paquete pyarrow."
+)
+async def exportacion(
+    coleccion: ColeccionExportacion,
+    formato: FormatoExportacion = Query("ndjson", description="Formato del archivo"),
+):
+    return exportar(coleccion, formato)
@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Query
+from typing import Optional
+from datetime import date
+
+from app.core.instrumentacion import RutaInstrumentada
+from app.core.respuestas import RespuestaJSON
+from app.models.instalacion import TipoInstalacionEnum
+from app.crud.instalacion_crud import disponibilidad_instalacion, instalaciones_libres, listar_instalaciones
+
+router = APIRouter(route_class=RutaInstrumentada)
+
+
+# ✅ Listar instalaciones (catálogo en memoria, sin consultar MongoDB)
+@router.get(
+    "/",
+    summary="Listar instalaciones",
+    description="Se sirve del catálogo en memoria, que se recarga con cada cambio en la colección de instalaciones."
+)
+async def listar(
+    tipo: Optional[TipoInstalacionEnum] = None,
+    capacidadMinima: Optional[int] = Query(None, ge=1),
+):
+    return RespuestaJSON(await listar_instalaciones(tipo, capacidadMinima))
+
+
+# ✅ Buscar instalaciones libres en una fecha
+@router.get(
+    "/libres",
+    summary="Instalaciones libres en una fecha",
+    description="Con horaInicio y horaFin devuelve las instalaciones libres en ese horario; con duracion, "
+                "las que tienen algún hueco de al menos esa cantidad de minutos dentro de la jornada."
+)
+async def libres(
+    fecha: date,
+    horaInicio: Optional[str] = Query(None, description="HH:MM"),
+    horaFin: Optional[str] = Query(None, description="HH:MM"),
+    duracion: Optional[int] = Query(None, ge=5, le=1440, description="Minutos seguidos que se necesitan"),
+    tipo: Optional[TipoInstalacionEnum] = None,
+    capacidadMinima: Optional[int] = Query(None, ge=1),
+):
+    return RespuestaJSON(await instalaciones_libres(fecha, horaInicio, horaFin, duracion, tipo, capacidadMinima))
+
+
+# ✅ Calendario de ocupación de una instalación
+@router.get(
+    "/{id}/disponibilidad",
+    summary="Franjas libres y ocupadas de una instalación",
+    description="Se calcula con el mapa de ocupación diario (franjas de 5 minutos) que se mantiene al reservar."
+)
+async def disponibilidad(
+    id: str,
+    desde: date = Query(..., description="Primer día"),
+    hasta: Optional[date] = Query(None, description="Último día (por defecto, el mismo que desde)"),
+):
+    return RespuestaJSON(await disponibilidad_instalacion(id, desde, hasta))
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Query
+from typing import List, Optional
+
+from app.core.instrumentacion import RutaInstrumentada
+from app.core.respuestas import RespuestaJSON
+from app.models.trabajo import EstadoTrabajoEnum
+from app.schemas.trabajo_schema import TrabajoRespuesta
+from app.crud.trabajo_crud import obtener_trabajo, listar_trabajos
+
+router = APIRouter(route_class=RutaInstrumentada)
+
+
+# ✅ Listar trabajos en segundo plano (el cursor de la siguiente página va en X-Cursor-Siguiente)
+@router.get("/", response_model=List[TrabajoRespuesta])
+async def listar(
+    limit: int = Query(50, ge=1, le=500, description="Cantidad máxima de trabajos por página"),
+    after: Optional[str] = Query(None, description="ID del último trabajo de la página anterior"),
+    eventoId: Optional[str] = Query(None, description="Solo los trabajos de este evento"),
+    estado: Optional[EstadoTrabajoEnum] = None,
+    tipo: Optional[str] = Query(None, description="Tipo de trabajo (adjuntos_evento)"),
+):
+    trabajos, siguiente = await listar_trabajos(limit, after, eventoId, estado, tipo)
+    return RespuestaJSON(trabajos, headers={"X-Cursor-Siguiente": siguiente} if siguiente else None)
+
+
+# ✅ Estado de un trabajo (la URL que devuelve Location en las respuestas 202)
+@router.get(
+    "/{id}",
+    response_model=TrabajoRespuesta,
+    summary="Estado de un trabajo",
+    description="pendiente o enProceso mientras se procesa; completado con su resultado, o fallido con el último error."
+)
+async def obtener(id: str):
+    return RespuestaJSON(await obtener_trabajo(id))
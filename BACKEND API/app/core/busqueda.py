@@ -0,0 +1,43 @@
+import re
+import unicodedata
+from typing import Any, Iterator, List, Optional
+
+# 🔹 Campos de texto que se guardan como términos de búsqueda (rutas con punto, también dentro de arreglos)
+CAMPOS_BUSQUEDA = {
+    "evento": ["nombre", "organizacion.nombreParticipante"],
+    "organizacion": ["nombre", "sectorEconomico"],
+}
+
+
+# 🔹 Utilidad: texto sin tildes ni mayúsculas ("Ingeniería" -> "ingenieria")
+def normalizar_texto(texto: str) -> str:
+    descompuesto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in descompuesto if not unicodedata.combining(c)).casefold()
+
+
+def palabras(texto: Optional[str]) -> List[str]:
+    return re.findall(r"[^\W_]+", normalizar_texto(texto)) if texto else []
+
+
+def valores_ruta(valor: Any, partes: List[str]) -> Iterator[Any]:
+    if valor is None:
+        return
+    if isinstance(valor, list):
+        for elemento in valor:
+            yield from valores_ruta(elemento, partes)
+        return
+    if not partes:
+        yield valor
+        return
+    siguiente = valor.get(partes[0]) if isinstance(valor, dict) else getattr(valor, partes[0], None)
+    yield from valores_ruta(siguiente, partes[1:])
+
+
+# ✅ Términos de un documento (dict o modelo): palabras normalizadas y sin repetir de sus campos de texto
+def terminos_documento(coleccion: str, documento: Any) -> List[str]:
+    return sorted({
+        palabra
+        for ruta in CAMPOS_BUSQUEDA[coleccion]
+        for texto in valores_ruta(documento, ruta.split("."))
+        for palabra in palabras(texto)
+    })
@@ -0,0 +1,299 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metricas import registro
+
+
+class CacheTTL:
+    """Caché LRU en memoria con expiración por entrada y contadores de aciertos/fallos."""
+
+    def __init__(self, max_entradas: int = 1024, ttl: float = 300):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self.aciertos = 0
+        self.fallos = 0
+        self._entradas: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+
+    def obtener(self, clave: Hashable, defecto: Any = None) -> Any:
+        entrada = self._entradas.get(clave)
+        if entrada is None or entrada[0] < time.monotonic():
+            if entrada is not None:
+                del self._entradas[clave]
+            self.fallos += 1
+            return defecto
+
+        self._entradas.move_to_end(clave)
+        self.aciertos += 1
+        return entrada[1]
+
+    def guardar(self, clave: Hashable, valor: Any, ttl: Optional[float] = None):
+        self._entradas[clave] = (time.monotonic() + (self.ttl if ttl is None else ttl), valor)
+        self._entradas.move_to_end(clave)
+        while len(self._entradas) > self.max_entradas:
+            self._entradas.popitem(last=False)
+
+    def invalidar(self, clave: Hashable):
+        self._entradas.pop(clave, None)
+
+    def limpiar(self):
+        self._entradas.clear()
+
+    def estadisticas(self) -> dict:
+        consultas = self.aciertos + self.fallos
+        return {
+            "entradas": len(self._entradas),
+            "maxEntradas": self.max_entradas,
+            "ttlSegundos": self.ttl,
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasaAciertos": round(self.aciertos / consultas, 4) if consultas else None,
+        }
+
+
+logger = logging.getLogger(__name__)
+
+consultas_cache = registro.contador(
+    "cache_lecturas_total",
+    "Lecturas de la caché compartida por prefijo de clave y resultado (acierto, fallo, error)",
+    ("prefijo", "resultado"),
+)
+
+Id = Hashable
+
+
+# 🔹 Backend en memoria: una LRU por prefijo en el proceso (cada worker de uvicorn tiene la suya)
+class BackendMemoria:
+    nombre = "memoria"
+
+    def __init__(self, max_entradas: int, ttl: float):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._caches: Dict[str, CacheTTL] = {}
+
+    def configurar(self, prefijo: str, max_entradas: int, ttl: float):
+        self._caches[prefijo] = CacheTTL(max_entradas, ttl)
+
+    def cache(self, prefijo: str) -> CacheTTL:
+        if prefijo not in self._caches:
+            self.configurar(prefijo, self.max_entradas, self.ttl)
+        return self._caches[prefijo]
+
+    async def obtener_varios(self, prefijo: str, ids: List[Id]) -> List[Optional[bytes]]:
+        cache = self.cache(prefijo)
+        return [cache.obtener(i) for i in ids]
+
+    async def guardar_varios(self, prefijo: str, valores: Dict[Id, bytes]):
+        cache = self.cache(prefijo)
+        for i, valor in valores.items():
+            cache.guardar(i, valor)
+
+    async def invalidar(self, prefijo: str, ids: Iterable[Id]):
+        cache = self.cache(prefijo)
+        for i in ids:
+            cache.invalidar(i)
+
+    async def limpiar(self, prefijo: str):
+        self.cache(prefijo).limpiar()
+
+    def descripcion(self, prefijo: str) -> dict:
+        cache = self.cache(prefijo)
+        return {"entradas": len(cache._entradas), "maxEntradas": cache.max_entradas, "ttlSegundos": cache.ttl}
+
+
+# 🔹 Backend Redis: compartido por todos los workers (redis.asyncio o fakeredis, opcionales)
+class BackendRedis:
+    nombre = "redis"
+
+    def __init__(self, cliente, ttl: float, espacio: str):
+        self.cliente = cliente
+        self.ttl = ttl
+        self.espacio = espacio
+        self._ttls: Dict[str, float] = {}
+
+    @classmethod
+    def desde_configuracion(cls) -> "BackendRedis":
+        if settings.CACHE_BACKEND == "fakeredis":
+            try:
+                from fakeredis import aioredis as fakeredis
+            except ImportError:
+                raise RuntimeError("CACHE_BACKEND=fakeredis requiere el paquete fakeredis")
+            cliente = fakeredis.FakeRedis()
+        else:
+            try:
+                from redis import asyncio as redis
+            except ImportError:
+                raise RuntimeError("CACHE_BACKEND=redis requiere el paquete redis")
+            if not settings.CACHE_REDIS_URL:
+                raise RuntimeError("CACHE_BACKEND=redis requiere CACHE_REDIS_URL")
+            cliente = redis.from_url(settings.CACHE_REDIS_URL)
+        return cls(cliente, settings.CACHE_LECTURAS_TTL, settings.CACHE_REDIS_ESPACIO)
+
+    def configurar(self, prefijo: str, max_entradas: int, ttl: float):
+        # El tamaño lo acota la política maxmemory del servidor Redis
+        self._ttls[prefijo] = ttl
+
+    def clave(self, prefijo: str, i: Id) -> str:
+        return f"{self.espacio}:{prefijo}:{i}"
+
+    async def obtener_varios(self, prefijo: str, ids: List[Id]) -> List[Optional[bytes]]:
+        return await self.cliente.mget([self.clave(prefijo, i) for i in ids])
+
+    async def guardar_varios(self, prefijo: str, valores: Dict[Id, bytes]):
+        ttl = int(self._ttls.get(prefijo, self.ttl) * 1000)
+        async with self.cliente.pipeline(transaction=False) as tuberia:
+            for i, valor in valores.items():
+                tuberia.set(self.clave(prefijo, i), valor, px=ttl)
+            await tuberia.execute()
+
+    async def invalidar(self, prefijo: str, ids: Iterable[Id]):
+        claves = [self.clave(prefijo, i) for i in ids]
+        if claves:
+            await self.cliente.delete(*claves)
+
+    async def limpiar(self, prefijo: str):
+        lote = []
+        async for clave in self.cliente.scan_iter(match=f"{self.espacio}:{prefijo}:*", count=500):
+            lote.append(clave)
+            if len(lote) >= 500:
+                await self.cliente.delete(*lote)
+                lote.clear()
+        if lote:
+            await self.cliente.delete(*lote)
+
+    def descripcion(self, prefijo: str) -> dict:
+        return {"ttlSegundos": self._ttls.get(prefijo, self.ttl)}
+
+
+def crear_backend() -> BackendMemoria | BackendRedis:
+    if settings.CACHE_BACKEND == "memoria":
+        return BackendMemoria(settings.CACHE_LECTURAS_MAX, settings.CACHE_LECTURAS_TTL)
+    if settings.CACHE_BACKEND in ("redis", "fakeredis"):
+        return BackendRedis.desde_configuracion()
+    raise RuntimeError(f"CACHE_BACKEND desconocido: {settings.CACHE_BACKEND} (memoria, redis o fakeredis)")
+
+
+class CacheLecturas:
+    """Caché de lectura (read-through) de documentos serializados a JSON, por prefijo de clave.
+
+    - Varias peticiones que fallan a la vez sobre la misma clave esperan una sola carga (single-flight).
+    - Las escrituras invalidan la clave; si había una carga en curso, su resultado ya no se guarda.
+    - Si el backend falla, se lee de MongoDB como si no hubiera caché.
+    """
+
+    def __init__(self, backend: BackendMemoria | BackendRedis):
+        self.backend = backend
+        self._en_vuelo: Dict[Tuple[str, Id], asyncio.Future] = {}
+        self._invalidadas: set = set()
+        self._conteos: Dict[str, Dict[str, int]] = {}
+
+    def configurar(self, prefijo: str, max_entradas: int, ttl: float):
+        self.backend.configurar(prefijo, max_entradas, ttl)
+
+    def contar(self, prefijo: str, resultado: str, cantidad: int = 1):
+        if cantidad:
+            conteos = self._conteos.setdefault(prefijo, {"acierto": 0, "fallo": 0, "error": 0})
+            conteos[resultado] += cantidad
+            consultas_cache.incrementar(cantidad, prefijo=prefijo, resultado=resultado)
+
+    # ✅ Consultar varias claves sin cargar las que falten
+    async def consultar_varios(self, prefijo: str, ids: List[Id]) -> List[Optional[bytes]]:
+        if not ids:
+            return []
+        try:
+            valores = await self.backend.obtener_varios(prefijo, ids)
+        except Exception as e:
+            logger.warning("Caché no disponible (%s), se lee de MongoDB: %s", prefijo, e)
+            self.contar(prefijo, "error", len(ids))
+            return [None] * len(ids)
+
+        aciertos = sum(1 for v in valores if v is not None)
+        self.contar(prefijo, "acierto", aciertos)
+        self.contar(prefijo, "fallo", len(ids) - aciertos)
+        return valores
+
+    async def consultar(self, prefijo: str, id: Id) -> Optional[bytes]:
+        return (await self.consultar_varios(prefijo, [id]))[0]
+
+    async def guardar_varios(self, prefijo: str, valores: Dict[Id, bytes]):
+        valores = {i: v for i, v in valores.items() if (prefijo, i) not in self._invalidadas}
+        if not valores:
+            return
+        try:
+            await self.backend.guardar_varios(prefijo, valores)
+        except Exception as e:
+            logger.warning("No se pudo guardar en la caché (%s): %s", prefijo, e)
+
+    # ✅ Leer a través de la caché: si falta, una sola carga por clave aunque haya peticiones simultáneas
+    async def leer(self, prefijo: str, id: Id, cargar: Callable[[], Awaitable[Optional[bytes]]]) -> Optional[bytes]:
+        valor = await self.consultar(prefijo, id)
+        if valor is not None:
+            return valor
+
+        clave = (prefijo, id)
+        vuelo = self._en_vuelo.get(clave)
+        if vuelo is not None:
+            try:
+                return await asyncio.shield(vuelo)
+            except asyncio.CancelledError:
+                # Se canceló la petición que cargaba, no esta: se carga de nuevo
+                if not vuelo.cancelled():
+                    raise
+                return await self.leer(prefijo, id, cargar)
+
+        vuelo = self._en_vuelo[clave] = asyncio.get_running_loop().create_future()
+        try:
+            valor = await cargar()
+            # Los documentos inexistentes no se guardan: un alta posterior se vería al instante
+            if valor is not None:
+                await self.guardar_varios(prefijo, {id: valor})
+        except asyncio.CancelledError:
+            vuelo.cancel()
+            raise
+        except Exception as e:
+            vuelo.set_exception(e)
+            vuelo.exception()  # las que esperan la reciben; si no hay ninguna no queda sin recoger
+            raise
+        finally:
+            del self._en_vuelo[clave]
+            self._invalidadas.discard(clave)
+
+        vuelo.set_result(valor)
+        return valor
+
+    # ✅ Invalidar al escribir (None vacía todo el prefijo)
+    async def invalidar(self, prefijo: str, *ids: Id):
+        for i in ids:
+            if (prefijo, i) in self._en_vuelo:
+                self._invalidadas.add((prefijo, i))
+        try:
+            if ids:
+                await self.backend.invalidar(prefijo, ids)
+            else:
+                for clave in self._en_vuelo:
+                    if clave[0] == prefijo:
+                        self._invalidadas.add(clave)
+                await self.backend.limpiar(prefijo)
+        except Exception as e:
+            logger.warning("No se pudo invalidar la caché (%s): %s", prefijo, e)
+
+    def estadisticas(self) -> dict:
+        prefijos = {}
+        for prefijo, conteos in sorted(self._conteos.items()):
+            consultas = conteos["acierto"] + conteos["fallo"]
+            prefijos[prefijo] = {
+                **self.backend.descripcion(prefijo),
+                "aciertos": conteos["acierto"],
+                "fallos": conteos["fallo"],
+                "errores": conteos["error"],
+                "tasaAciertos": round(conteos["acierto"] / consultas, 4) if consultas else None,
+            }
+        return {"backend": self.backend.nombre, "prefijos": prefijos}
+
+
+# ✅ Caché compartida de lecturas (eventos, evaluaciones y roles de usuario)
+cache_lecturas = CacheLecturas(crear_backend())
+cache_lecturas.configurar("usuario", settings.CACHE_USUARIOS_MAX, settings.CACHE_USUARIOS_TTL)
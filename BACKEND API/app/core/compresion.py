@@ -0,0 +1,202 @@
+import logging
+import zlib
+from typing import Callable, Dict, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metricas import registro
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+bytes_compresion = registro.contador(
+    "http_compresion_bytes_total",
+    "Bytes de las respuestas comprimidas antes (original) y después (comprimido) de comprimir",
+    ("codificacion", "etapa"),
+)
+
+# 🔹 Tipos que vale la pena comprimir; PDFs, imágenes y demás binarios ya vienen comprimidos
+TIPOS_COMPRIMIBLES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/xml",
+    "application/javascript",
+    "text/",
+)
+# Un flujo SSE no pasa por aquí: cada evento debe llegar en cuanto se produce
+TIPOS_EXCLUIDOS = ("text/event-stream",)
+
+
+# 🔹 Compresores incrementales: cada fragmento se comprime y se vacía (flush) para enviarlo de inmediato
+class CompresorGzip:
+    def __init__(self):
+        self.compresor = zlib.compressobj(settings.COMPRESION_NIVEL_GZIP, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def comprimir(self, datos: bytes) -> bytes:
+        return self.compresor.compress(datos) + self.compresor.flush(zlib.Z_SYNC_FLUSH)
+
+    def terminar(self) -> bytes:
+        return self.compresor.flush()
+
+
+class CompresorBrotli:
+    def __init__(self):
+        self.compresor = brotli.Compressor(quality=settings.COMPRESION_NIVEL_BROTLI)
+
+    def comprimir(self, datos: bytes) -> bytes:
+        return self.compresor.process(datos) + self.compresor.flush()
+
+    def terminar(self) -> bytes:
+        return self.compresor.finish()
+
+
+class CompresorZstd:
+    def __init__(self):
+        self.compresor = zstandard.ZstdCompressor(level=settings.COMPRESION_NIVEL_ZSTD).compressobj()
+
+    def comprimir(self, datos: bytes) -> bytes:
+        return self.compresor.compress(datos) + self.compresor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def terminar(self) -> bytes:
+        return self.compresor.flush()
+
+
+# Nombre en Accept-Encoding -> compresor (zstd y br solo si su paquete está instalado)
+COMPRESORES: Dict[str, Callable] = {"gzip": CompresorGzip}
+if brotli is not None:
+    COMPRESORES["br"] = CompresorBrotli
+if zstandard is not None:
+    COMPRESORES["zstd"] = CompresorZstd
+
+
+# ✅ Negociación: la codificación de mayor q; a igual q, la primera de la lista del servidor
+def elegir_codificacion(accept_encoding: str, disponibles: List[str]) -> Optional[str]:
+    aceptadas = {}
+    for parte in accept_encoding.split(","):
+        nombre, _, parametros = parte.partition(";")
+        calidad = 1.0
+        for parametro in parametros.split(";"):
+            clave, _, valor = parametro.strip().partition("=")
+            if clave.lower() == "q":
+                try:
+                    calidad = float(valor)
+                except ValueError:
+                    calidad = 0.0
+        if nombre.strip():
+            aceptadas[nombre.strip().lower()] = calidad
+
+    comodin = aceptadas.get("*", 0.0)
+    calidad, _, codificacion = max(
+        (aceptadas.get(c, comodin), -i, c) for i, c in enumerate(disponibles)
+    )
+    return codificacion if calidad > 0 else None
+
+
+# 🔹 Cada codificación es otra representación: su ETag fuerte lleva la codificación ("3" -> "3-gzip").
+# Los validadores de app.core.condicional leen la versión de las dos formas.
+def etiqueta_codificada(etag: str, codificacion: str) -> str:
+    if etag.startswith("W/") or not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{codificacion}"'
+
+
+def es_comprimible(estado: int, encabezados: Headers) -> bool:
+    if estado < 200 or estado in (204, 206, 304):
+        return False
+    if "content-encoding" in encabezados or "content-range" in encabezados:
+        return False
+    tipo = encabezados.get("content-type", "").lower()
+    return tipo.startswith(TIPOS_COMPRIMIBLES) and not tipo.startswith(TIPOS_EXCLUIDOS)
+
+
+class MiddlewareCompresion:
+    """Middleware ASGI: comprime con zstd, br o gzip según Accept-Encoding.
+
+    Las respuestas de un solo cuerpo por debajo de COMPRESION_TAMANO_MINIMO se envían tal cual. Las
+    transmitidas (listados por fragmentos) se comprimen fragmento a fragmento, sin acumularlas.
+    El ETag de una respuesta comprimida lleva la codificación; If-Match e If-None-Match comparan la versión.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.codificaciones = [c for c in settings.COMPRESION_ALGORITMOS if c in COMPRESORES]
+        faltantes = [c for c in settings.COMPRESION_ALGORITMOS if c not in COMPRESORES]
+        if faltantes:
+            logger.warning(
+                "Compresión %s no disponible (zstd requiere el paquete zstandard y br el paquete brotli)",
+                ", ".join(faltantes)
+            )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] == "HEAD" or not self.codificaciones:
+            await self.app(scope, receive, send)
+            return
+
+        codificacion = elegir_codificacion(Headers(scope=scope).get("accept-encoding", ""), self.codificaciones)
+        estado = {"inicio": None, "compresor": None, "directo": False}
+
+        async def enviar(mensaje: Message):
+            if mensaje["type"] == "http.response.start":
+                # Los encabezados se retienen hasta ver el primer fragmento del cuerpo
+                estado["inicio"] = mensaje
+                return
+            if mensaje["type"] != "http.response.body" or estado["directo"]:
+                await send(mensaje)
+                return
+
+            cuerpo = mensaje.get("body", b"")
+            continua = mensaje.get("more_body", False)
+            inicio = estado["inicio"]
+            if inicio is not None:
+                estado["inicio"] = None
+                encabezados = MutableHeaders(scope=inicio)
+                comprimible = es_comprimible(inicio["status"], encabezados)
+                if comprimible:
+                    encabezados.add_vary_header("Accept-Encoding")
+                longitud = encabezados.get("content-length")
+                pequena = (not continua and len(cuerpo) < settings.COMPRESION_TAMANO_MINIMO) or (
+                    longitud is not None and int(longitud) < settings.COMPRESION_TAMANO_MINIMO
+                )
+                if not comprimible or codificacion is None or pequena:
+                    estado["directo"] = True
+                    await send(inicio)
+                    await send(mensaje)
+                    return
+
+                estado["compresor"] = COMPRESORES[codificacion]()
+                encabezados["Content-Encoding"] = codificacion
+                if "etag" in encabezados:
+                    encabezados["ETag"] = etiqueta_codificada(encabezados["etag"], codificacion)
+                del encabezados["Content-Length"]
+                if not continua:
+                    # Cuerpo completo: se comprime de una vez y se conoce su longitud
+                    comprimido = estado["compresor"].comprimir(cuerpo) + estado["compresor"].terminar()
+                    encabezados["Content-Length"] = str(len(comprimido))
+                    bytes_compresion.incrementar(len(cuerpo), codificacion=codificacion, etapa="original")
+                    bytes_compresion.incrementar(len(comprimido), codificacion=codificacion, etapa="comprimido")
+                    await send(inicio)
+                    await send({"type": "http.response.body", "body": comprimido})
+                    return
+                await send(inicio)
+
+            compresor = estado["compresor"]
+            comprimido = compresor.comprimir(cuerpo) if cuerpo else b""
+            if not continua:
+                comprimido += compresor.terminar()
+            bytes_compresion.incrementar(len(cuerpo), codificacion=codificacion, etapa="original")
+            bytes_compresion.incrementar(len(comprimido), codificacion=codificacion, etapa="comprimido")
+            if comprimido or not continua:
+                await send({"type": "http.response.body", "body": comprimido, "more_body": continua})
+
+        await self.app(scope, receive, enviar)
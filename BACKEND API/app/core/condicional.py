@@ -0,0 +1,139 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Set, Tuple
+
+import orjson
+from bson import ObjectId
+from fastapi import HTTPException, Request, Response, status
+from pydantic import BaseModel
+
+# Los clientes y la CDN pueden guardar la respuesta, pero deben revalidarla con If-None-Match
+CACHE_CONTROL_LECTURAS = "no-cache"
+
+
+# 🔹 Validadores de una entidad: ETag por número de versión y fecha de última modificación
+def etiqueta_version(version: int) -> str:
+    return f'"{version}"'
+
+
+def version_de_etiqueta(etag: str) -> Optional[int]:
+    """Versión de un ETag propio: "3", o "3-gzip" si la respuesta se envió comprimida (app.core.compresion)."""
+    if not (len(etag) >= 2 and etag.startswith('"') and etag.endswith('"')):
+        return None
+    version = etag[1:-1].split("-", 1)[0]
+    return int(version) if version.isdigit() else None
+
+
+def ultima_modificacion(id: ObjectId, actualizado_en: Optional[datetime]) -> datetime:
+    # Los documentos que nunca se han modificado conservan la fecha de creación del ObjectId
+    fecha = actualizado_en or ObjectId(str(id)).generation_time
+    fecha = fecha.replace(tzinfo=timezone.utc) if fecha.tzinfo is None else fecha.astimezone(timezone.utc)
+    return fecha.replace(microsecond=0)
+
+
+def encabezados_validadores(version: int, modificado: datetime) -> dict:
+    return {
+        "ETag": etiqueta_version(version),
+        "Last-Modified": format_datetime(modificado, usegmt=True),
+        "Cache-Control": CACHE_CONTROL_LECTURAS,
+    }
+
+
+def validadores_json(datos: bytes) -> Tuple[int, datetime]:
+    """Versión y fecha de modificación de un documento ya serializado (caché de lecturas), sin validar el modelo."""
+    documento = orjson.loads(datos)
+    actualizado_en = documento.get("actualizadoEn")
+    return documento.get("version", 0), ultima_modificacion(
+        documento["_id"], datetime.fromisoformat(actualizado_en) if actualizado_en else None
+    )
+
+
+def encabezados_documento(documento) -> dict:
+    """Validadores de un documento (modelo, diccionario de Motor o JSON ya serializado) con version y actualizadoEn."""
+    if isinstance(documento, bytes):
+        return encabezados_validadores(*validadores_json(documento))
+    if isinstance(documento, dict):
+        return encabezados_validadores(
+            documento.get("version", 0), ultima_modificacion(documento["_id"], documento.get("actualizadoEn"))
+        )
+    return encabezados_validadores(documento.version, ultima_modificacion(documento.id, documento.actualizadoEn))
+
+
+def etiquetas(encabezado: str) -> list[str]:
+    return [e.strip() for e in encabezado.split(",") if e.strip()]
+
+
+def es_condicional(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+# ✅ GET condicional: If-None-Match (comparación débil) tiene prioridad sobre If-Modified-Since
+def no_modificado(request: Request, version: int, modificado: datetime) -> bool:
+    si_no_coincide = request.headers.get("if-none-match")
+    if si_no_coincide is not None:
+        return any(e == "*" or version_de_etiqueta(e.removeprefix("W/")) == version for e in etiquetas(si_no_coincide))
+
+    si_modificado_desde = request.headers.get("if-modified-since")
+    if si_modificado_desde:
+        try:
+            return modificado <= parsedate_to_datetime(si_modificado_desde)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def respuesta_no_modificado(version: int, modificado: datetime) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=encabezados_validadores(version, modificado))
+
+
+# ✅ If-Match: versión que el cliente espera modificar (None si no envió el encabezado o envió *)
+def version_esperada(request: Request) -> Optional[int]:
+    si_coincide = request.headers.get("if-match")
+    if si_coincide is None or si_coincide.strip() == "*":
+        return None
+
+    # Comparación fuerte: una etiqueta débil (W/) nunca coincide; la codificación no cambia la versión
+    for etag in etiquetas(si_coincide):
+        version = version_de_etiqueta(etag)
+        if version is not None:
+            return version
+    raise HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail="If-Match no corresponde a ninguna versión del recurso."
+    )
+
+
+def error_version(version_actual: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail=f"El recurso fue modificado por otra petición (versión actual {version_actual}).",
+        headers={"ETag": etiqueta_version(version_actual)}
+    )
+
+
+# 🔹 find_one_and_update no encontró el documento: 404 si no existe, 412 si tiene otra versión
+async def error_sin_coincidencia(coleccion, documento_id: ObjectId, no_encontrado: str) -> HTTPException:
+    actual = await coleccion.find_one({"_id": documento_id}, {"version": 1})
+    if not actual:
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=no_encontrado)
+    return error_version(actual.get("version", 0))
+
+
+# ✅ PATCH: campos enviados en el cuerpo; solo los opcionales del documento admiten null
+def campos_modificados(data: BaseModel, anulables: Set[str]) -> dict:
+    cambios = data.model_dump(exclude_unset=True)
+    if not cambios:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No se envió ningún campo para modificar.")
+
+    nulos = [campo for campo, valor in cambios.items() if valor is None and campo not in anulables]
+    if nulos:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Los campos {', '.join(nulos)} no pueden ser null."
+        )
+    return cambios
+
+
+# 🔹 Filtro de la actualización condicional (los documentos anteriores al campo version son la versión 0)
+def filtro_version(version: int) -> dict:
+    return {"version": {"$in": [version, None]}} if version == 0 else {"version": version}
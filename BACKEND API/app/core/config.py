@@ -1,12 +1,38 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field
-from typing import List
+from typing import List, Optional
 from dotenv import load_dotenv
 load_dotenv()
 
 class Settings(BaseSettings):
     MONGO_CONNECTION_STRING: str
     MONGO_DB_NAME: str
+
+    # Pool de conexiones del cliente Motor (por proceso: multiplicar por los workers de uvicorn)
+    MONGO_MAX_POOL_SIZE: int = Field(
+        default=100,
+        description="Conexiones máximas por servidor (maxPoolSize)"
+    )
+    MONGO_MIN_POOL_SIZE: int = Field(
+        default=0,
+        description="Conexiones que el pool mantiene abiertas aunque estén libres (minPoolSize)"
+    )
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = Field(
+        default=None,
+        description="Milisegundos que una operación espera una conexión libre antes de fallar (waitQueueTimeoutMS)"
+    )
+    MONGO_COMPRESSORS: List[str] = Field(
+        default=[],
+        description="Compresión del protocolo en orden de preferencia: zstd (requiere zstandard), snappy (requiere python-snappy), zlib"
+    )
+    MONGO_READ_PREFERENCE: str = Field(
+        default="primary",
+        description="Preferencia de lectura (primary, primaryPreferred, secondary, secondaryPreferred, nearest)"
+    )
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = Field(
+        default=5000,
+        description="Milisegundos para encontrar un servidor disponible antes de fallar (serverSelectionTimeoutMS)"
+    )
     
     # Configuración de la aplicación
     APP_NAME: str = Field(
@@ -23,5 +49,172 @@ class Settings(BaseSettings):
         default=["*"], 
         description="Orígenes permitidos para CORS"
     )
+
+    # Adjuntos (GridFS)
+    ADJUNTO_MAX_BYTES: int = Field(
+        default=20 * 1024 * 1024,
+        description="Tamaño máximo permitido para un PDF adjunto"
+    )
+    ADJUNTO_TAMANO_FRAGMENTO: int = Field(
+        default=256 * 1024,
+        description="Tamaño de los fragmentos al transmitir un adjunto"
+    )
+
+    # Importación masiva de eventos
+    IMPORTACION_MAX_EVENTOS: int = Field(
+        default=10000,
+        description="Cantidad máxima de eventos por lote en POST /eventos/bulk"
+    )
+
+    # Caché compartida de lecturas (eventos, evaluaciones y roles de usuario)
+    CACHE_BACKEND: str = Field(
+        default="memoria",
+        description="memoria (LRU en cada proceso), redis (compartida entre workers, requiere el paquete redis) "
+                    "o fakeredis (Redis simulado en el proceso, para pruebas locales)"
+    )
+    CACHE_REDIS_URL: Optional[str] = Field(
+        default=None,
+        description="URL del servidor Redis, por ejemplo redis://localhost:6379/0"
+    )
+    CACHE_REDIS_ESPACIO: str = Field(
+        default="api-eventos",
+        description="Prefijo de todas las claves que la API guarda en Redis"
+    )
+    CACHE_LECTURAS_TTL: int = Field(
+        default=30,
+        description="Segundos que se conserva un evento o una evaluación leídos (con el backend en memoria, "
+                    "otro worker puede servir una versión anterior durante este tiempo)"
+    )
+    CACHE_LECTURAS_MAX: int = Field(
+        default=10000,
+        description="Cantidad máxima de documentos por prefijo en la caché en memoria"
+    )
+
+    # Caché de roles de usuario
+    CACHE_USUARIOS_TTL: int = Field(
+        default=300,
+        description="Segundos que se conservan en caché los roles de un usuario"
+    )
+    CACHE_USUARIOS_MAX: int = Field(
+        default=10000,
+        description="Cantidad máxima de usuarios en la caché de roles (backend en memoria)"
+    )
+
+    # Estadísticas (agregaciones)
+    CACHE_ESTADISTICAS_TTL: int = Field(
+        default=60,
+        description="Segundos que se conserva en memoria el resultado de una agregación de /estadisticas"
+    )
+    CACHE_ESTADISTICAS_MAX: int = Field(
+        default=256,
+        description="Cantidad máxima de resultados de /estadisticas en caché"
+    )
+    JORNADA_HORA_INICIO: str = Field(
+        default="06:00",
+        description="Inicio de la jornada (HH:MM) para calcular la tasa de ocupación de las instalaciones"
+    )
+    JORNADA_HORA_FIN: str = Field(
+        default="22:00",
+        description="Fin de la jornada (HH:MM) para calcular la tasa de ocupación de las instalaciones"
+    )
+
+    # Horario de los eventos
+    ZONA_HORARIA: str = Field(
+        default="-05:00",
+        description="Zona horaria de horaInicio y horaFin: desplazamiento fijo (-05:00) o nombre IANA "
+                    "(America/Bogota; en Windows requiere el paquete tzdata)"
+    )
+
+    # Flujo de cambios de eventos y evaluaciones (SSE / WebSocket)
+    FLUJO_HISTORIAL: int = Field(
+        default=10000,
+        description="Cambios recientes que se conservan en memoria para reanudar desde Last-Event-ID"
+    )
+    FLUJO_COLA_MAX: int = Field(
+        default=1000,
+        description="Cambios pendientes por suscriptor antes de desconectarlo por lento"
+    )
+    FLUJO_LATIDO_SEGUNDOS: int = Field(
+        default=15,
+        description="Segundos sin cambios tras los que se envía un latido para mantener la conexión"
+    )
+    FLUJO_VENTANA_ARRANQUE_SEGUNDOS: int = Field(
+        default=300,
+        description="Segundos del oplog que se releen al arrancar para reanudar a clientes de antes del reinicio"
+    )
+
+    # Flujo de evaluación (evaluación + estado del evento en una transacción)
+    EVALUACION_LOTE_MAX: int = Field(
+        default=200,
+        description="Cantidad máxima de eventos por petición en POST /evaluaciones/lote"
+    )
+
+    # Trabajos en segundo plano (PDFs enviados en línea: validación, hash y asociación al evento)
+    TRABAJOS_EN_PROCESO: bool = Field(
+        default=True,
+        description="Ejecutar el trabajador dentro de la API; con false se ejecuta aparte (python -m scripts.trabajador)"
+    )
+    TRABAJOS_CONCURRENCIA: int = Field(
+        default=2,
+        description="Trabajos que un trabajador procesa a la vez"
+    )
+    TRABAJOS_SONDEO_SEGUNDOS: float = Field(
+        default=2.0,
+        description="Segundos entre consultas a la colección de trabajos cuando no hay pendientes"
+    )
+    TRABAJOS_PLAZO_SEGUNDOS: int = Field(
+        default=300,
+        description="Segundos que un trabajador tiene para terminar un trabajo antes de que otro lo retome"
+    )
+    TRABAJOS_MAX_INTENTOS: int = Field(
+        default=3,
+        description="Intentos de un trabajo antes de marcarlo como fallido"
+    )
+    TRABAJOS_RETENCION_DIAS: int = Field(
+        default=7,
+        description="Días que se conservan los trabajos terminados (índice TTL)"
+    )
+
+    # Catálogo de instalaciones en memoria
+    CATALOGO_INSTALACIONES_SEGUNDOS: int = Field(
+        default=60,
+        description="Segundos entre recargas del catálogo de instalaciones cuando no hay change streams"
+    )
+
+    # Búsqueda (GET /buscar)
+    BUSQUEDA_MAX_CANDIDATOS: int = Field(
+        default=500,
+        description="Documentos por colección que se leen y ordenan por relevancia en cada búsqueda (primero los que "
+                    "contienen las palabras completas)"
+    )
+
+    # Respuestas JSON
+    RESPUESTA_TAMANO_FRAGMENTO: int = Field(
+        default=64 * 1024,
+        description="Bytes acumulados antes de enviar un fragmento al transmitir listas JSON"
+    )
+
+    # Exportación (GET /export)
+    EXPORTACION_TAMANO_LOTE: int = Field(
+        default=1000,
+        description="Documentos que el cursor de Motor trae del servidor en cada lote al exportar"
+    )
+    EXPORTACION_FILAS_GRUPO: int = Field(
+        default=10000,
+        description="Filas por grupo (row group) de Parquet; acota la memoria de una exportación"
+    )
+
+    # Compresión de respuestas
+    COMPRESION_ALGORITMOS: List[str] = Field(
+        default=["zstd", "br", "gzip"],
+        description="Codificaciones ofrecidas, en orden de preferencia (zstd requiere zstandard y br requiere brotli)"
+    )
+    COMPRESION_TAMANO_MINIMO: int = Field(
+        default=1024,
+        description="Bytes mínimos de una respuesta para comprimirla (las transmitidas por fragmentos siempre se comprimen)"
+    )
+    COMPRESION_NIVEL_ZSTD: int = Field(default=3, description="Nivel de compresión zstd (1-22)")
+    COMPRESION_NIVEL_BROTLI: int = Field(default=4, description="Calidad de compresión brotli (0-11)")
+    COMPRESION_NIVEL_GZIP: int = Field(default=6, description="Nivel de compresión gzip (1-9)")
     
 settings = Settings()
@@ -0,0 +1,132 @@
+import csv
+import io
+from datetime import datetime
+from typing import Any, AsyncIterable, AsyncIterator, List, NamedTuple
+
+from bson import ObjectId
+
+from app.core.busqueda import valores_ruta
+from app.core.config import settings
+from app.core.instrumentacion import medir_serializacion
+from app.core.respuestas import a_json
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+# 🔹 Columna plana de una exportación: la ruta con punto en el documento es también su nombre
+class Columna(NamedTuple):
+    ruta: str
+    tipo: str  # texto | entero | fecha
+    lista: bool = False  # dentro de un arreglo de subdocumentos: todos sus valores, en orden
+
+
+def valor_columna(documento: dict, columna: Columna) -> Any:
+    if columna.lista:
+        return [
+            str(valor) if isinstance(valor, ObjectId) else valor
+            for valor in valores_ruta(documento, columna.ruta.split("."))
+        ]
+    # Un solo valor: se recorre el documento directamente (es la mayoría de las columnas)
+    valor = documento
+    for parte in columna.ruta.split("."):
+        valor = valor.get(parte) if isinstance(valor, dict) else None
+    return str(valor) if isinstance(valor, ObjectId) else valor
+
+
+def celda_csv(valor: Any) -> Any:
+    if valor is None:
+        return ""
+    if isinstance(valor, list):
+        return "|".join(str(celda_csv(v)) for v in valor)
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    return valor
+
+
+# ✅ NDJSON: un objeto por línea con las columnas exportadas (nunca el documento crudo)
+async def fragmentos_ndjson(documentos: AsyncIterable[dict], columnas: List[Columna]) -> AsyncIterator[bytes]:
+    pendiente = bytearray()
+    async for documento in documentos:
+        with medir_serializacion():
+            pendiente += a_json({columna.ruta: valor_columna(documento, columna) for columna in columnas}) + b"\n"
+        if len(pendiente) >= settings.RESPUESTA_TAMANO_FRAGMENTO:
+            yield bytes(pendiente)
+            pendiente.clear()
+    yield bytes(pendiente)
+
+
+# ✅ CSV: una fila por documento; los valores de arreglos van separados por |
+async def fragmentos_csv(documentos: AsyncIterable[dict], columnas: List[Columna]) -> AsyncIterator[bytes]:
+    salida = io.StringIO()
+    escritor = csv.writer(salida)
+    escritor.writerow([columna.ruta for columna in columnas])
+    async for documento in documentos:
+        with medir_serializacion():
+            escritor.writerow([celda_csv(valor_columna(documento, columna)) for columna in columnas])
+        if salida.tell() >= settings.RESPUESTA_TAMANO_FRAGMENTO:
+            yield salida.getvalue().encode()
+            salida.seek(0)
+            salida.truncate()
+    yield salida.getvalue().encode()
+
+
+# 🔹 Archivo de solo escritura que entrega lo escrito por pyarrow a medida que se completa cada grupo
+class SalidaFragmentos(io.RawIOBase):
+    def __init__(self):
+        self.pendiente = bytearray()
+        self.posicion = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, datos) -> int:
+        self.pendiente += datos
+        self.posicion += len(datos)
+        return len(datos)
+
+    def tell(self) -> int:
+        return self.posicion
+
+    def vaciar(self) -> bytes:
+        datos = bytes(self.pendiente)
+        self.pendiente.clear()
+        return datos
+
+
+def esquema_parquet(columnas: List[Columna]):
+    tipos = {"texto": pyarrow.string(), "entero": pyarrow.int64(), "fecha": pyarrow.timestamp("ms")}
+    return pyarrow.schema([
+        (columna.ruta, pyarrow.list_(tipos[columna.tipo]) if columna.lista else tipos[columna.tipo])
+        for columna in columnas
+    ])
+
+
+# ✅ Parquet (requiere pyarrow): en memoria solo hay un grupo de filas (EXPORTACION_FILAS_GRUPO) a la vez
+async def fragmentos_parquet(documentos: AsyncIterable[dict], columnas: List[Columna]) -> AsyncIterator[bytes]:
+    esquema = esquema_parquet(columnas)
+    salida = SalidaFragmentos()
+    escritor = pyarrow.parquet.ParquetWriter(salida, esquema)
+
+    def escribir_grupo(filas: dict):
+        with medir_serializacion():
+            escritor.write_table(pyarrow.Table.from_pydict(filas, schema=esquema))
+
+    filas, cantidad = {columna.ruta: [] for columna in columnas}, 0
+    async for documento in documentos:
+        for columna in columnas:
+            filas[columna.ruta].append(valor_columna(documento, columna))
+        cantidad += 1
+        if cantidad == settings.EXPORTACION_FILAS_GRUPO:
+            escribir_grupo(filas)
+            yield salida.vaciar()
+            filas, cantidad = {columna.ruta: [] for columna in columnas}, 0
+
+    if cantidad:
+        escribir_grupo(filas)
+    # El pie del archivo (esquema y ubicación de los grupos) se escribe al cerrar
+    escritor.close()
+    yield salida.vaciar()
@@ -0,0 +1,72 @@
+import re
+from datetime import datetime, timedelta, timezone, tzinfo
+from functools import lru_cache
+from typing import Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+
+
+# 🔹 Utilidad: convertir "HH:MM" a minutos desde la medianoche
+def hora_a_minutos(hora: str) -> int:
+    try:
+        horas, minutos = (int(parte) for parte in hora.split(":"))
+    except (AttributeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"La hora '{hora}' no tiene el formato HH:MM."
+        )
+
+    if not (0 <= horas <= 23 and 0 <= minutos <= 59) and (horas, minutos) != (24, 0):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"La hora '{hora}' no es válida."
+        )
+    return horas * 60 + minutos
+
+
+def minutos_a_hora(minutos: int) -> str:
+    return f"{minutos // 60:02d}:{minutos % 60:02d}"
+
+
+# 🔹 Utilidad: fechas en UTC sin zona, igual que las devuelve MongoDB (así se comparan entre sí)
+def normalizar_fecha(fecha: datetime) -> datetime:
+    if fecha.tzinfo is not None:
+        return fecha.astimezone(timezone.utc).replace(tzinfo=None)
+    return fecha
+
+
+# 🔹 Zona horaria en la que se expresan horaInicio y horaFin: nombre IANA o desplazamiento fijo (-05:00)
+@lru_cache(maxsize=None)
+def zona_horaria() -> tzinfo:
+    desplazamiento = re.fullmatch(r"([+-])(\d{2}):(\d{2})", settings.ZONA_HORARIA)
+    if desplazamiento:
+        signo, horas, minutos = desplazamiento.groups()
+        delta = timedelta(hours=int(horas), minutes=int(minutos))
+        return timezone(-delta if signo == "-" else delta)
+    return ZoneInfo(settings.ZONA_HORARIA)
+
+
+# ✅ Instantes UTC de inicio y fin de una realización (fecha del calendario + minutos locales)
+def intervalo_utc(fecha: datetime, inicio_minutos: int, fin_minutos: int) -> Tuple[datetime, datetime]:
+    medianoche = datetime(fecha.year, fecha.month, fecha.day)
+    zona = zona_horaria()
+
+    def a_utc(minutos: int) -> datetime:
+        local = (medianoche + timedelta(minutes=minutos)).replace(tzinfo=zona)
+        return local.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return a_utc(inicio_minutos), a_utc(fin_minutos)
+
+
+# 🔹 Campos calculados de una realización; None si las horas no son válidas (datos antiguos)
+def calcular_intervalo(fecha: datetime, hora_inicio: str, hora_fin: str) -> Optional[dict]:
+    try:
+        inicio_minutos, fin_minutos = hora_a_minutos(hora_inicio), hora_a_minutos(hora_fin)
+    except HTTPException:
+        return None
+
+    inicio, fin = intervalo_utc(normalizar_fecha(fecha), inicio_minutos, fin_minutos)
+    return {"inicio": inicio, "fin": fin, "inicioMinutos": inicio_minutos, "finMinutos": fin_minutos}
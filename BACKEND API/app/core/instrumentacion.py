@@ -0,0 +1,230 @@
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from fastapi.routing import APIRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metricas import registro
+
+LIMITES_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+duracion_peticiones = registro.histograma(
+    "http_peticion_duracion_segundos",
+    "Latencia de cada petición por plantilla de ruta",
+    ["metodo", "ruta", "estado"],
+)
+fases_peticiones = registro.histograma(
+    "http_peticion_fase_segundos",
+    "Tiempo de la petición por fase: mongo, validacion (Pydantic/FastAPI), serializacion y app (resto del endpoint)",
+    ["metodo", "ruta", "fase"],
+)
+bytes_peticiones = registro.histograma(
+    "http_peticion_bytes",
+    "Tamaño del cuerpo de la petición",
+    ["metodo", "ruta"],
+    LIMITES_BYTES,
+)
+bytes_respuestas = registro.histograma(
+    "http_respuesta_bytes",
+    "Tamaño del cuerpo de la respuesta",
+    ["metodo", "ruta"],
+    LIMITES_BYTES,
+)
+
+
+class TiemposPeticion:
+    """Acumulado de tiempos de una petición (segundos).
+
+    Vive en un ContextVar y es mutable: los listeners de Motor lo actualizan desde los
+    hilos del driver, que reciben una copia del contexto con la misma instancia.
+    """
+
+    __slots__ = ("inicio", "mongo", "serializacion", "serializacion_endpoint", "endpoint", "validacion", "app")
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.mongo = 0.0
+        self.serializacion = 0.0
+        self.serializacion_endpoint = 0.0
+        self.endpoint = 0.0
+        self.validacion = 0.0
+        self.app = 0.0
+
+    def fases(self) -> dict:
+        return {
+            "mongo": self.mongo,
+            "validacion": self.validacion,
+            "serializacion": self.serializacion,
+            "app": self.app,
+        }
+
+
+tiempos_peticion: ContextVar[Optional[TiemposPeticion]] = ContextVar("tiempos_peticion", default=None)
+
+
+def sumar_mongo(segundos: float):
+    tiempos = tiempos_peticion.get()
+    if tiempos is not None:
+        tiempos.mongo += segundos
+
+
+@contextmanager
+def medir_serializacion():
+    tiempos = tiempos_peticion.get()
+    if tiempos is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        tiempos.serializacion += time.perf_counter() - inicio
+
+
+class RutaInstrumentada(APIRoute):
+    """APIRoute que separa el tiempo del endpoint del que FastAPI dedica a validar.
+
+    - app: endpoint sin el tiempo de Mongo ni de serialización.
+    - validacion: manejador completo menos el endpoint y la serialización hecha fuera
+      de él (cuerpo y parámetros de la petición, response_model y jsonable_encoder).
+    """
+
+    def get_route_handler(self) -> Callable:
+        if inspect.iscoroutinefunction(self.dependant.call):
+            self.dependant.call = medir_endpoint(self.dependant.call)
+        manejador = super().get_route_handler()
+
+        async def manejador_medido(request):
+            tiempos = tiempos_peticion.get()
+            if tiempos is None:
+                return await manejador(request)
+
+            inicio = time.perf_counter()
+            endpoint = tiempos.endpoint
+            serializacion = tiempos.serializacion - tiempos.serializacion_endpoint
+            try:
+                return await manejador(request)
+            finally:
+                total = time.perf_counter() - inicio
+                fuera_endpoint = tiempos.serializacion - tiempos.serializacion_endpoint - serializacion
+                tiempos.validacion += max(total - (tiempos.endpoint - endpoint) - fuera_endpoint, 0.0)
+
+        return manejador_medido
+
+
+def medir_endpoint(endpoint: Callable) -> Callable:
+    @functools.wraps(endpoint)
+    async def endpoint_medido(*args, **kwargs):
+        tiempos = tiempos_peticion.get()
+        if tiempos is None:
+            return await endpoint(*args, **kwargs)
+
+        inicio = time.perf_counter()
+        mongo, serializacion = tiempos.mongo, tiempos.serializacion
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            duracion = time.perf_counter() - inicio
+            serializado = tiempos.serializacion - serializacion
+            tiempos.endpoint += duracion
+            tiempos.serializacion_endpoint += serializado
+            tiempos.app += max(duracion - (tiempos.mongo - mongo) - serializado, 0.0)
+
+    return endpoint_medido
+
+
+def plantilla_ruta(scope: Scope) -> str:
+    # FastAPI deja la ruta encontrada en el scope; sin ella (404) se agrupa todo en una etiqueta
+    ruta = scope.get("route")
+    return getattr(ruta, "path_format", None) or "sin_ruta"
+
+
+def encabezado_server_timing(tiempos: TiemposPeticion, total: float) -> bytes:
+    fases = [f"{nombre};dur={segundos * 1000:.2f}" for nombre, segundos in tiempos.fases().items()]
+    fases.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(fases).encode()
+
+
+class MiddlewareLatencia:
+    """Middleware ASGI: latencia, tamaños y fases por plantilla de ruta + encabezado Server-Timing.
+
+    En respuestas transmitidas, Server-Timing refleja solo lo ocurrido hasta enviar los encabezados;
+    los histogramas sí incluyen la transmisión completa.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        tiempos = TiemposPeticion()
+        token = tiempos_peticion.set(tiempos)
+        tamanos = {"peticion": 0, "respuesta": 0}
+        estado = {"codigo": 500, "continua": False}
+
+        async def recibir() -> Message:
+            mensaje = await receive()
+            if mensaje["type"] == "http.request":
+                tamanos["peticion"] += len(mensaje.get("body", b""))
+            return mensaje
+
+        async def enviar(mensaje: Message):
+            if mensaje["type"] == "http.response.start":
+                estado["codigo"] = mensaje["status"]
+                estado["continua"] = any(
+                    n.lower() == b"content-type" and v.startswith(b"text/event-stream")
+                    for n, v in mensaje.get("headers", [])
+                )
+                total = time.perf_counter() - tiempos.inicio
+                mensaje["headers"] = [
+                    *mensaje.get("headers", []),
+                    (b"server-timing", encabezado_server_timing(tiempos, total)),
+                ]
+            elif mensaje["type"] == "http.response.body":
+                tamanos["respuesta"] += len(mensaje.get("body", b""))
+            await send(mensaje)
+
+        try:
+            await self.app(scope, recibir, enviar)
+        finally:
+            tiempos_peticion.reset(token)
+            total = time.perf_counter() - tiempos.inicio
+            metodo, ruta = scope["method"], plantilla_ruta(scope)
+            # Un flujo SSE dura lo que dure la conexión: no es latencia
+            if not estado["continua"]:
+                duracion_peticiones.observar(total, metodo=metodo, ruta=ruta, estado=estado["codigo"])
+                for fase, segundos in tiempos.fases().items():
+                    fases_peticiones.observar(segundos, metodo=metodo, ruta=ruta, fase=fase)
+            bytes_peticiones.observar(tamanos["peticion"], metodo=metodo, ruta=ruta)
+            bytes_respuestas.observar(tamanos["respuesta"], metodo=metodo, ruta=ruta)
+
+
+# ✅ Percentiles por ruta a partir de los histogramas (para consultarlos sin Prometheus)
+def resumen_latencias() -> list:
+    resumen = []
+    for metodo, ruta, estado in sorted(duracion_peticiones.series()):
+        etiquetas = {"metodo": metodo, "ruta": ruta, "estado": estado}
+        percentiles = {
+            f"p{int(q * 100)}Ms": round(duracion_peticiones.cuantil(q, **etiquetas) * 1000, 2)
+            for q in (0.5, 0.95, 0.99)
+        }
+        fases = {
+            fase: round((fases_peticiones.promedio(metodo=metodo, ruta=ruta, fase=fase) or 0) * 1000, 2)
+            for fase in ("mongo", "validacion", "serializacion", "app")
+        }
+        resumen.append({
+            "metodo": metodo,
+            "ruta": ruta,
+            "estado": int(estado),
+            "peticiones": duracion_peticiones.total(**etiquetas),
+            **percentiles,
+            "fasesPromedioMs": fases,
+        })
+    return resumen
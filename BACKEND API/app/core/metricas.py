@@ -0,0 +1,161 @@
+import bisect
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Sequence, Tuple
+
+# Límites (segundos) de los histogramas de latencia
+LIMITES_LATENCIA = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def formatear_etiquetas(nombres: Sequence[str], valores: Sequence[str], extra: str = "") -> str:
+    pares = [f'{n}="{escapar(v)}"' for n, v in zip(nombres, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+class Metrica(ABC):
+    """Base de las métricas en formato de texto de Prometheus (seguras entre hilos)."""
+
+    tipo = "untyped"
+
+    def __init__(self, nombre: str, descripcion: str, etiquetas: Sequence[str] = ()):
+        self.nombre = nombre
+        self.descripcion = descripcion
+        self.etiquetas = tuple(etiquetas)
+        self._bloqueo = threading.Lock()
+
+    def clave(self, etiquetas: dict) -> Tuple[str, ...]:
+        return tuple(str(etiquetas.get(n, "")) for n in self.etiquetas)
+
+    @abstractmethod
+    def lineas(self) -> List[str]:
+        """Líneas de muestras (sin HELP ni TYPE)."""
+
+    def exponer(self) -> List[str]:
+        return [f"# HELP {self.nombre} {self.descripcion}", f"# TYPE {self.nombre} {self.tipo}", *self.lineas()]
+
+
+class Contador(Metrica):
+    tipo = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._valores: Dict[Tuple[str, ...], float] = {}
+
+    def incrementar(self, valor: float = 1, **etiquetas):
+        clave = self.clave(etiquetas)
+        with self._bloqueo:
+            self._valores[clave] = self._valores.get(clave, 0) + valor
+
+    def lineas(self) -> List[str]:
+        with self._bloqueo:
+            valores = list(self._valores.items())
+        return [f"{self.nombre}{formatear_etiquetas(self.etiquetas, c)} {v}" for c, v in valores]
+
+
+class Medidor(Contador):
+    tipo = "gauge"
+
+    def fijar(self, valor: float, **etiquetas):
+        with self._bloqueo:
+            self._valores[self.clave(etiquetas)] = valor
+
+
+class Histograma(Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nombre: str, descripcion: str, etiquetas: Sequence[str] = (), limites: Sequence[float] = LIMITES_LATENCIA):
+        super().__init__(nombre, descripcion, etiquetas)
+        self.limites = tuple(sorted(limites))
+        # Por combinación de etiquetas: [conteos por cubeta (+Inf al final), suma, total]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observar(self, valor: float, **etiquetas):
+        clave = self.clave(etiquetas)
+        posicion = bisect.bisect_left(self.limites, valor)
+        with self._bloqueo:
+            serie = self._series.get(clave)
+            if serie is None:
+                serie = self._series[clave] = [[0] * (len(self.limites) + 1), 0.0, 0]
+            serie[0][posicion] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def cuantil(self, q: float, **etiquetas) -> float | None:
+        """Estimación por interpolación lineal dentro de la cubeta (como histogram_quantile)."""
+        with self._bloqueo:
+            serie = self._series.get(self.clave(etiquetas))
+            if not serie or not serie[2]:
+                return None
+            conteos, total = list(serie[0]), serie[2]
+
+        objetivo = q * total
+        acumulado = 0
+        for i, conteo in enumerate(conteos):
+            if acumulado + conteo >= objetivo and conteo:
+                if i == len(self.limites):
+                    return self.limites[-1]
+                inferior = self.limites[i - 1] if i else 0.0
+                return inferior + (self.limites[i] - inferior) * (objetivo - acumulado) / conteo
+            acumulado += conteo
+        return self.limites[-1]
+
+    def total(self, **etiquetas) -> int:
+        with self._bloqueo:
+            serie = self._series.get(self.clave(etiquetas))
+            return serie[2] if serie else 0
+
+    def promedio(self, **etiquetas) -> float | None:
+        with self._bloqueo:
+            serie = self._series.get(self.clave(etiquetas))
+            return serie[1] / serie[2] if serie and serie[2] else None
+
+    def series(self) -> List[Tuple[str, ...]]:
+        with self._bloqueo:
+            return list(self._series)
+
+    def lineas(self) -> List[str]:
+        with self._bloqueo:
+            series = [(c, list(s[0]), s[1], s[2]) for c, s in self._series.items()]
+
+        lineas = []
+        for clave, conteos, suma, total in series:
+            acumulado = 0
+            for limite, conteo in zip((*self.limites, "+Inf"), conteos):
+                acumulado += conteo
+                etiquetas = formatear_etiquetas(self.etiquetas, clave, f'le="{limite}"')
+                lineas.append(f"{self.nombre}_bucket{etiquetas} {acumulado}")
+            etiquetas = formatear_etiquetas(self.etiquetas, clave)
+            lineas.append(f"{self.nombre}_sum{etiquetas} {suma}")
+            lineas.append(f"{self.nombre}_count{etiquetas} {total}")
+        return lineas
+
+
+class RegistroMetricas:
+    def __init__(self):
+        self._metricas: Dict[str, Metrica] = {}
+
+    def registrar(self, metrica: Metrica) -> Metrica:
+        self._metricas[metrica.nombre] = metrica
+        return metrica
+
+    def contador(self, nombre: str, descripcion: str, etiquetas: Sequence[str] = ()) -> Contador:
+        return self.registrar(Contador(nombre, descripcion, etiquetas))
+
+    def medidor(self, nombre: str, descripcion: str, etiquetas: Sequence[str] = ()) -> Medidor:
+        return self.registrar(Medidor(nombre, descripcion, etiquetas))
+
+    def histograma(self, nombre: str, descripcion: str, etiquetas: Sequence[str] = (), limites: Sequence[float] = LIMITES_LATENCIA) -> Histograma:
+        return self.registrar(Histograma(nombre, descripcion, etiquetas, limites))
+
+    def exponer(self) -> str:
+        return "\n".join(linea for m in self._metricas.values() for linea in m.exponer()) + "\n"
+
+
+# ✅ Registro único del proceso (lo publica GET /metrics)
+registro = RegistroMetricas()
@@ -0,0 +1,78 @@
+import base64
+from typing import Any, AsyncIterable, AsyncIterator, Optional
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.instrumentacion import medir_serializacion
+
+
+# 🔹 Tipos que orjson no serializa por sí solo (ObjectId, bytes y modelos anidados)
+def serializar_extra(valor: Any) -> Any:
+    if isinstance(valor, ObjectId):
+        return str(valor)
+    if isinstance(valor, BaseModel):
+        return valor.model_dump(mode="json", by_alias=True)
+    if isinstance(valor, (bytes, bytearray)):
+        return base64.b64encode(valor).decode()
+    raise TypeError(f"Tipo no serializable a JSON: {type(valor).__name__}")
+
+
+# ✅ Serializar a bytes en una sola pasada
+def a_json(contenido: Any) -> bytes:
+    # Documentos Beanie y esquemas: pydantic-core escribe el JSON directamente (PyObjectId -> str)
+    if isinstance(contenido, BaseModel):
+        return contenido.__pydantic_serializer__.to_json(contenido, by_alias=True)
+    if isinstance(contenido, list) and contenido and isinstance(contenido[0], BaseModel):
+        return b"[" + b",".join(a_json(modelo) for modelo in contenido) + b"]"
+    # Diccionarios crudos de Motor: orjson, con ObjectId resuelto en serializar_extra
+    return orjson.dumps(contenido, default=serializar_extra, option=orjson.OPT_NON_STR_KEYS)
+
+
+class RespuestaJSON(ORJSONResponse):
+    """Respuesta JSON con orjson que también acepta documentos Beanie y ObjectId.
+
+    Devolverla directamente desde una ruta evita que FastAPI vuelva a validar
+    el resultado contra ``response_model`` (que queda solo para la documentación).
+    Los bytes se envían tal cual: son JSON ya serializado (p. ej. desde la caché de lecturas).
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        with medir_serializacion():
+            return a_json(content)
+
+
+# 🔹 Arreglo JSON por fragmentos a medida que llegan los documentos del cursor
+async def fragmentos_arreglo(elementos: AsyncIterable[Any]) -> AsyncIterator[bytes]:
+    pendiente = bytearray(b"[")
+    primero = True
+    async for elemento in elementos:
+        if not primero:
+            pendiente += b","
+        with medir_serializacion():
+            pendiente += a_json(elemento)
+        primero = False
+        if len(pendiente) >= settings.RESPUESTA_TAMANO_FRAGMENTO:
+            yield bytes(pendiente)
+            pendiente.clear()
+    pendiente += b"]"
+    yield bytes(pendiente)
+
+
+# ✅ Listas grandes: se transmiten sin cargarlas enteras en memoria
+def transmitir_arreglo_json(
+    elementos: AsyncIterable[Any],
+    status_code: int = 200,
+    headers: Optional[dict] = None,
+) -> StreamingResponse:
+    return StreamingResponse(
+        fragmentos_arreglo(elementos),
+        status_code=status_code,
+        media_type="application/json",
+        headers=headers
+    )
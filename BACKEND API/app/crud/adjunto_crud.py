@@ -0,0 +1,179 @@
+import hashlib
+import re
+from typing import AsyncIterator, Optional, Tuple
+from bson import ObjectId
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from gridfs.errors import NoFile
+
+from app.core.config import settings
+from app.db.mongodb import db
+
+TIPO_PDF = "application/pdf"
+
+
+def error_tamano_excedido() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"El archivo supera el tamaño máximo permitido ({settings.ADJUNTO_MAX_BYTES} bytes)."
+    )
+
+
+# ✅ Guardar en GridFS un adjunto que ya está en memoria (PDF enviado en línea)
+async def guardar_adjunto(contenido: bytes, nombre: str, metadatos: Optional[dict] = None) -> ObjectId:
+    if len(contenido) > settings.ADJUNTO_MAX_BYTES:
+        raise error_tamano_excedido()
+
+    return await db.adjuntos.upload_from_stream(
+        nombre,
+        contenido,
+        chunk_size_bytes=settings.ADJUNTO_TAMANO_FRAGMENTO,
+        metadata={"contentType": TIPO_PDF, **(metadatos or {})}
+    )
+
+
+# ✅ Guardar en GridFS un adjunto que llega por fragmentos, sin cargarlo entero en memoria
+async def guardar_adjunto_stream(
+    fragmentos: AsyncIterator[bytes],
+    nombre: str,
+    tipo_contenido: Optional[str] = None,
+    metadatos: Optional[dict] = None,
+) -> ObjectId:
+    subida = db.adjuntos.open_upload_stream(
+        nombre,
+        chunk_size_bytes=settings.ADJUNTO_TAMANO_FRAGMENTO,
+        metadata={"contentType": tipo_contenido or TIPO_PDF, **(metadatos or {})}
+    )
+
+    total = 0
+    try:
+        async for fragmento in fragmentos:
+            total += len(fragmento)
+            if total > settings.ADJUNTO_MAX_BYTES:
+                raise error_tamano_excedido()
+            await subida.write(fragmento)
+
+        if total == 0:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="El archivo está vacío.")
+    except BaseException:
+        await subida.abort()
+        raise
+
+    await subida.close()
+    return subida._id
+
+
+# 🔹 Firma de un PDF: la cabecera va al principio y la marca de fin en los últimos bytes
+CABECERA_PDF = b"%PDF-"
+FIN_PDF = b"%%EOF"
+MARGEN_PDF = 1024
+
+
+# ✅ Revisar un adjunto ya guardado: firma PDF y SHA-256, leyéndolo por fragmentos
+async def revisar_adjunto(archivo_id: ObjectId) -> dict:
+    archivo = await db.adjuntos.open_download_stream(archivo_id)
+    resumen = hashlib.sha256()
+    inicio, final = b"", b""
+    while True:
+        datos = await archivo.read(settings.ADJUNTO_TAMANO_FRAGMENTO)
+        if not datos:
+            break
+        resumen.update(datos)
+        if len(inicio) < MARGEN_PDF:
+            inicio += datos[:MARGEN_PDF - len(inicio)]
+        final = (final + datos)[-MARGEN_PDF:]
+
+    motivo = None
+    if CABECERA_PDF not in inicio:
+        motivo = "El archivo no es un PDF (falta la cabecera %PDF-)."
+    elif FIN_PDF not in final:
+        motivo = "El PDF está incompleto (falta la marca %%EOF)."
+    return {"valido": motivo is None, "motivo": motivo, "sha256": resumen.hexdigest(), "bytes": archivo.length}
+
+
+# 🔹 Actualizar los metadatos de un adjunto (colección adjuntos.files)
+async def marcar_adjunto(archivo_id: ObjectId, metadatos: dict):
+    await db.client[settings.MONGO_DB_NAME]["adjuntos.files"].update_one(
+        {"_id": archivo_id},
+        {"$set": {f"metadata.{clave}": valor for clave, valor in metadatos.items()}}
+    )
+
+
+# ✅ Eliminar adjuntos (los que ya no existan se ignoran)
+async def eliminar_adjuntos(*archivo_ids: Optional[ObjectId]):
+    for archivo_id in archivo_ids:
+        if not archivo_id:
+            continue
+        try:
+            await db.adjuntos.delete(archivo_id)
+        except NoFile:
+            pass
+
+
+# 🔹 Interpretar un encabezado Range de un solo intervalo ("bytes=inicio-fin" o "bytes=-sufijo")
+def interpretar_rango(rango: str, longitud: int) -> Optional[Tuple[int, int]]:
+    coincidencia = re.fullmatch(r"\s*bytes=(\d*)-(\d*)\s*", rango)
+    if not coincidencia or not any(coincidencia.groups()):
+        # Rangos múltiples o mal formados: se ignoran y se envía el archivo completo
+        return None
+
+    desde, hasta = coincidencia.groups()
+    if desde:
+        inicio = int(desde)
+        fin = min(int(hasta), longitud - 1) if hasta else longitud - 1
+    else:
+        inicio = max(longitud - int(hasta), 0)
+        fin = longitud - 1 if int(hasta) else -1
+
+    if inicio > fin or inicio >= longitud:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="El rango solicitado no es válido para este archivo.",
+            headers={"Content-Range": f"bytes */{longitud}"}
+        )
+    return inicio, fin
+
+
+# ✅ Descargar un adjunto por fragmentos, con soporte de Range
+async def descargar_adjunto(archivo_id: Optional[ObjectId], rango: Optional[str] = None) -> StreamingResponse:
+    if not archivo_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Adjunto no encontrado")
+
+    try:
+        archivo = await db.adjuntos.open_download_stream(archivo_id)
+    except NoFile:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Adjunto no encontrado")
+
+    longitud = archivo.length
+    inicio, fin = 0, longitud - 1
+    codigo = status.HTTP_200_OK
+    intervalo = interpretar_rango(rango, longitud) if rango else None
+    if intervalo:
+        inicio, fin = intervalo
+        codigo = status.HTTP_206_PARTIAL_CONTENT
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Length": str(fin - inicio + 1),
+        "Content-Disposition": f'inline; filename="{archivo.filename}"',
+    }
+    if codigo == status.HTTP_206_PARTIAL_CONTENT:
+        headers["Content-Range"] = f"bytes {inicio}-{fin}/{longitud}"
+
+    archivo.seek(inicio)
+
+    async def fragmentos():
+        pendiente = fin - inicio + 1
+        while pendiente > 0:
+            datos = await archivo.read(min(settings.ADJUNTO_TAMANO_FRAGMENTO, pendiente))
+            if not datos:
+                break
+            pendiente -= len(datos)
+            yield datos
+
+    return StreamingResponse(
+        fragmentos(),
+        status_code=codigo,
+        media_type=(archivo.metadata or {}).get("contentType", TIPO_PDF),
+        headers=headers
+    )
@@ -0,0 +1,99 @@
+import asyncio
+import re
+from typing import List, Optional, Tuple
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.busqueda import CAMPOS_BUSQUEDA, normalizar_texto, palabras, valores_ruta
+from app.models.eventos import EventoModel
+from app.models.organizacion import OrganizacionModel
+
+# 🔹 Colecciones en las que se busca y campos que se devuelven de cada resultado
+COLECCIONES_BUSQUEDA = {
+    "evento": (EventoModel, {
+        "nombre": 1, "estado": 1, "tipo": 1, "realizacion.fecha": 1, "organizacion.nombreParticipante": 1,
+    }),
+    "organizacion": (OrganizacionModel, {"nombre": 1, "sectorEconomico": 1}),
+}
+
+
+# 🔹 Relevancia: palabra completa en el nombre > comienzo de palabra en el nombre > lo mismo en otro campo
+def puntuar(coleccion: str, documento: dict, consulta: List[str]) -> int:
+    nombre = palabras(documento.get("nombre"))
+    otros = {
+        palabra
+        for ruta in CAMPOS_BUSQUEDA[coleccion][1:]
+        for texto in valores_ruta(documento, ruta.split("."))
+        for palabra in palabras(texto)
+    }
+    puntaje = 0
+    for palabra in consulta:
+        if palabra in nombre:
+            puntaje += 4
+        elif any(n.startswith(palabra) for n in nombre):
+            puntaje += 3
+        elif palabra in otros:
+            puntaje += 2
+        else:
+            puntaje += 1
+    # Lo que se está escribiendo coincide con el comienzo del nombre (autocompletado)
+    if " ".join(nombre).startswith(" ".join(consulta)):
+        puntaje += 2
+    return puntaje
+
+
+# 🔹 Primero los documentos con todas las palabras completas (los más relevantes) y después los que solo
+# las comienzan; ambos en orden de _id para que el corte en BUSQUEDA_MAX_CANDIDATOS sea estable entre páginas
+async def candidatos(coleccion: str, exacto: dict, prefijo: dict) -> Tuple[List[dict], bool]:
+    modelo, proyeccion = COLECCIONES_BUSQUEDA[coleccion]
+    documentos_coleccion = modelo.get_motor_collection()
+    maximo = settings.BUSQUEDA_MAX_CANDIDATOS
+    # Se pide uno de más para saber si el resultado se cortó
+    documentos = await documentos_coleccion.find(exacto, proyeccion).sort("_id", 1).limit(
+        maximo + 1
+    ).to_list(length=None)
+    if len(documentos) <= maximo:
+        vistos = [documento["_id"] for documento in documentos]
+        documentos += await documentos_coleccion.find(
+            {"$and": [prefijo, {"_id": {"$nin": vistos}}]}, proyeccion
+        ).sort("_id", 1).limit(maximo + 1 - len(documentos)).to_list(length=None)
+    return documentos[:maximo], len(documentos) > maximo
+
+
+# ✅ Buscar por palabras o comienzos de palabras (sin distinguir mayúsculas ni tildes), por relevancia
+async def buscar(
+    q: str,
+    colecciones: List[str],
+    limite: int = 20,
+    despues: Optional[str] = None,
+) -> Tuple[List[dict], Optional[str], bool]:
+    consulta = palabras(q)
+    if not consulta:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La búsqueda debe contener al menos una letra o un número."
+        )
+    if despues is not None and not despues.isdigit():
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido")
+    posicion = int(despues or 0)
+    colecciones = list(dict.fromkeys(colecciones))
+
+    # Cada palabra es un rango del índice `terminos`; la más larga primero porque es la más selectiva
+    prefijo = {"$and": [
+        {"terminos": {"$regex": f"^{re.escape(palabra)}"}}
+        for palabra in sorted(set(consulta), key=len, reverse=True)
+    ]}
+    exacto = {"terminos": {"$all": list(dict.fromkeys(consulta))}}
+    encontrados, truncados = zip(*await asyncio.gather(*(candidatos(c, exacto, prefijo) for c in colecciones)))
+
+    resultados = [
+        {"coleccion": coleccion, "puntaje": puntuar(coleccion, documento, consulta), **documento}
+        for coleccion, documentos in zip(colecciones, encontrados)
+        for documento in documentos
+    ]
+    resultados.sort(key=lambda r: (-r["puntaje"], normalizar_texto(r.get("nombre") or ""), str(r["_id"])))
+
+    # El cursor es la posición del siguiente resultado en el orden por relevancia
+    siguiente = str(posicion + limite) if len(resultados) > posicion + limite else None
+    # Si alguna colección superó BUSQUEDA_MAX_CANDIDATOS, la relevancia solo se calculó sobre una parte
+    return resultados[posicion:posicion + limite], siguiente, any(truncados)
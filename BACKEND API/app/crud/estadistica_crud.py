@@ -0,0 +1,224 @@
+from typing import Any, Awaitable, Callable, Hashable, List, Optional
+from datetime import date, datetime, time, timedelta
+from fastapi import HTTPException, status
+
+from app.core.cache import CacheTTL
+from app.core.config import settings
+from app.models.eventos import EventoModel
+from app.models.evaluaciones import EvaluacionModel
+from app.models.facultad import FacultadModel
+from app.models.reserva import ReservaModel
+from app.core.horario import hora_a_minutos
+
+# ✅ Resultados de agregación en memoria durante unos segundos
+cache_estadisticas = CacheTTL(settings.CACHE_ESTADISTICAS_MAX, settings.CACHE_ESTADISTICAS_TTL)
+
+
+async def en_cache(clave: Hashable, calcular: Callable[[], Awaitable[Any]]) -> Any:
+    resultado = cache_estadisticas.obtener(clave)
+    if resultado is None:
+        resultado = await calcular()
+        cache_estadisticas.guardar(clave, resultado)
+    return resultado
+
+
+# 🔹 Utilidad: filtro por rango de fechas (hasta incluye el día completo)
+def filtro_fechas(campo: str, desde: Optional[date], hasta: Optional[date]) -> dict:
+    if desde and hasta and desde > hasta:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La fecha 'desde' no puede ser posterior a 'hasta'."
+        )
+
+    rango = {}
+    if desde:
+        rango["$gte"] = datetime.combine(desde, time.min)
+    if hasta:
+        rango["$lt"] = datetime.combine(hasta + timedelta(days=1), time.min)
+    return {campo: rango} if rango else {}
+
+
+# ✅ Eventos por estado, por tipo y por mes de realización
+async def eventos_por_estado_tipo_mes(desde: Optional[date] = None, hasta: Optional[date] = None) -> dict:
+    async def calcular():
+        pipeline = [
+            {"$match": filtro_fechas("realizacion.fecha", desde, hasta)},
+            {"$facet": {
+                "porEstado": [
+                    {"$group": {"_id": "$estado", "eventos": {"$sum": 1}}},
+                    {"$project": {"_id": 0, "estado": "$_id", "eventos": 1}},
+                    {"$sort": {"estado": 1}},
+                ],
+                "porTipo": [
+                    {"$group": {"_id": "$tipo", "eventos": {"$sum": 1}}},
+                    {"$project": {"_id": 0, "tipo": "$_id", "eventos": 1}},
+                    {"$sort": {"tipo": 1}},
+                ],
+                "porMes": [
+                    {"$group": {
+                        "_id": {
+                            "mes": {"$dateToString": {"format": "%Y-%m", "date": "$realizacion.fecha"}},
+                            "estado": "$estado",
+                            "tipo": "$tipo",
+                        },
+                        "eventos": {"$sum": 1},
+                    }},
+                    {"$project": {"_id": 0, "mes": "$_id.mes", "estado": "$_id.estado", "tipo": "$_id.tipo", "eventos": 1}},
+                    {"$sort": {"mes": 1, "estado": 1, "tipo": 1}},
+                ],
+            }},
+        ]
+        resultado = await EventoModel.get_motor_collection().aggregate(pipeline).to_list(length=1)
+        facetas = resultado[0] if resultado else {"porEstado": [], "porTipo": [], "porMes": []}
+        return {"total": sum(e["eventos"] for e in facetas["porEstado"]), **facetas}
+
+    return await en_cache(("eventos", desde, hasta), calcular)
+
+
+# ✅ Tasa de ocupación de cada instalación por día (minutos reservados / minutos de la jornada)
+async def ocupacion_instalaciones(
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    instalacion_id: Optional[str] = None,
+) -> List[dict]:
+    inicio_jornada = hora_a_minutos(settings.JORNADA_HORA_INICIO)
+    fin_jornada = hora_a_minutos(settings.JORNADA_HORA_FIN)
+    minutos_jornada = fin_jornada - inicio_jornada
+
+    async def calcular():
+        filtro = filtro_fechas("fecha", desde, hasta)
+        if instalacion_id:
+            filtro["instalacionId"] = instalacion_id
+
+        # Las reservas de una instalación no se cruzan entre sí: sumar sus minutos es exacto
+        pipeline = [
+            {"$match": filtro},
+            {"$project": {
+                "instalacionId": 1,
+                "fecha": 1,
+                "minutos": {"$max": [
+                    0,
+                    {"$subtract": [
+                        {"$min": ["$finMinutos", fin_jornada]},
+                        {"$max": ["$inicioMinutos", inicio_jornada]},
+                    ]},
+                ]},
+            }},
+            {"$group": {
+                "_id": {"instalacionId": "$instalacionId", "fecha": "$fecha"},
+                "minutosReservados": {"$sum": "$minutos"},
+                "reservas": {"$sum": 1},
+            }},
+            {"$project": {
+                "_id": 0,
+                "instalacionId": "$_id.instalacionId",
+                "fecha": {"$dateToString": {"format": "%Y-%m-%d", "date": "$_id.fecha"}},
+                "reservas": 1,
+                "minutosReservados": 1,
+                "tasaOcupacion": {"$round": [{"$divide": ["$minutosReservados", minutos_jornada]}, 4]},
+            }},
+            {"$sort": {"fecha": 1, "instalacionId": 1}},
+        ]
+        return await ReservaModel.get_motor_collection().aggregate(pipeline).to_list(length=None)
+
+    return await en_cache(("ocupacion", desde, hasta, instalacion_id), calcular)
+
+
+# ✅ Aprobaciones y rechazos por evaluador
+async def evaluaciones_por_evaluador(desde: Optional[date] = None, hasta: Optional[date] = None) -> List[dict]:
+    async def calcular():
+        pipeline = [
+            {"$match": filtro_fechas("fechaEvaluacion", desde, hasta)},
+            {"$group": {
+                "_id": "$usuarioId",
+                "aprobadas": {"$sum": {"$cond": [{"$eq": ["$estado", "aprobado"]}, 1, 0]}},
+                "rechazadas": {"$sum": {"$cond": [{"$eq": ["$estado", "rechazado"]}, 1, 0]}},
+                "total": {"$sum": 1},
+            }},
+            {"$lookup": {"from": "usuario", "localField": "_id", "foreignField": "_id", "as": "usuario"}},
+            {"$unwind": {"path": "$usuario", "preserveNullAndEmptyArrays": True}},
+            {"$project": {
+                "_id": 0,
+                "usuarioId": "$_id",
+                "nombre": {"$trim": {"input": {"$concat": [
+                    {"$ifNull": ["$usuario.nombre", ""]}, " ", {"$ifNull": ["$usuario.apellidos", ""]},
+                ]}}},
+                "aprobadas": 1,
+                "rechazadas": 1,
+                "total": 1,
+                "tasaAprobacion": {"$round": [{"$divide": ["$aprobadas", "$total"]}, 4]},
+            }},
+            {"$sort": {"total": -1, "usuarioId": 1}},
+        ]
+        return await EvaluacionModel.get_motor_collection().aggregate(pipeline).to_list(length=None)
+
+    return await en_cache(("evaluadores", desde, hasta), calcular)
+
+
+# 🔹 Facultad de cada programa y unidad académica (el catálogo de facultades es pequeño)
+async def mapa_facultades() -> dict:
+    mapa = {}
+    async for facultad in FacultadModel.get_motor_collection().find(
+        {}, {"nombre": 1, "programa.programaId": 1, "unidadAcademica.unidadId": 1}
+    ):
+        referencia = {"facultadId": facultad["_id"], "nombre": facultad.get("nombre")}
+        mapa[facultad["_id"]] = referencia
+        for programa in facultad.get("programa") or []:
+            mapa[programa.get("programaId")] = referencia
+        for unidad in facultad.get("unidadAcademica") or []:
+            mapa[unidad.get("unidadId")] = referencia
+    return mapa
+
+
+# ✅ Organizadores (y sus eventos) por facultad
+async def organizadores_por_facultad() -> List[dict]:
+    async def calcular():
+        # En Mongo: organizadores distintos, sus eventos y sus vinculaciones activas.
+        # Estudiantes y docentes no tienen facultadId: se llega a la facultad por programa o unidad.
+        pipeline = [
+            {"$unwind": "$organizador"},
+            {"$group": {"_id": "$organizador.usuarioId", "eventos": {"$addToSet": "$_id"}}},
+            {"$lookup": {"from": "usuario", "localField": "_id", "foreignField": "_id", "as": "usuario"}},
+            {"$unwind": "$usuario"},
+            {"$unwind": "$usuario.vinculacion"},
+            {"$match": {"usuario.vinculacion.estado": {"$ne": "inactivo"}}},
+            {"$project": {
+                "eventos": 1,
+                "facultadId": "$usuario.vinculacion.facultadId",
+                "programaId": "$usuario.vinculacion.programaId",
+                "unidadId": "$usuario.vinculacion.unidadId",
+            }},
+        ]
+        vinculaciones = await EventoModel.get_motor_collection().aggregate(pipeline).to_list(length=None)
+
+        facultades = await mapa_facultades()
+        grupos = {}
+        for vinculacion in vinculaciones:
+            facultad = next(
+                (
+                    facultades[clave]
+                    for clave in (vinculacion.get("facultadId"), vinculacion.get("programaId"), vinculacion.get("unidadId"))
+                    if clave in facultades
+                ),
+                None
+            )
+            if facultad is None:
+                continue
+            grupo = grupos.setdefault(facultad["facultadId"], {**facultad, "organizadores": set(), "eventos": set()})
+            grupo["organizadores"].add(vinculacion["_id"])
+            grupo["eventos"].update(vinculacion["eventos"])
+
+        return sorted(
+            (
+                {
+                    "facultadId": g["facultadId"],
+                    "nombre": g["nombre"],
+                    "organizadores": len(g["organizadores"]),
+                    "eventos": len(g["eventos"]),
+                }
+                for g in grupos.values()
+            ),
+            key=lambda g: (-g["organizadores"], g["nombre"] or "")
+        )
+
+    return await en_cache(("facultades",), calcular)
@@ -1,114 +1,281 @@
-from typing import List
-from beanie import PydanticObjectId
+from typing import AsyncIterator, List, Optional, Tuple
+from datetime import datetime
 from fastapi import HTTPException, status
 from bson import ObjectId
 
-from app.models.evaluaciones import EvaluacionModel
+from app.core.cache import cache_lecturas
+from app.services.cambios_service import difusor_cambios
+from app.core.respuestas import a_json
+from app.core.condicional import (
+    campos_modificados,
+    error_sin_coincidencia,
+    filtro_version,
+    ultima_modificacion,
+    validadores_json
+)
+from app.models.evaluaciones import EvaluacionModel, EstadoEvaluacionEnum
+from app.models.eventos import EventoModel
+from app.schemas.common import PyObjectId
 from app.schemas.evaluacion_schema import (
     EvaluacionCrear,
     EvaluacionActualizar,
     Evaluacion
 )
-from app.models.usuarios import UsuarioModel, RolUsuarioEnum, EstadoVinculacionEnum
-
-
-# ✅ Crear evaluación
-async def crear_evaluacion(data: EvaluacionCrear) -> Evaluacion:
-    # Verificar que el usuario exista
-    usuario = await UsuarioModel.find_one(UsuarioModel.id == data.usuarioId)
-    if not usuario:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Usuario con ID {data.usuarioId} no encontrado"
-        )
+from app.crud.adjunto_crud import guardar_adjunto, guardar_adjunto_stream, eliminar_adjuntos
 
-    # Verificar que el usuario tenga rol activo de secretaria académica
-    roles_activos = [
-        v.rol for v in usuario.vinculacion
-        if v.estado == EstadoVinculacionEnum.ACTIVO
-    ]
-
-    if RolUsuarioEnum.SECRETARIA not in roles_activos:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Solo una secretaria académica puede realizar una evaluación"
-        )
 
+# ✅ Construir la evaluación a crear; la inserción la hace el flujo de evaluación
+# (evaluacion_service), que cambia el estado del evento en la misma transacción
+async def preparar_evaluacion(data: EvaluacionCrear) -> EvaluacionModel:
     # ⚠️ Convertir eventoId a ObjectId (evita error de validación)
     data_dict = data.dict()
     if "eventoId" in data_dict and isinstance(data_dict["eventoId"], str):
         data_dict["eventoId"] = ObjectId(data_dict["eventoId"])
 
-    evaluacion = EvaluacionModel(**data_dict)
-    await evaluacion.insert()
-    return evaluacion
+    # El acta enviada en línea se guarda en GridFS
+    data_dict["_id"] = PyObjectId()
+    acta = data_dict.pop("actaAprovacion", None)
+    if acta:
+        data_dict["actaAprovacionId"] = await guardar_adjunto(
+            acta, f"acta-{data_dict['_id']}.pdf", {"evaluacionId": data_dict["_id"]}
+        )
 
+    return EvaluacionModel(**data_dict)
 
-# ✅ Listar todas las evaluaciones
-async def listar_evaluaciones() -> List[Evaluacion]:
-    return await EvaluacionModel.find_all().to_list()
 
+# 🔹 Campos del listado (el acta en línea de documentos aún no migrados nunca se devuelve)
+CAMPOS_EVALUACION = ["estado", "fechaEvaluacion", "justificacion", "actaAprovacionId", "eventoId", "usuarioId"]
+PROYECCION_EVALUACION = {campo: 1 for campo in CAMPOS_EVALUACION}
+difusor_cambios.registrar("evaluacion", CAMPOS_EVALUACION + ["version", "actualizadoEn"])
 
-# ✅ Obtener evaluación por ID
-async def obtener_evaluacion(id: str) -> Evaluacion:
-    try:
-        evaluacion = await EvaluacionModel.get(PydanticObjectId(id))
-    except Exception:
+# 🔹 Campos que deciden el estado del evento: solo cambian con una evaluación nueva (FlujoEvaluacion)
+CAMPOS_FLUJO_EVALUACION = ["estado", "eventoId", "usuarioId"]
+
+
+# 🔹 Utilidad: resumen de evaluaciones ordenadas de la más reciente a la más antigua
+def resumir_evaluaciones(evaluaciones: List[dict]) -> dict:
+    ultima = evaluaciones[0] if evaluaciones else {}
+    return {
+        "total": len(evaluaciones),
+        "aprobadas": sum(1 for e in evaluaciones if e.get("estado") == EstadoEvaluacionEnum.APROBADO.value),
+        "rechazadas": sum(1 for e in evaluaciones if e.get("estado") == EstadoEvaluacionEnum.RECHAZADO.value),
+        "ultimaEvaluacion": ultima.get("fechaEvaluacion"),
+        "estadoUltimaEvaluacion": ultima.get("estado"),
+    }
+
+
+# ✅ Listar evaluaciones filtradas (paginación por cursor sobre _id)
+async def listar_evaluaciones(
+    limite: int = 50,
+    despues: Optional[str] = None,
+    evento_id: Optional[str] = None,
+    usuario_id: Optional[int] = None,
+    estado: Optional[EstadoEvaluacionEnum] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    filtro = {}
+    if despues:
+        if not ObjectId.is_valid(despues):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido")
+        filtro["_id"] = {"$gt": ObjectId(despues)}
+    if evento_id:
+        if not ObjectId.is_valid(evento_id):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="eventoId inválido")
+        filtro["eventoId"] = ObjectId(evento_id)
+    if usuario_id is not None:
+        filtro["usuarioId"] = usuario_id
+    if estado:
+        filtro["estado"] = estado.value
+
+    # Se pide un documento de más para saber si existe una página siguiente
+    cursor = (
+        EvaluacionModel.get_motor_collection()
+        .find(filtro, PROYECCION_EVALUACION)
+        .sort("_id", 1)
+        .limit(limite + 1)
+    )
+    evaluaciones = await cursor.to_list(length=limite + 1)
+
+    siguiente = None
+    if len(evaluaciones) > limite:
+        evaluaciones = evaluaciones[:limite]
+        siguiente = str(evaluaciones[-1]["_id"])
+    return evaluaciones, siguiente
+
+
+# ✅ Evaluaciones de un evento con su resumen (índice evento_fecha: filtro y orden en una sola pasada)
+async def listar_evaluaciones_evento(evento_id: str) -> dict:
+    if not ObjectId.is_valid(evento_id):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ID inválido")
+    evento_oid = ObjectId(evento_id)
+
+    if not await EventoModel.get_motor_collection().count_documents({"_id": evento_oid}, limit=1):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Evento no encontrado")
+
+    evaluaciones = await (
+        EvaluacionModel.get_motor_collection()
+        .find({"eventoId": evento_oid}, PROYECCION_EVALUACION)
+        .sort("fechaEvaluacion", -1)
+        .to_list(length=None)
+    )
+    return {
+        "eventoId": evento_oid,
+        "resumen": resumir_evaluaciones(evaluaciones),
+        "evaluaciones": evaluaciones,
+    }
+
+
+# 🔹 Las evaluaciones leídas por ID se guardan en la caché compartida ya serializadas a JSON
+PREFIJO_CACHE = "evaluacion"
+
+
+def convertir_id_evaluacion(id: str) -> ObjectId:
+    if not ObjectId.is_valid(id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="El ID enviado no es un ObjectId válido"
         )
+    return ObjectId(id)
+
+
+async def cargar_evaluacion(evaluacion_id: ObjectId) -> Optional[bytes]:
+    evaluacion = await EvaluacionModel.get(evaluacion_id)
+    return a_json(evaluacion) if evaluacion else None
+
 
-    if not evaluacion:
+# ✅ Obtener evaluación por ID (a través de la caché) como el JSON guardado, sin volver a validarlo
+async def obtener_evaluacion_json(id: str) -> bytes:
+    evaluacion_id = convertir_id_evaluacion(id)
+    datos = await cache_lecturas.leer(PREFIJO_CACHE, str(evaluacion_id), lambda: cargar_evaluacion(evaluacion_id))
+    if datos is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Evaluación no encontrada"
         )
+    return datos
 
-    return evaluacion
 
+# ✅ Obtener evaluación por ID como modelo (para las operaciones sobre su acta)
+async def obtener_evaluacion(id: str) -> Evaluacion:
+    return EvaluacionModel.model_validate_json(await obtener_evaluacion_json(id))
 
-# ✅ Actualizar evaluación
-async def actualizar_evaluacion(id: str, data: EvaluacionActualizar) -> Evaluacion:
-    try:
-        evaluacion = await EvaluacionModel.get(PydanticObjectId(id))
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="El ID enviado no es un ObjectId válido"
-        )
 
-    if not evaluacion:
+async def invalidar_evaluacion(evaluacion_id: ObjectId):
+    await cache_lecturas.invalidar(PREFIJO_CACHE, str(evaluacion_id))
+
+
+# ✅ Versión y fecha de modificación de una evaluación (lectura mínima para el GET condicional)
+async def obtener_validadores_evaluacion(id: str) -> Tuple[int, datetime]:
+    evaluacion_id = convertir_id_evaluacion(id)
+
+    # Si la evaluación está en caché no hace falta ir a MongoDB
+    datos = await cache_lecturas.consultar(PREFIJO_CACHE, str(evaluacion_id))
+    if datos is not None:
+        return validadores_json(datos)
+
+    documento = await EvaluacionModel.get_motor_collection().find_one(
+        {"_id": evaluacion_id}, {"version": 1, "actualizadoEn": 1}
+    )
+    if not documento:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Evaluación no encontrada"
         )
+    return documento.get("version", 0), ultima_modificacion(documento["_id"], documento.get("actualizadoEn"))
 
-    actualizaciones = data.model_dump(exclude_unset=True)
 
-    # ⚠️ Convertir eventoId a ObjectId si viene en string
-    if "eventoId" in actualizaciones and isinstance(actualizaciones["eventoId"], str):
-        actualizaciones["eventoId"] = ObjectId(actualizaciones["eventoId"])
+# ✅ Modificar una evaluación con un único find_one_and_update, sin leerla antes. Se pide el documento
+# anterior con los campos que cambian (de ahí sale el acta a reemplazar) y se le aplican los cambios.
+# Con completo=True (PUT) se devuelve la evaluación entera; si no (PATCH), solo los campos modificados.
+async def parchear_evaluacion(
+    id: str,
+    data: EvaluacionActualizar,
+    version: Optional[int] = None,
+    completo: bool = False,
+) -> EvaluacionModel | dict:
+    evaluacion_id = convertir_id_evaluacion(id)
+    actualizaciones = campos_modificados(data, anulables={"justificacion", "actaAprovacion"})
 
-    await evaluacion.set(actualizaciones)
-    return evaluacion
+    # ⚠️ Cambiarlos aquí dejaría el evento en un estado que no corresponde a su última evaluación
+    bloqueados = [campo for campo in CAMPOS_FLUJO_EVALUACION if campo in actualizaciones]
+    if bloqueados:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"No se puede modificar {', '.join(bloqueados)} de una evaluación existente: registre una "
+                   f"nueva evaluación (POST /evaluaciones) para que el estado del evento cambie con ella."
+        )
 
+    # Un acta nueva reemplaza a la anterior en GridFS; null la elimina
+    if "actaAprovacion" in actualizaciones:
+        acta = actualizaciones.pop("actaAprovacion")
+        actualizaciones["actaAprovacionId"] = (
+            await guardar_adjunto(acta, f"acta-{evaluacion_id}.pdf", {"evaluacionId": evaluacion_id})
+            if acta else None
+        )
 
-# ✅ Eliminar evaluación
-async def eliminar_evaluacion(id: str):
+    coleccion = EvaluacionModel.get_motor_collection()
+    cambios = {**actualizaciones, "actualizadoEn": datetime.utcnow()}
+    campos = PROYECCION_EVALUACION if completo else {campo: 1 for campo in actualizaciones}
+    filtro = {"_id": evaluacion_id}
+    if version is not None:
+        filtro.update(filtro_version(version))
+    anterior = None
     try:
-        evaluacion = await EvaluacionModel.get(PydanticObjectId(id))
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="El ID enviado no es un ObjectId válido"
+        anterior = await coleccion.find_one_and_update(
+            filtro,
+            {"$set": cambios, "$inc": {"version": 1}},
+            projection={**campos, "version": 1},
         )
+    finally:
+        # Si la escritura no se aplicó, el acta recién guardada no la referencia nadie
+        if anterior is None and actualizaciones.get("actaAprovacionId"):
+            await eliminar_adjuntos(actualizaciones["actaAprovacionId"])
+
+    await invalidar_evaluacion(evaluacion_id)
+    if anterior is None:
+        raise await error_sin_coincidencia(coleccion, evaluacion_id, "Evaluación no encontrada")
+
+    if "actaAprovacionId" in actualizaciones:
+        await eliminar_adjuntos(anterior.get("actaAprovacionId"))
+
+    resultado = {**anterior, **cambios, "version": anterior.get("version", 0) + 1}
+    evaluacion = EvaluacionModel.model_validate(resultado) if completo else resultado
+    difusor_cambios.publicar_local("evaluacion", "update", evaluacion_id, evaluacion)
+    return evaluacion
 
-    if not evaluacion:
+
+# ✅ Actualizar evaluación (PUT): los mismos cambios que PATCH, devolviendo la evaluación completa
+async def actualizar_evaluacion(id: str, data: EvaluacionActualizar, version: Optional[int] = None) -> Evaluacion:
+    return await parchear_evaluacion(id, data, version, completo=True)
+
+
+# ✅ Subir el acta de aprobación en PDF (por fragmentos)
+async def subir_acta_evaluacion(id: str, fragmentos: AsyncIterator[bytes], tipo_contenido: Optional[str] = None) -> dict:
+    evaluacion = await obtener_evaluacion(id)
+
+    archivo_id = await guardar_adjunto_stream(
+        fragmentos, f"acta-{evaluacion.id}.pdf", tipo_contenido, {"evaluacionId": evaluacion.id}
+    )
+
+    # find_one_and_update devuelve el documento anterior: de ahí sale el archivo a reemplazar
+    anterior = await EvaluacionModel.get_motor_collection().find_one_and_update(
+        {"_id": evaluacion.id},
+        {"$set": {"actaAprovacionId": archivo_id, "actualizadoEn": datetime.utcnow()}, "$inc": {"version": 1}},
+        projection={"actaAprovacionId": 1}
+    )
+    if not anterior:
+        await eliminar_adjuntos(archivo_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Evaluación no encontrada"
         )
 
-    await evaluacion.delete()
-    return {"mensaje": "Evaluación eliminada correctamente"}
+    await invalidar_evaluacion(evaluacion.id)
+    difusor_cambios.publicar_local("evaluacion", "update", evaluacion.id)
+    await eliminar_adjuntos(anterior.get("actaAprovacionId"))
+    return {"mensaje": "Acta guardada correctamente", "actaAprovacionId": str(archivo_id)}
+
+
+# ✅ Obtener el ID del archivo del acta de aprobación
+async def obtener_acta_evaluacion(id: str) -> Optional[ObjectId]:
+    evaluacion = await obtener_evaluacion(id)
+    return evaluacion.actaAprovacionId
@@ -1,15 +1,60 @@
-from typing import List
+from typing import AsyncIterator, List, Optional, Set, Tuple
+from datetime import date, datetime, time, timedelta
 from beanie import PydanticObjectId
 from fastapi import HTTPException, status
 from bson import ObjectId
-
-from app.models.eventos import EventoModel
-from app.models.usuarios import UsuarioModel, RolUsuarioEnum, EstadoVinculacionEnum
-from app.schemas.evento_schema import EventoCreate, EventoUpdate, EventoResponse
-
-
-# ✅ Validar capacidad total de las instalaciones
+from gridfs.errors import NoFile
+from pymongo import ReturnDocument
+
+from app.models.eventos import EventoModel, EstadoEventoEnum, TipoEventoEnum, Realizacion
+from app.schemas.common import PyObjectId
+from app.schemas.evento_schema import EventoCreate, EventoUpdate
+from app.services.usuario_service import validar_roles_organizadores
+from app.crud.reserva_crud import (
+    construir_reservas,
+    buscar_conflicto,
+    error_instalacion_ocupada,
+    reservar_instalaciones,
+    liberar_reservas
+)
+from app.crud.adjunto_crud import guardar_adjunto, guardar_adjunto_stream, eliminar_adjuntos, revisar_adjunto, marcar_adjunto
+from app.crud.ocupacion_crud import hay_ocupacion
+from app.core.cache import cache_lecturas
+from app.services.cambios_service import difusor_cambios
+from app.services.trabajo_service import cola_trabajos
+from app.services.instalacion_service import catalogo_instalaciones
+from app.core.respuestas import a_json
+from app.core.condicional import (
+    campos_modificados,
+    error_sin_coincidencia,
+    error_version,
+    filtro_version,
+    ultima_modificacion,
+    validadores_json
+)
+from app.core.horario import normalizar_fecha
+from app.core.busqueda import terminos_documento
+from app.crud.evaluacion_crud import PROYECCION_EVALUACION, resumir_evaluaciones
+from app.models.evaluaciones import EvaluacionModel
+from app.models.trabajo import TrabajoModel
+
+
+# ✅ Validar instalaciones y capacidad contra el catálogo en memoria (sin consultas a MongoDB)
 async def validar_capacidad_evento(evento_data: EventoCreate | EventoUpdate):
+    await catalogo_instalaciones.asegurar()
+    for asignada in evento_data.realizacion.instalaciones:
+        instalacion = catalogo_instalaciones.obtener(asignada.instalacionId)
+        if not instalacion:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"La instalación {asignada.instalacionId} no existe."
+            )
+        if asignada.capacidadInstalacion > instalacion.capacidad:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"La capacidad asignada en {instalacion.id} ({asignada.capacidadInstalacion}) supera su capacidad ({instalacion.capacidad})."
+            )
+
     total_capacidad_instalaciones = sum(
         i.capacidadInstalacion for i in evento_data.realizacion.instalaciones
     )
@@ -22,68 +67,27 @@ async def validar_capacidad_evento(evento_data: EventoCreate | EventoUpdate):
 
 # ✅ Validar que los organizadores sean estudiantes o docentes
 async def validar_organizadores(evento_data: EventoCreate | EventoUpdate):
-    for organizador in evento_data.organizador:
-        usuario = await UsuarioModel.find_one(UsuarioModel.id == organizador.usuarioId)
-        if not usuario:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Usuario con ID {organizador.usuarioId} no encontrado."
-            )
-
-        roles_activos = [
-            v.rol for v in usuario.vinculacion
-            if v.estado == EstadoVinculacionEnum.ACTIVO
-        ]
-
-        # ❌ Si tiene rol de secretaria activa → no puede organizar
-        if RolUsuarioEnum.SECRETARIA in roles_activos:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"El usuario {usuario.nombre} {usuario.apellidos} no puede organizar eventos (rol: secretaria académica)."
-            )
-
-        # ✅ Solo estudiante o docente pueden organizar
-        if not any(r in [RolUsuarioEnum.ESTUDIANTE, RolUsuarioEnum.DOCENTE] for r in roles_activos):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"El usuario {usuario.nombre} {usuario.apellidos} debe ser estudiante o docente para organizar eventos."
-            )
+    await validar_roles_organizadores(o.usuarioId for o in evento_data.organizador)
 
 
 # ✅ Validar que las instalaciones no estén ocupadas
 async def validar_disponibilidad_instalaciones(evento_data: EventoCreate | EventoUpdate, evento_id: str | None = None):
-    fecha_nueva = evento_data.realizacion.fecha
-    inicio_nuevo = evento_data.realizacion.horaInicio
-    fin_nuevo = evento_data.realizacion.horaFin
-    instalaciones_nuevas = [i.instalacionId for i in evento_data.realizacion.instalaciones]
+    # Un evento nuevo todavía no tiene ID: se usa uno provisional que no excluye nada
+    evento_oid = ObjectId(evento_id) if evento_id else ObjectId()
+    reservas = construir_reservas(evento_oid, evento_data.realizacion)
 
-    if not (inicio_nuevo and fin_nuevo):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Debe especificar hora de inicio y hora de fin para el evento."
-        )
-
-    eventos_mismo_dia = await EventoModel.find({"realizacion.fecha": fecha_nueva}).to_list()
-
-    for evento in eventos_mismo_dia:
-        if evento_id and str(evento.id) == evento_id:
-            continue
+    # Si ninguna franja de 5 minutos está ocupada en el mapa, no puede haber cruce
+    if not evento_id and not await hay_ocupacion(reservas):
+        return
 
-        for instalacion in evento.realizacion.instalaciones:
-            if instalacion.instalacionId in instalaciones_nuevas:
-                if (
-                    (inicio_nuevo < evento.realizacion.horaFin)
-                    and (fin_nuevo > evento.realizacion.horaInicio)
-                ):
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"La instalación {instalacion.instalacionId} está ocupada el {fecha_nueva.strftime('%Y-%m-%d')} entre {evento.realizacion.horaInicio} y {evento.realizacion.horaFin}."
-                    )
+    conflicto = await buscar_conflicto(reservas, evento_oid)
+    if conflicto:
+        raise error_instalacion_ocupada(conflicto)
 
 
 # 🔹 Utilidad: convertir IDs de organización a ObjectId
 def convertir_ids_organizacion(data_dict: dict):
-    if "organizacion" in data_dict:
+    if data_dict.get("organizacion"):
         for org in data_dict["organizacion"]:
             if isinstance(org.get("organizacionId"), str):
                 try:
@@ -95,8 +99,66 @@ def convertir_ids_organizacion(data_dict: dict):
                     )
 
 
-# ✅ Crear evento
-async def crear_evento(data: EventoCreate) -> EventoResponse:
+# 🔹 Utilidad: IDs de todos los archivos GridFS referenciados por un evento
+# (model_dump() serializa los ObjectId como texto, por eso se normalizan)
+def ids_adjuntos_evento(evento_dict: dict) -> Set[ObjectId]:
+    ids = [o.get("avalPDFId") for o in evento_dict.get("organizador") or []]
+    ids += [o.get("certificadoParticipacionId") for o in evento_dict.get("organizacion") or []]
+    return {ObjectId(str(i)) for i in ids if i}
+
+
+# 🔹 PDFs que se pueden enviar en línea: arreglo -> (clave del subdocumento, campo en línea, referencia, prefijo)
+ADJUNTOS_EN_LINEA = {
+    "organizador": ("usuarioId", "avalPDF", "avalPDFId", "aval"),
+    "organizacion": ("organizacionId", "certificadoParticipacion", "certificadoParticipacionId", "certificado"),
+}
+TRABAJO_ADJUNTOS = "adjuntos_evento"
+
+
+# 🔹 Recibir los PDFs enviados en línea: se guardan en GridFS como pendientes y un trabajo en segundo
+# plano los valida y los asocia al evento; mientras tanto cada subdocumento conserva su archivo anterior
+async def recibir_adjuntos_evento(evento_id: ObjectId, data_dict: dict, anterior: Optional[dict] = None) -> List[dict]:
+    pendientes = []
+    try:
+        for arreglo, (clave, binario, referencia, prefijo) in ADJUNTOS_EN_LINEA.items():
+            previos = {
+                str(s[clave]): ObjectId(str(s[referencia]))
+                for s in (anterior or {}).get(arreglo) or [] if s.get(referencia)
+            }
+            for subdocumento in data_dict.get(arreglo) or []:
+                contenido = subdocumento.pop(binario, None)
+                valor = subdocumento[clave]
+                subdocumento[referencia] = previos.get(str(valor))
+                if contenido:
+                    archivo_id = await guardar_adjunto(
+                        contenido,
+                        f"{prefijo}-{evento_id}-{valor}.pdf",
+                        {"eventoId": evento_id, clave: valor, "estado": "pendiente"}
+                    )
+                    # Los ObjectId (organizacionId) viajan como texto en los datos del trabajo
+                    pendientes.append({
+                        "arreglo": arreglo,
+                        "valor": valor if isinstance(valor, int) else str(valor),
+                        "archivoId": str(archivo_id),
+                    })
+    except Exception:
+        await eliminar_adjuntos(*archivos_pendientes(pendientes))
+        raise
+    return pendientes
+
+
+def archivos_pendientes(pendientes: List[dict]) -> List[ObjectId]:
+    return [ObjectId(p["archivoId"]) for p in pendientes]
+
+
+async def encolar_adjuntos_evento(evento_id: ObjectId, pendientes: List[dict]) -> Optional[TrabajoModel]:
+    if not pendientes:
+        return None
+    return await cola_trabajos.encolar(TRABAJO_ADJUNTOS, {"adjuntos": pendientes}, evento_id)
+
+
+# ✅ Crear evento (con PDFs en línea devuelve también el trabajo que los procesa)
+async def crear_evento(data: EventoCreate) -> Tuple[EventoModel, Optional[TrabajoModel]]:
     await validar_capacidad_evento(data)
     await validar_organizadores(data)
     await validar_disponibilidad_instalaciones(data)
@@ -104,49 +166,347 @@ async def crear_evento(data: EventoCreate) -> EventoResponse:
     data_dict = data.model_dump()
     convertir_ids_organizacion(data_dict)
 
-    evento = EventoModel(**data_dict)
-    await evento.insert()
-    return EventoResponse(**evento.model_dump())
+    evento_id = PyObjectId()
+    await reservar_instalaciones(evento_id, data.realizacion)
+    pendientes = []
+    insertado = False
+    try:
+        pendientes = await recibir_adjuntos_evento(evento_id, data_dict)
+        evento = EventoModel(_id=evento_id, **data_dict)
+        await evento.insert()
+        insertado = True
+        trabajo = await encolar_adjuntos_evento(evento_id, pendientes)
+    except Exception:
+        if insertado:
+            await evento.delete()
+        await liberar_reservas(evento_id)
+        await eliminar_adjuntos(*archivos_pendientes(pendientes))
+        raise
+    difusor_cambios.publicar_local("evento", "insert", evento.id, evento)
+    return evento, trabajo
+
+
+# 🔹 Proyección de listados: los PDFs están en GridFS y solo viaja su referencia.
+# Siempre se proyectan campos conocidos: el listado se serializa sin pasar por Pydantic, así que
+# los binarios en línea de documentos aún no migrados (u otros campos internos) nunca se devuelven.
+CAMPOS_ORGANIZADOR = ["organizador.usuarioId", "organizador.avalPDFId", "organizador.tipoAval", "organizador.tipo"]
+CAMPOS_ORGANIZACION = [
+    "organizacion.organizacionId",
+    "organizacion.participante",
+    "organizacion.nombreParticipante",
+    "organizacion.certificadoParticipacionId",
+]
+CAMPOS_EVENTO = {
+    "nombre": ["nombre"],
+    "estado": ["estado"],
+    "tipo": ["tipo"],
+    "realizacion": ["realizacion"],
+    "organizador": CAMPOS_ORGANIZADOR,
+    "organizacion": CAMPOS_ORGANIZACION,
+    "capacidad": ["capacidad"],
+}
+
+
+# Los mismos campos son los que difunde el flujo de cambios (GET /eventos/stream)
+difusor_cambios.registrar("evento", [r for rutas in CAMPOS_EVENTO.values() for r in rutas] + ["version", "actualizadoEn"])
+
+
+def construir_proyeccion(campos: Optional[List[str]]) -> dict:
+    if not campos:
+        campos = list(CAMPOS_EVENTO)
+
+    proyeccion = {}
+    for campo in campos:
+        if campo not in CAMPOS_EVENTO:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"El campo '{campo}' no se puede proyectar. Campos válidos: {', '.join(CAMPOS_EVENTO)}."
+            )
+        for ruta in CAMPOS_EVENTO[campo]:
+            proyeccion[ruta] = 1
+    return proyeccion
+
 
+# 🔹 Relaciones que se pueden incluir en las lecturas de eventos (?expand=)
+EXPANSIONES_EVENTO = ["evaluaciones"]
 
-# ✅ Listar eventos
-async def listar_eventos() -> List[EventoResponse]:
-    eventos = await EventoModel.find_all().to_list()
-    return [EventoResponse(**e.model_dump()) for e in eventos]
 
+def validar_expansiones(expandir: Optional[List[str]]) -> Set[str]:
+    for expansion in expandir or []:
+        if expansion not in EXPANSIONES_EVENTO:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"No se puede expandir '{expansion}'. Valores válidos: {', '.join(EXPANSIONES_EVENTO)}."
+            )
+    return set(expandir or [])
+
+
+# 🔹 Etapa $lookup: las evaluaciones de todos los eventos de la página en la misma consulta
+# (el cruce por eventoId usa el índice evento_fecha; el $project interno deja solo los campos del listado,
+# así las actas en línea de evaluaciones aún no migradas nunca entran al pipeline)
+def etapas_evaluaciones() -> List[dict]:
+    return [
+        {"$lookup": {
+            "from": EvaluacionModel.Settings.name,
+            "localField": "_id",
+            "foreignField": "eventoId",
+            "pipeline": [{"$project": PROYECCION_EVALUACION}],
+            "as": "evaluaciones",
+        }},
+    ]
+
+
+def agregar_resumen_evaluaciones(eventos: List[dict]) -> List[dict]:
+    for evento in eventos:
+        evento["evaluaciones"] = sorted(
+            evento.get("evaluaciones") or [], key=lambda e: e["fechaEvaluacion"], reverse=True
+        )
+        evento["resumenEvaluaciones"] = resumir_evaluaciones(evento["evaluaciones"])
+    return eventos
+
+
+# ✅ Listar eventos (paginación por cursor sobre _id)
+async def listar_eventos(
+    limite: int = 50,
+    despues: Optional[str] = None,
+    estado: Optional[EstadoEventoEnum] = None,
+    tipo: Optional[TipoEventoEnum] = None,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    campos: Optional[List[str]] = None,
+    expandir: Optional[List[str]] = None,
+    inicio_desde: Optional[datetime] = None,
+    inicio_hasta: Optional[datetime] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    expansiones = validar_expansiones(expandir)
+    filtro = {}
+    if despues:
+        if not ObjectId.is_valid(despues):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido")
+        filtro["_id"] = {"$gt": ObjectId(despues)}
+    if estado:
+        filtro["estado"] = estado.value
+    if tipo:
+        filtro["tipo"] = tipo.value
+    if desde or hasta:
+        filtro["realizacion.fecha"] = {}
+        if desde:
+            filtro["realizacion.fecha"]["$gte"] = datetime.combine(desde, time.min)
+        if hasta:
+            filtro["realizacion.fecha"]["$lt"] = datetime.combine(hasta + timedelta(days=1), time.min)
+    # Instantes UTC (p. ej. los eventos que empiezan en las próximas dos horas): índice inicio_fin
+    if inicio_desde or inicio_hasta:
+        filtro["realizacion.inicio"] = {}
+        if inicio_desde:
+            filtro["realizacion.inicio"]["$gte"] = normalizar_fecha(inicio_desde)
+        if inicio_hasta:
+            filtro["realizacion.inicio"]["$lt"] = normalizar_fecha(inicio_hasta)
+
+    # Se pide un documento de más para saber si existe una página siguiente
+    coleccion = EventoModel.get_motor_collection()
+    proyeccion = construir_proyeccion(campos)
+    if "evaluaciones" in expansiones:
+        pipeline = [
+            {"$match": filtro},
+            {"$sort": {"_id": 1}},
+            {"$limit": limite + 1},
+            {"$project": proyeccion},
+            *etapas_evaluaciones(),
+        ]
+        eventos = agregar_resumen_evaluaciones(await coleccion.aggregate(pipeline).to_list(length=limite + 1))
+    else:
+        cursor = coleccion.find(filtro, proyeccion).sort("_id", 1).limit(limite + 1)
+        eventos = await cursor.to_list(length=limite + 1)
 
-# ✅ Obtener evento por ID
-async def obtener_evento(id: str) -> EventoResponse:
-    try:
-        evento = await EventoModel.get(PydanticObjectId(id))
-    except Exception:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ID inválido")
+    siguiente = None
+    if len(eventos) > limite:
+        eventos = eventos[:limite]
+        siguiente = str(eventos[-1]["_id"])
+    return eventos, siguiente
 
-    if not evento:
+
+# 🔹 Los eventos leídos por ID se guardan en la caché compartida ya serializados a JSON
+PREFIJO_CACHE = "evento"
+
+
+async def cargar_evento(evento_id: ObjectId) -> Optional[bytes]:
+    evento = await EventoModel.get(evento_id)
+    return a_json(evento) if evento else None
+
+
+# ✅ Obtener evento por ID (a través de la caché): el JSON guardado se devuelve sin volver a validarlo
+async def obtener_evento_json(id: str) -> bytes:
+    evento_id = convertir_id_evento(id)
+    datos = await cache_lecturas.leer(PREFIJO_CACHE, str(evento_id), lambda: cargar_evento(evento_id))
+    if datos is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Evento no encontrado")
+    return datos
 
-    return EventoResponse(**evento.model_dump())
 
+async def invalidar_evento(evento_id: ObjectId):
+    await cache_lecturas.invalidar(PREFIJO_CACHE, str(evento_id))
 
-# ✅ Actualizar evento
-async def actualizar_evento(id: str, data: EventoUpdate) -> EventoResponse:
-    try:
-        evento = await EventoModel.get(PydanticObjectId(id))
-    except Exception:
+
+# ✅ Versión y fecha de modificación de un evento (lectura mínima para el GET condicional)
+async def obtener_validadores_evento(id: str) -> Tuple[int, datetime]:
+    # Si el evento está en caché no hace falta ir a MongoDB
+    datos = await cache_lecturas.consultar(PREFIJO_CACHE, str(convertir_id_evento(id)))
+    if datos is not None:
+        return validadores_json(datos)
+
+    documento = await EventoModel.get_motor_collection().find_one(
+        {"_id": convertir_id_evento(id)}, {"version": 1, "actualizadoEn": 1}
+    )
+    if not documento:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Evento no encontrado")
+    return documento.get("version", 0), ultima_modificacion(documento["_id"], documento.get("actualizadoEn"))
+
+
+# ✅ Obtener evento por ID con sus evaluaciones (una sola consulta)
+async def obtener_evento_expandido(id: str, expandir: List[str]) -> dict:
+    expansiones = validar_expansiones(expandir)
+    if not ObjectId.is_valid(id):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ID inválido")
 
-    if not evento:
+    pipeline = [{"$match": {"_id": ObjectId(id)}}, {"$project": construir_proyeccion(None)}]
+    if "evaluaciones" in expansiones:
+        pipeline += etapas_evaluaciones()
+    eventos = await EventoModel.get_motor_collection().aggregate(pipeline).to_list(length=1)
+    if not eventos:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Evento no encontrado")
 
-    await validar_capacidad_evento(data)
-    await validar_organizadores(data)
-    await validar_disponibilidad_instalaciones(data, evento_id=id)
+    if "evaluaciones" in expansiones:
+        agregar_resumen_evaluaciones(eventos)
+    return eventos[0]
+
+
+# 🔹 Campos guardados que hacen falta para validar y aplicar un cambio parcial (el resto no se lee)
+def proyeccion_parche(campos: Set[str]) -> dict:
+    proyeccion = {}
+    if campos & {"capacidad", "realizacion"}:
+        proyeccion.update({"capacidad": 1, "realizacion": 1})
+    if campos & {"nombre", "organizacion"}:
+        proyeccion.update({"nombre": 1, "organizacion.nombreParticipante": 1})
+    for arreglo, (clave, _, referencia, _) in ADJUNTOS_EN_LINEA.items():
+        if arreglo in campos:
+            proyeccion.update({f"{arreglo}.{clave}": 1, f"{arreglo}.{referencia}": 1})
+    return proyeccion
+
+
+# 🔹 Campos que solo cambian con las evaluaciones del evento (FlujoEvaluacion)
+CAMPOS_FLUJO_EVENTO = ["estado"]
+
+
+# 🔹 Lo que devuelve PATCH: los campos modificados, más estado y tipo (filtros del flujo de cambios) y los validadores
+def proyeccion_respuesta_parche(campos: Set[str]) -> dict:
+    return {**construir_proyeccion([*campos, "estado", "tipo"]), "version": 1, "actualizadoEn": 1}
+
+
+# ✅ Modificar un evento: se valida solo lo enviado (junto con los campos guardados que la validación
+# necesite) y se escribe con un único find_one_and_update. Con completo=True (PUT) se devuelve el evento
+# entero; si no (PATCH), solo los campos modificados.
+async def parchear_evento(
+    id: str,
+    data: EventoUpdate,
+    version: Optional[int] = None,
+    completo: bool = False,
+) -> Tuple[EventoModel | dict, Optional[TrabajoModel]]:
+    evento_id = convertir_id_evento(id)
+    actualizaciones = campos_modificados(data, anulables={"organizacion"})
+    bloqueados = [campo for campo in CAMPOS_FLUJO_EVENTO if campo in actualizaciones]
+    if bloqueados:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"No se puede modificar {', '.join(bloqueados)} de un evento: cambia al registrar o eliminar "
+                   f"sus evaluaciones (POST /evaluaciones)."
+        )
+    campos = set(actualizaciones)
+    coleccion = EventoModel.get_motor_collection()
+
+    guardado = {}
+    proyeccion = proyeccion_parche(campos)
+    if proyeccion:
+        guardado = await coleccion.find_one({"_id": evento_id}, {**proyeccion, "version": 1})
+        if not guardado:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Evento no encontrado")
+        if version is not None and guardado.get("version", 0) != version:
+            raise error_version(guardado.get("version", 0))
+
+    if campos & {"capacidad", "realizacion"}:
+        await validar_capacidad_evento(EventoUpdate(
+            capacidad=actualizaciones["capacidad"] if "capacidad" in campos else guardado.get("capacidad"),
+            realizacion=data.realizacion if "realizacion" in campos else guardado.get("realizacion"),
+        ))
+    if "organizador" in campos:
+        await validar_organizadores(data)
+    if "realizacion" in campos:
+        await validar_disponibilidad_instalaciones(data, evento_id=str(evento_id))
 
-    actualizaciones = data.model_dump(exclude_unset=True)
     convertir_ids_organizacion(actualizaciones)
+    if "realizacion" in campos:
+        # Se guardan también los instantes inicio/fin calculados por el modelo
+        actualizaciones["realizacion"] = Realizacion(**actualizaciones["realizacion"]).model_dump()
+    if campos & {"nombre", "organizacion"}:
+        actualizaciones["terminos"] = terminos_documento("evento", {**guardado, **actualizaciones})
+
+    pendientes = []
+
+    async def deshacer():
+        await eliminar_adjuntos(*archivos_pendientes(pendientes))
+        if "realizacion" in campos:
+            # Las reservas vuelven a ser las del evento tal como quedó guardado
+            actual = await coleccion.find_one({"_id": evento_id}, {"realizacion": 1})
+            if actual:
+                await reservar_instalaciones(evento_id, Realizacion(**actual["realizacion"]))
+            else:
+                await liberar_reservas(evento_id)
+
+    if "realizacion" in campos:
+        await reservar_instalaciones(evento_id, data.realizacion)
+    # Lo validado corresponde a la versión leída: si otra petición la cambia, la escritura no se aplica
+    filtro = {"_id": evento_id}
+    if version is not None or guardado:
+        filtro.update(filtro_version(version if version is not None else guardado.get("version", 0)))
+    try:
+        pendientes = await recibir_adjuntos_evento(evento_id, actualizaciones, guardado)
+        documento = await coleccion.find_one_and_update(
+            filtro,
+            {"$set": {**actualizaciones, "actualizadoEn": datetime.utcnow()}, "$inc": {"version": 1}},
+            projection=None if completo else proyeccion_respuesta_parche(campos),
+            return_document=ReturnDocument.AFTER,
+        )
+    except Exception:
+        await deshacer()
+        raise
+
+    await invalidar_evento(evento_id)
+    if documento is None:
+        await deshacer()
+        error = await error_sin_coincidencia(coleccion, evento_id, "Evento no encontrado")
+        if version is None and error.status_code == status.HTTP_412_PRECONDITION_FAILED:
+            # El cliente no pidió una versión: el conflicto es con lo leído para validar
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="El evento se modificó mientras se aplicaba el cambio; intente de nuevo."
+            )
+        raise error
 
-    await evento.set(actualizaciones)
-    return EventoResponse(**evento.model_dump())
+    # Los archivos que ya no referencia el evento se eliminan de GridFS
+    huerfanos = ids_adjuntos_evento(guardado) - ids_adjuntos_evento({**guardado, **actualizaciones})
+    await eliminar_adjuntos(*huerfanos)
+    resultado = EventoModel.model_validate(documento) if completo else documento
+    difusor_cambios.publicar_local("evento", "update", evento_id, resultado)
+    try:
+        trabajo = await encolar_adjuntos_evento(evento_id, pendientes)
+    except Exception:
+        await eliminar_adjuntos(*archivos_pendientes(pendientes))
+        raise
+    return resultado, trabajo
+
+
+# ✅ Actualizar evento (PUT): los mismos cambios que PATCH, devolviendo el evento completo
+async def actualizar_evento(id: str, data: EventoUpdate, version: Optional[int] = None) -> Tuple[EventoModel, Optional[TrabajoModel]]:
+    return await parchear_evento(id, data, version, completo=True)
 
 
 # ✅ Eliminar evento
@@ -160,4 +520,142 @@ async def eliminar_evento(id: str):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Evento no encontrado")
 
     await evento.delete()
+    await invalidar_evento(evento.id)
+    difusor_cambios.publicar_local("evento", "delete", evento.id)
+    await liberar_reservas(evento.id)
+    await eliminar_adjuntos(*ids_adjuntos_evento(evento.model_dump()))
     return {"mensaje": "Evento eliminado correctamente"}
+
+
+# 🔹 Utilidad: validar el ID de un evento
+def convertir_id_evento(id: str) -> ObjectId:
+    if not ObjectId.is_valid(id):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ID inválido")
+    return ObjectId(id)
+
+
+# 🔹 Reemplazar el archivo de un subdocumento (organizador u organización) de un evento
+async def reemplazar_adjunto_subdocumento(
+    id: str,
+    arreglo: str,
+    clave: str,
+    valor,
+    campo: str,
+    fragmentos: AsyncIterator[bytes],
+    tipo_contenido: Optional[str],
+    nombre: str,
+) -> ObjectId:
+    coleccion = EventoModel.get_motor_collection()
+    filtro = {"_id": convertir_id_evento(id), f"{arreglo}.{clave}": valor}
+    if not await coleccion.count_documents(filtro, limit=1):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Evento u {arreglo} no encontrado")
+
+    archivo_id = await guardar_adjunto_stream(
+        fragmentos, nombre, tipo_contenido, {"eventoId": filtro["_id"], clave: valor}
+    )
+    if not await vincular_adjunto(filtro["_id"], arreglo, clave, valor, campo, archivo_id):
+        await eliminar_adjuntos(archivo_id)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Evento no encontrado")
+    return archivo_id
+
+
+# 🔹 Apuntar el subdocumento al archivo nuevo y eliminar el que tenía (False si el evento o el subdocumento ya no existen)
+async def vincular_adjunto(evento_id: ObjectId, arreglo: str, clave: str, valor, campo: str, archivo_id: ObjectId) -> bool:
+    # find_one_and_update devuelve el documento anterior: de ahí sale el archivo a reemplazar
+    anterior = await EventoModel.get_motor_collection().find_one_and_update(
+        {"_id": evento_id, f"{arreglo}.{clave}": valor},
+        {"$set": {f"{arreglo}.$.{campo}": archivo_id, "actualizadoEn": datetime.utcnow()}, "$inc": {"version": 1}},
+        projection={f"{arreglo}.{clave}": 1, f"{arreglo}.{campo}": 1}
+    )
+    if not anterior:
+        return False
+
+    await invalidar_evento(evento_id)
+    difusor_cambios.publicar_local("evento", "update", evento_id)
+    await eliminar_adjuntos(*(
+        s.get(campo) for s in anterior.get(arreglo, [])
+        if s.get(clave) == valor and s.get(campo) != archivo_id
+    ))
+    return True
+
+
+# 🔹 Obtener el ID del archivo de un subdocumento de un evento
+async def obtener_adjunto_subdocumento(id: str, arreglo: str, clave: str, valor, campo: str) -> Optional[ObjectId]:
+    evento = await EventoModel.get_motor_collection().find_one(
+        {"_id": convertir_id_evento(id)},
+        {f"{arreglo}.{clave}": 1, f"{arreglo}.{campo}": 1}
+    )
+    if not evento:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Evento no encontrado")
+
+    for subdocumento in evento.get(arreglo) or []:
+        if subdocumento.get(clave) == valor:
+            return subdocumento.get(campo)
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Evento u {arreglo} no encontrado")
+
+
+# ✅ Subir / obtener el aval en PDF de un organizador
+async def subir_aval_organizador(id: str, usuario_id: int, fragmentos: AsyncIterator[bytes], tipo_contenido: Optional[str] = None) -> dict:
+    archivo_id = await reemplazar_adjunto_subdocumento(
+        id, "organizador", "usuarioId", usuario_id, "avalPDFId",
+        fragmentos, tipo_contenido, f"aval-{id}-{usuario_id}.pdf"
+    )
+    return {"mensaje": "Aval guardado correctamente", "avalPDFId": str(archivo_id)}
+
+
+async def obtener_aval_organizador(id: str, usuario_id: int) -> Optional[ObjectId]:
+    return await obtener_adjunto_subdocumento(id, "organizador", "usuarioId", usuario_id, "avalPDFId")
+
+
+# ✅ Subir / obtener el certificado de participación de una organización
+async def subir_certificado_organizacion(id: str, organizacion_id: str, fragmentos: AsyncIterator[bytes], tipo_contenido: Optional[str] = None) -> dict:
+    if not ObjectId.is_valid(organizacion_id):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="organizacionId inválido")
+
+    archivo_id = await reemplazar_adjunto_subdocumento(
+        id, "organizacion", "organizacionId", ObjectId(organizacion_id), "certificadoParticipacionId",
+        fragmentos, tipo_contenido, f"certificado-{id}-{organizacion_id}.pdf"
+    )
+    return {"mensaje": "Certificado guardado correctamente", "certificadoParticipacionId": str(archivo_id)}
+
+
+async def obtener_certificado_organizacion(id: str, organizacion_id: str) -> Optional[ObjectId]:
+    if not ObjectId.is_valid(organizacion_id):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="organizacionId inválido")
+
+    return await obtener_adjunto_subdocumento(
+        id, "organizacion", "organizacionId", ObjectId(organizacion_id), "certificadoParticipacionId"
+    )
+
+
+# ✅ Trabajo en segundo plano: validar, calcular el SHA-256 y asociar al evento los PDFs recibidos en línea
+async def procesar_adjuntos_evento(trabajo: TrabajoModel) -> dict:
+    resultados = []
+    for pendiente in trabajo.datos["adjuntos"]:
+        arreglo = pendiente["arreglo"]
+        clave, _, referencia, _ = ADJUNTOS_EN_LINEA[arreglo]
+        valor = ObjectId(pendiente["valor"]) if isinstance(pendiente["valor"], str) else pendiente["valor"]
+        archivo_id = ObjectId(pendiente["archivoId"])
+        reporte = {"arreglo": arreglo, clave: pendiente["valor"], "archivoId": pendiente["archivoId"]}
+
+        try:
+            revision = await revisar_adjunto(archivo_id)
+        except NoFile:
+            # Un intento anterior ya lo rechazó o lo descartó
+            resultados.append({**reporte, "estado": "descartado", "motivo": "El archivo ya no existe."})
+            continue
+        if not revision["valido"]:
+            await eliminar_adjuntos(archivo_id)
+            resultados.append({**reporte, "estado": "rechazado", "motivo": revision["motivo"]})
+            continue
+
+        await marcar_adjunto(archivo_id, {"estado": "valido", "sha256": revision["sha256"]})
+        if not await vincular_adjunto(trabajo.eventoId, arreglo, clave, valor, referencia, archivo_id):
+            await eliminar_adjuntos(archivo_id)
+            resultados.append({**reporte, "estado": "descartado", "motivo": f"El evento o su {arreglo} ya no existe."})
+            continue
+        resultados.append({**reporte, "estado": "valido", "sha256": revision["sha256"], "bytes": revision["bytes"]})
+    return {"adjuntos": resultados}
+
+
+cola_trabajos.registrar(TRABAJO_ADJUNTOS, procesar_adjuntos_evento)
@@ -0,0 +1,102 @@
+from datetime import date
+from typing import AsyncIterator
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.core.exportacion import (
+    Columna,
+    fragmentos_csv,
+    fragmentos_ndjson,
+    fragmentos_parquet,
+    pyarrow,
+)
+from app.core.metricas import registro
+from app.models.eventos import EventoModel
+from app.models.evaluaciones import EvaluacionModel
+
+documentos_exportados = registro.contador(
+    "exportacion_documentos_total",
+    "Documentos enviados por GET /export",
+    ("coleccion", "formato"),
+)
+
+# 🔹 Columnas planas de cada colección (las mismas en NDJSON, CSV y Parquet)
+COLUMNAS_EXPORTACION = {
+    "eventos": (EventoModel, [
+        Columna("_id", "texto"),
+        Columna("nombre", "texto"),
+        Columna("estado", "texto"),
+        Columna("tipo", "texto"),
+        Columna("capacidad", "entero"),
+        Columna("realizacion.fecha", "fecha"),
+        Columna("realizacion.horaInicio", "texto"),
+        Columna("realizacion.horaFin", "texto"),
+        Columna("realizacion.inicio", "fecha"),
+        Columna("realizacion.fin", "fecha"),
+        Columna("realizacion.instalaciones.instalacionId", "texto", lista=True),
+        Columna("realizacion.instalaciones.capacidadInstalacion", "entero", lista=True),
+        Columna("organizador.usuarioId", "entero", lista=True),
+        Columna("organizador.tipo", "texto", lista=True),
+        Columna("organizador.tipoAval", "texto", lista=True),
+        Columna("organizacion.organizacionId", "texto", lista=True),
+        Columna("organizacion.nombreParticipante", "texto", lista=True),
+        Columna("organizacion.participante", "texto", lista=True),
+        Columna("version", "entero"),
+        Columna("actualizadoEn", "fecha"),
+    ]),
+    "evaluaciones": (EvaluacionModel, [
+        Columna("_id", "texto"),
+        Columna("estado", "texto"),
+        Columna("fechaEvaluacion", "fecha"),
+        Columna("justificacion", "texto"),
+        Columna("actaAprovacionId", "texto"),
+        Columna("eventoId", "texto"),
+        Columna("usuarioId", "entero"),
+        Columna("version", "entero"),
+        Columna("actualizadoEn", "fecha"),
+    ]),
+}
+
+# Formato -> (tipo de contenido, generador de fragmentos)
+FORMATOS_EXPORTACION = {
+    "ndjson": ("application/x-ndjson", fragmentos_ndjson),
+    "csv": ("text/csv; charset=utf-8", fragmentos_csv),
+    "parquet": ("application/vnd.apache.parquet", fragmentos_parquet),
+}
+
+
+# 🔹 Cursor por lotes de EXPORTACION_TAMANO_LOTE: nunca se carga la colección entera
+async def documentos_exportacion(coleccion: str, formato: str) -> AsyncIterator[dict]:
+    modelo, columnas = COLUMNAS_EXPORTACION[coleccion]
+    # Solo las rutas exportadas: ni `terminos` ni los PDFs en línea de documentos aún no migrados
+    proyeccion = {columna.ruta: 1 for columna in columnas}
+    cursor = modelo.get_motor_collection().find(
+        {}, proyeccion, batch_size=settings.EXPORTACION_TAMANO_LOTE
+    ).sort("_id", 1)
+    cantidad = 0
+    try:
+        async for documento in cursor:
+            cantidad += 1
+            yield documento
+    finally:
+        await cursor.close()
+        documentos_exportados.incrementar(cantidad, coleccion=coleccion, formato=formato)
+
+
+# ✅ Exportar una colección completa como descarga transmitida
+def exportar(coleccion: str, formato: str) -> StreamingResponse:
+    if formato == "parquet" and pyarrow is None:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="La exportación a Parquet requiere el paquete pyarrow."
+        )
+
+    _, columnas = COLUMNAS_EXPORTACION[coleccion]
+    tipo_contenido, fragmentos = FORMATOS_EXPORTACION[formato]
+    nombre = f"{coleccion}-{date.today().isoformat()}.{formato}"
+    return StreamingResponse(
+        fragmentos(documentos_exportacion(coleccion, formato), columnas),
+        media_type=tipo_contenido,
+        headers={"Content-Disposition": f'attachment; filename="{nombre}"'}
+    )
@@ -0,0 +1,253 @@
+from typing import Any, Dict, List, Tuple
+from beanie.operators import In
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+
+from app.core.config import settings
+from app.models.eventos import EventoModel
+from app.models.reserva import ReservaModel
+from app.schemas.common import PyObjectId
+from app.schemas.evento_schema import EventoCreate
+from app.services.usuario_service import resolver_usuarios, errores_organizadores
+from app.services.cambios_service import difusor_cambios
+from app.crud.reserva_crud import (
+    construir_reservas,
+    buscar_reservas_lote,
+    se_cruzan,
+    error_instalacion_ocupada
+)
+from app.crud.ocupacion_crud import marcar_ocupacion, recalcular_ocupacion
+from app.crud.adjunto_crud import eliminar_adjuntos
+from app.crud.evento_crud import (
+    validar_capacidad_evento,
+    convertir_ids_organizacion,
+    recibir_adjuntos_evento,
+    archivos_pendientes,
+    encolar_adjuntos_evento
+)
+
+
+# 🔹 Resultado de un elemento del lote
+class ElementoLote:
+    def __init__(self, indice: int, datos: Any):
+        self.indice = indice
+        self.datos = datos
+        self.evento: EventoCreate | None = None
+        self.evento_id = PyObjectId()
+        self.reservas: List[ReservaModel] = []
+        self.errores: List[str] = []
+        self.estado = "pendiente"
+        self.trabajo_id: PyObjectId | None = None
+
+    def fallar(self, *errores: str):
+        self.errores.extend(errores)
+        self.estado = "error"
+
+    def reporte(self) -> dict:
+        if self.estado == "creado":
+            reporte = {"indice": self.indice, "estado": self.estado, "id": str(self.evento_id)}
+            if self.trabajo_id:
+                reporte["trabajoId"] = str(self.trabajo_id)
+            return reporte
+        if self.estado == "error":
+            return {"indice": self.indice, "estado": self.estado, "errores": self.errores}
+        return {"indice": self.indice, "estado": self.estado}
+
+
+def mensajes_validacion(error: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(parte) for parte in e['loc'])}: {e['msg']}"
+        for e in error.errors(include_url=False)
+    ]
+
+
+# 🔹 Validaciones que no necesitan la base de datos (esquema, capacidad y horario)
+async def validar_elemento(elemento: ElementoLote):
+    try:
+        elemento.evento = EventoCreate.model_validate(elemento.datos)
+        await validar_capacidad_evento(elemento.evento)
+        elemento.reservas = construir_reservas(elemento.evento_id, elemento.evento.realizacion)
+    except ValidationError as e:
+        elemento.fallar(*mensajes_validacion(e))
+    except HTTPException as e:
+        elemento.fallar(e.detail)
+
+
+# 🔹 Detectar cruces con reservas existentes y con los eventos anteriores del mismo lote
+def validar_disponibilidad_lote(elementos: List[ElementoLote], existentes: List[ReservaModel]):
+    ocupadas: Dict[tuple, List[ReservaModel]] = {}
+    for reserva in existentes:
+        ocupadas.setdefault((reserva.instalacionId, reserva.fecha), []).append(reserva)
+
+    for elemento in elementos:
+        if elemento.estado != "pendiente":
+            continue
+
+        conflicto = next(
+            (
+                otra
+                for reserva in elemento.reservas
+                for otra in ocupadas.get((reserva.instalacionId, reserva.fecha), [])
+                if se_cruzan(reserva, otra)
+            ),
+            None
+        )
+        if conflicto:
+            elemento.fallar(error_instalacion_ocupada(conflicto).detail)
+            continue
+
+        for reserva in elemento.reservas:
+            ocupadas.setdefault((reserva.instalacionId, reserva.fecha), []).append(reserva)
+
+
+def omitir_tras_error(elementos: List[ElementoLote]):
+    """En modo ordenado, nada después del primer error se procesa."""
+    fallo = False
+    for elemento in elementos:
+        if fallo and elemento.estado == "pendiente":
+            elemento.estado = "omitido"
+        fallo = fallo or elemento.estado == "error"
+
+
+# 🔹 Insertar las reservas del lote y volver a comprobar cruces con peticiones concurrentes
+async def reservar_lote(elementos: List[ElementoLote], reservados: List[ElementoLote], ordenado: bool):
+    validos = [e for e in elementos if e.estado == "pendiente"]
+    reservas = [r for e in validos for r in e.reservas]
+    if not reservas:
+        return
+
+    await ReservaModel.insert_many(reservas)
+    reservados.extend(validos)
+
+    ids_lote = {e.evento_id for e in validos}
+    ajenas: Dict[tuple, List[ReservaModel]] = {}
+    for reserva in await buscar_reservas_lote(reservas):
+        if reserva.eventoId not in ids_lote:
+            ajenas.setdefault((reserva.instalacionId, reserva.fecha), []).append(reserva)
+
+    for elemento in validos:
+        conflicto = next(
+            (
+                otra
+                for reserva in elemento.reservas
+                for otra in ajenas.get((reserva.instalacionId, reserva.fecha), [])
+                if se_cruzan(reserva, otra)
+            ),
+            None
+        )
+        if conflicto:
+            elemento.fallar(error_instalacion_ocupada(conflicto).detail)
+    if ordenado:
+        omitir_tras_error(elementos)
+
+    await marcar_ocupacion([r for e in validos if e.estado == "pendiente" for r in e.reservas])
+
+
+# 🔹 Recibir los PDFs en línea (quedan pendientes de validación) y construir los documentos a insertar
+async def preparar_documentos(
+    elementos: List[ElementoLote],
+    pendientes: Dict[int, List[dict]],
+    ordenado: bool,
+) -> List[Tuple[ElementoLote, EventoModel]]:
+    documentos = []
+    for elemento in elementos:
+        if elemento.estado != "pendiente":
+            continue
+
+        data_dict = elemento.evento.model_dump()
+        convertir_ids_organizacion(data_dict)
+        try:
+            pendientes[elemento.indice] = await recibir_adjuntos_evento(elemento.evento_id, data_dict)
+        except HTTPException as e:
+            elemento.fallar(e.detail)
+            if ordenado:
+                omitir_tras_error(elementos)
+                break
+            continue
+        documentos.append((elemento, EventoModel(_id=elemento.evento_id, **data_dict)))
+    return documentos
+
+
+# 🔹 Una sola inserción para todo el lote; los errores de escritura se asignan a su elemento
+async def insertar_documentos(documentos: List[Tuple[ElementoLote, EventoModel]], ordenado: bool):
+    if not documentos:
+        return
+
+    try:
+        await EventoModel.insert_many([d for _, d in documentos], ordered=ordenado)
+        errores = {}
+    except BulkWriteError as e:
+        errores = {error["index"]: error["errmsg"] for error in e.details.get("writeErrors", [])}
+
+    primer_error = min(errores, default=None)
+    for posicion, (elemento, documento) in enumerate(documentos):
+        if posicion in errores:
+            elemento.fallar(errores[posicion])
+        elif ordenado and primer_error is not None and posicion > primer_error:
+            # Con ordered=True MongoDB se detiene en el primer error
+            elemento.estado = "omitido"
+        else:
+            elemento.estado = "creado"
+            difusor_cambios.publicar_local("evento", "insert", documento.id, documento)
+
+
+# ✅ Importar un lote de eventos con una sola escritura
+async def importar_eventos(datos: List[Any], ordenado: bool = False) -> dict:
+    if len(datos) > settings.IMPORTACION_MAX_EVENTOS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"El lote supera el máximo de {settings.IMPORTACION_MAX_EVENTOS} eventos."
+        )
+
+    elementos = [ElementoLote(i, d) for i, d in enumerate(datos)]
+
+    # 1️⃣ Esquema, capacidad y horario, en memoria
+    for elemento in elementos:
+        await validar_elemento(elemento)
+
+    # 2️⃣ Organizadores de todo el lote con una sola consulta $in
+    validos = [e for e in elementos if e.estado == "pendiente"]
+    usuarios = await resolver_usuarios(o.usuarioId for e in validos for o in e.evento.organizador)
+    for elemento in validos:
+        no_encontrados, errores = errores_organizadores(
+            (o.usuarioId for o in elemento.evento.organizador), usuarios
+        )
+        if no_encontrados or errores:
+            elemento.fallar(*no_encontrados, *errores)
+
+    # 3️⃣ Disponibilidad contra la base de datos y dentro del propio lote
+    validos = [e for e in elementos if e.estado == "pendiente"]
+    reservas = [r for e in validos for r in e.reservas]
+    validar_disponibilidad_lote(elementos, await buscar_reservas_lote(reservas))
+    if ordenado:
+        omitir_tras_error(elementos)
+
+    # 4️⃣ Escrituras: si algo falla a mitad, lo que no se creó no deja reservas ni archivos
+    reservados: List[ElementoLote] = []
+    pendientes: Dict[int, List[dict]] = {}
+    try:
+        await reservar_lote(elementos, reservados, ordenado)
+        documentos = await preparar_documentos(elementos, pendientes, ordenado)
+        await insertar_documentos(documentos, ordenado)
+        # Un trabajo en segundo plano por evento creado con PDFs en línea
+        for elemento in elementos:
+            if elemento.estado == "creado" and pendientes.get(elemento.indice):
+                trabajo = await encolar_adjuntos_evento(elemento.evento_id, pendientes.pop(elemento.indice))
+                elemento.trabajo_id = trabajo.id
+    finally:
+        descartados = [e for e in reservados if e.estado != "creado"]
+        if descartados:
+            await ReservaModel.find(In(ReservaModel.eventoId, [e.evento_id for e in descartados])).delete()
+            await recalcular_ocupacion((r.instalacionId, r.fecha) for e in descartados for r in e.reservas)
+        # Lo que queda en pendientes no llegó a tener trabajo (evento no creado o error a mitad)
+        await eliminar_adjuntos(*(archivo for p in pendientes.values() for archivo in archivos_pendientes(p)))
+
+    creados = sum(1 for e in elementos if e.estado == "creado")
+    return {
+        "total": len(elementos),
+        "creados": creados,
+        "fallidos": sum(1 for e in elementos if e.estado == "error"),
+        "omitidos": sum(1 for e in elementos if e.estado == "omitido"),
+        "resultados": [e.reporte() for e in elementos],
+    }
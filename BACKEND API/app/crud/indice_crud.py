@@ -0,0 +1,31 @@
+from typing import List
+from pymongo.errors import OperationFailure
+
+from app.db.modelsregistry import document_models
+
+
+# ✅ Índices de cada colección con su uso según $indexStats
+async def reporte_indices() -> List[dict]:
+    reporte = []
+    for modelo in document_models:
+        coleccion = modelo.get_motor_collection()
+        try:
+            estadisticas = await coleccion.aggregate([{"$indexStats": {}}]).to_list(length=None)
+        except OperationFailure as e:
+            reporte.append({"coleccion": coleccion.name, "error": str(e)})
+            continue
+
+        indices = [
+            {
+                "nombre": indice["name"],
+                "clave": dict(indice["key"]),
+                "operaciones": indice["accesses"]["ops"],
+                "desde": indice["accesses"]["since"],
+                "host": indice.get("host"),
+            }
+            for indice in estadisticas
+        ]
+        # Los índices sin uso quedan primero: son candidatos a revisar
+        indices.sort(key=lambda i: i["operaciones"])
+        reporte.append({"coleccion": coleccion.name, "indices": indices})
+    return reporte
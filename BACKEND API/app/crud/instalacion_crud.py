@@ -0,0 +1,165 @@
+from typing import List, Optional
+from datetime import date, datetime, time, timedelta
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.models.instalacion import TipoInstalacionEnum
+from app.models.ocupacion import OcupacionModel
+from app.services.instalacion_service import InstalacionCatalogo, catalogo_instalaciones
+from app.core.horario import hora_a_minutos, minutos_a_hora
+from app.crud.ocupacion_crud import (
+    MINUTOS_FRANJA,
+    de_bloques,
+    intervalos,
+    leer_ocupacion,
+    mascara_intervalo
+)
+
+MAX_DIAS_DISPONIBILIDAD = 92
+
+
+# 🔹 Utilidad: franjas de la jornada configurada
+def franjas_jornada() -> tuple[int, int]:
+    inicio = hora_a_minutos(settings.JORNADA_HORA_INICIO) // MINUTOS_FRANJA
+    fin = -(-hora_a_minutos(settings.JORNADA_HORA_FIN) // MINUTOS_FRANJA)
+    return inicio, fin
+
+
+def tramos(mascara: int, ocupado: bool, desde: int, hasta: int) -> List[dict]:
+    return [
+        {"inicio": minutos_a_hora(inicio), "fin": minutos_a_hora(fin)}
+        for inicio, fin in intervalos(mascara, ocupado, desde, hasta)
+    ]
+
+
+def a_dict(instalacion: InstalacionCatalogo) -> dict:
+    return {
+        "instalacionId": instalacion.id,
+        "tipo": instalacion.tipo,
+        "capacidad": instalacion.capacidad,
+        "ubicacion": instalacion.ubicacion,
+    }
+
+
+# ✅ Obtener instalación por ID (del catálogo en memoria)
+async def obtener_instalacion(id: str) -> InstalacionCatalogo:
+    await catalogo_instalaciones.asegurar()
+    instalacion = catalogo_instalaciones.obtener(id)
+    if not instalacion:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Instalación no encontrada")
+    return instalacion
+
+
+# ✅ Listar instalaciones por tipo y capacidad mínima (del catálogo en memoria)
+async def listar_instalaciones(
+    tipo: Optional[TipoInstalacionEnum] = None,
+    capacidad_minima: Optional[int] = None,
+) -> List[dict]:
+    await catalogo_instalaciones.asegurar()
+    return [a_dict(i) for i in catalogo_instalaciones.filtrar(tipo.value if tipo else None, capacidad_minima)]
+
+
+# ✅ Franjas libres y ocupadas de una instalación, día por día
+async def disponibilidad_instalacion(id: str, desde: date, hasta: Optional[date] = None) -> dict:
+    hasta = hasta or desde
+    if hasta < desde:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La fecha 'desde' no puede ser posterior a 'hasta'."
+        )
+    if (hasta - desde).days >= MAX_DIAS_DISPONIBILIDAD:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"El rango no puede superar {MAX_DIAS_DISPONIBILIDAD} días."
+        )
+
+    await obtener_instalacion(id)
+
+    # Un documento por día con reservas; los días sin documento están libres
+    mascaras = {}
+    async for documento in OcupacionModel.get_motor_collection().find(
+        {
+            "instalacionId": id,
+            "fecha": {
+                "$gte": datetime.combine(desde, time.min),
+                "$lt": datetime.combine(hasta + timedelta(days=1), time.min),
+            },
+        },
+        {"_id": 0, "fecha": 1, "bloques": 1}
+    ):
+        dia = documento["fecha"].date()
+        mascaras[dia] = mascaras.get(dia, 0) | de_bloques(documento["bloques"])
+
+    inicio_jornada, fin_jornada = franjas_jornada()
+    dias = []
+    for i in range((hasta - desde).days + 1):
+        dia = desde + timedelta(days=i)
+        mascara = mascaras.get(dia, 0)
+        dias.append({
+            "fecha": dia.isoformat(),
+            "ocupado": tramos(mascara, True, 0, 24 * 60 // MINUTOS_FRANJA),
+            "libre": tramos(mascara, False, inicio_jornada, fin_jornada),
+        })
+
+    return {
+        "instalacionId": id,
+        "minutosFranja": MINUTOS_FRANJA,
+        "jornada": {"inicio": settings.JORNADA_HORA_INICIO, "fin": settings.JORNADA_HORA_FIN},
+        "dias": dias,
+    }
+
+
+# ✅ Instalaciones libres en una fecha: en un horario exacto o con un hueco de cierta duración
+async def instalaciones_libres(
+    fecha: date,
+    hora_inicio: Optional[str] = None,
+    hora_fin: Optional[str] = None,
+    duracion: Optional[int] = None,
+    tipo: Optional[TipoInstalacionEnum] = None,
+    capacidad_minima: Optional[int] = None,
+) -> List[dict]:
+    if bool(hora_inicio) != bool(hora_fin) or not (hora_inicio or duracion):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Indique horaInicio y horaFin, o una duración en minutos."
+        )
+
+    await catalogo_instalaciones.asegurar()
+    instalaciones = catalogo_instalaciones.filtrar(tipo.value if tipo else None, capacidad_minima)
+    if not instalaciones:
+        return []
+
+    dia = datetime.combine(fecha, time.min)
+    ocupadas = await leer_ocupacion([i.id for i in instalaciones], [dia])
+
+    if hora_inicio:
+        inicio, fin = hora_a_minutos(hora_inicio), hora_a_minutos(hora_fin)
+        if fin <= inicio:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="La hora de fin debe ser posterior a la hora de inicio."
+            )
+        pedida = mascara_intervalo(inicio, fin)
+
+    inicio_jornada, fin_jornada = franjas_jornada()
+    libres = []
+    for instalacion in instalaciones:
+        mascara = ocupadas.get((instalacion.id, dia), 0)
+        if hora_inicio:
+            # Un AND de mapas de bits: cero significa que ninguna franja pedida está ocupada
+            if mascara & pedida:
+                continue
+            huecos = [(inicio, fin)]
+        else:
+            huecos = [
+                (a, b) for a, b in intervalos(mascara, False, inicio_jornada, fin_jornada)
+                if b - a >= duracion
+            ]
+            if not huecos:
+                continue
+
+        libres.append({
+            **a_dict(instalacion),
+            "libre": [{"inicio": minutos_a_hora(a), "fin": minutos_a_hora(b)} for a, b in huecos],
+        })
+    return libres
@@ -0,0 +1,144 @@
+from typing import Dict, Iterable, List, Tuple
+from datetime import datetime
+from bson import Int64
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.models.ocupacion import OcupacionModel
+from app.models.reserva import ReservaModel
+
+MINUTOS_FRANJA = 5
+FRANJAS_DIA = 24 * 60 // MINUTOS_FRANJA  # 288
+BITS_BLOQUE = 32
+BLOQUES = FRANJAS_DIA // BITS_BLOQUE  # 9
+MASCARA_BLOQUE = (1 << BITS_BLOQUE) - 1
+
+Clave = Tuple[str, datetime]
+
+
+# 🔹 Mapas de bits: un entero de Python de 288 bits en memoria, 9 bloques en MongoDB
+def mascara_intervalo(inicio_minutos: int, fin_minutos: int) -> int:
+    """Franjas que toca el intervalo [inicio, fin): una franja ocupada en parte cuenta como ocupada."""
+    primera = inicio_minutos // MINUTOS_FRANJA
+    ultima = min(-(-fin_minutos // MINUTOS_FRANJA), FRANJAS_DIA)
+    if ultima <= primera:
+        return 0
+    return ((1 << (ultima - primera)) - 1) << primera
+
+
+def a_bloques(mascara: int) -> List[int]:
+    return [Int64((mascara >> (BITS_BLOQUE * j)) & MASCARA_BLOQUE) for j in range(BLOQUES)]
+
+
+def de_bloques(bloques: Iterable[int]) -> int:
+    mascara = 0
+    for j, bloque in enumerate(bloques):
+        mascara |= (int(bloque) & MASCARA_BLOQUE) << (BITS_BLOQUE * j)
+    return mascara
+
+
+def intervalos(mascara: int, ocupado: bool, desde: int = 0, hasta: int = FRANJAS_DIA) -> List[Tuple[int, int]]:
+    """Tramos consecutivos (en minutos) de franjas ocupadas o libres entre las franjas desde y hasta."""
+    tramos = []
+    inicio = None
+    for franja in range(desde, hasta):
+        coincide = bool(mascara >> franja & 1) == ocupado
+        if coincide and inicio is None:
+            inicio = franja
+        elif not coincide and inicio is not None:
+            tramos.append((inicio * MINUTOS_FRANJA, franja * MINUTOS_FRANJA))
+            inicio = None
+    if inicio is not None:
+        tramos.append((inicio * MINUTOS_FRANJA, hasta * MINUTOS_FRANJA))
+    return tramos
+
+
+def mascara_reservas(reservas: Iterable[ReservaModel]) -> Dict[Clave, int]:
+    mascaras: Dict[Clave, int] = {}
+    for reserva in reservas:
+        clave = (reserva.instalacionId, reserva.fecha)
+        mascaras[clave] = mascaras.get(clave, 0) | mascara_intervalo(reserva.inicioMinutos, reserva.finMinutos)
+    return mascaras
+
+
+# ✅ Leer los mapas de ocupación de varias instalaciones y días (una sola consulta)
+async def leer_ocupacion(instalacion_ids: List[str], fechas: List[datetime]) -> Dict[Clave, int]:
+    cursor = OcupacionModel.get_motor_collection().find(
+        {"instalacionId": {"$in": instalacion_ids}, "fecha": {"$in": fechas}},
+        {"_id": 0, "instalacionId": 1, "fecha": 1, "bloques": 1}
+    )
+    return {(d["instalacionId"], d["fecha"]): de_bloques(d["bloques"]) async for d in cursor}
+
+
+# ✅ ¿Alguna franja de las reservas ya está ocupada? (sin falsos negativos: si no, no hay cruce)
+async def hay_ocupacion(reservas: List[ReservaModel]) -> bool:
+    if not reservas:
+        return False
+
+    pedidas = mascara_reservas(reservas)
+    ocupadas = await leer_ocupacion(
+        list({i for i, _ in pedidas}), list({f for _, f in pedidas})
+    )
+    return any(ocupadas.get(clave, 0) & mascara for clave, mascara in pedidas.items())
+
+
+# ✅ Marcar las franjas de reservas nuevas con $bit or (las escrituras concurrentes no se pisan)
+async def marcar_ocupacion(reservas: List[ReservaModel]):
+    mascaras = mascara_reservas(reservas)
+    if not mascaras:
+        return
+
+    operaciones = []
+    for (instalacion_id, fecha), mascara in mascaras.items():
+        filtro = {"instalacionId": instalacion_id, "fecha": fecha}
+        # $bit sobre "bloques.j" necesita que el arreglo exista: primero se crea vacío si falta
+        operaciones.append(UpdateOne(filtro, {"$setOnInsert": {"bloques": a_bloques(0)}}, upsert=True))
+        bits = {
+            f"bloques.{j}": {"or": bloque}
+            for j, bloque in enumerate(a_bloques(mascara)) if bloque
+        }
+        operaciones.append(UpdateOne(filtro, {"$bit": bits}))
+
+    coleccion = OcupacionModel.get_motor_collection()
+    try:
+        await coleccion.bulk_write(operaciones, ordered=True)
+    except BulkWriteError:
+        # Dos upserts simultáneos del mismo día: el documento ya existe, se reintenta una vez
+        await coleccion.bulk_write(operaciones, ordered=True)
+
+
+# ✅ Recalcular desde las reservas los días de los que se quitaron reservas
+async def recalcular_ocupacion(claves: Iterable[Clave]):
+    coleccion = OcupacionModel.get_motor_collection()
+    for instalacion_id, fecha in set(claves):
+        filtro = {"instalacionId": instalacion_id, "fecha": fecha}
+        # Una franja puede compartirse entre reservas contiguas: no basta con apagar bits.
+        # Si entretanto otra petición reservó ese día, la segunda lectura no coincide y se repite.
+        anterior = None
+        for _ in range(5):
+            reservas = await ReservaModel.find(filtro).to_list()
+            mascara = mascara_reservas(reservas).get((instalacion_id, fecha), 0)
+            if mascara == anterior:
+                break
+            await coleccion.update_one(filtro, {"$set": {"bloques": a_bloques(mascara)}}, upsert=True)
+            anterior = mascara
+
+
+# ✅ Reconstruir todos los mapas a partir de la colección de reservas
+async def reconstruir_ocupacion() -> int:
+    coleccion = OcupacionModel.get_motor_collection()
+    await coleccion.delete_many({})
+
+    mascaras: Dict[Clave, int] = {}
+    async for reserva in ReservaModel.get_motor_collection().find(
+        {}, {"instalacionId": 1, "fecha": 1, "inicioMinutos": 1, "finMinutos": 1}
+    ):
+        clave = (reserva["instalacionId"], reserva["fecha"])
+        mascaras[clave] = mascaras.get(clave, 0) | mascara_intervalo(reserva["inicioMinutos"], reserva["finMinutos"])
+
+    if mascaras:
+        await coleccion.insert_many([
+            {"instalacionId": i, "fecha": f, "bloques": a_bloques(m)}
+            for (i, f), m in mascaras.items()
+        ])
+    return len(mascaras)
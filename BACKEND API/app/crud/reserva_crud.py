@@ -0,0 +1,139 @@
+import logging
+from typing import List, Optional
+from beanie.operators import In, NotIn
+from fastapi import HTTPException, status
+from bson import ObjectId
+
+from app.core.horario import hora_a_minutos, minutos_a_hora, normalizar_fecha
+from app.models.eventos import EventoModel, Realizacion
+from app.models.reserva import ReservaModel
+from app.schemas.evento_schema import RealizacionSchema
+from app.crud.ocupacion_crud import marcar_ocupacion, recalcular_ocupacion, reconstruir_ocupacion
+
+logger = logging.getLogger(__name__)
+
+
+# 🔹 Una reserva por instalación del evento
+def construir_reservas(evento_id: ObjectId, realizacion: Realizacion | RealizacionSchema) -> List[ReservaModel]:
+    if not (realizacion.horaInicio and realizacion.horaFin):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Debe especificar hora de inicio y hora de fin para el evento."
+        )
+
+    inicio = hora_a_minutos(realizacion.horaInicio)
+    fin = hora_a_minutos(realizacion.horaFin)
+    if fin <= inicio:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La hora de fin debe ser posterior a la hora de inicio."
+        )
+
+    instalaciones = dict.fromkeys(i.instalacionId for i in realizacion.instalaciones)
+    return [
+        ReservaModel(
+            eventoId=evento_id,
+            instalacionId=instalacion_id,
+            fecha=normalizar_fecha(realizacion.fecha),
+            inicioMinutos=inicio,
+            finMinutos=fin,
+        )
+        for instalacion_id in instalaciones
+    ]
+
+
+# ✅ Buscar una reserva de otro evento que se cruce (consulta sobre el índice de intervalos)
+async def buscar_conflicto(reservas: List[ReservaModel], evento_id: Optional[ObjectId] = None) -> Optional[ReservaModel]:
+    if not reservas:
+        return None
+
+    # Todas las reservas de un evento comparten fecha e intervalo
+    referencia = reservas[0]
+    filtro = {
+        "instalacionId": {"$in": [r.instalacionId for r in reservas]},
+        "fecha": referencia.fecha,
+        "inicioMinutos": {"$lt": referencia.finMinutos},
+        "finMinutos": {"$gt": referencia.inicioMinutos},
+    }
+    if evento_id:
+        filtro["eventoId"] = {"$ne": evento_id}
+    return await ReservaModel.find(filtro).first_or_none()
+
+
+# 🔹 Dos reservas se cruzan si comparten instalación y fecha y sus intervalos se solapan
+def se_cruzan(a: ReservaModel, b: ReservaModel) -> bool:
+    return (
+        a.instalacionId == b.instalacionId
+        and a.fecha == b.fecha
+        and a.inicioMinutos < b.finMinutos
+        and b.inicioMinutos < a.finMinutos
+    )
+
+
+# ✅ Reservas existentes en las instalaciones y fechas de un lote (una sola consulta)
+async def buscar_reservas_lote(reservas: List[ReservaModel]) -> List[ReservaModel]:
+    if not reservas:
+        return []
+
+    return await ReservaModel.find({
+        "instalacionId": {"$in": list({r.instalacionId for r in reservas})},
+        "fecha": {"$in": list({r.fecha for r in reservas})},
+    }).to_list()
+
+
+def error_instalacion_ocupada(conflicto: ReservaModel) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"La instalación {conflicto.instalacionId} está ocupada el {conflicto.fecha.strftime('%Y-%m-%d')} entre {minutos_a_hora(conflicto.inicioMinutos)} y {minutos_a_hora(conflicto.finMinutos)}."
+    )
+
+
+# ✅ Reservar las instalaciones de un evento
+async def reservar_instalaciones(evento_id: ObjectId, realizacion: Realizacion | RealizacionSchema) -> List[ReservaModel]:
+    reservas = construir_reservas(evento_id, realizacion)
+    await ReservaModel.insert_many(reservas)
+    ids = [r.id for r in reservas]
+
+    # Se vuelve a consultar después de insertar: si dos peticiones reservan a la vez,
+    # al menos una de ellas ve la reserva de la otra y se retira.
+    conflicto = await buscar_conflicto(reservas, evento_id)
+    if conflicto:
+        await ReservaModel.find(In(ReservaModel.id, ids)).delete()
+        raise error_instalacion_ocupada(conflicto)
+
+    await marcar_ocupacion(reservas)
+
+    # Al actualizar, las reservas anteriores del evento se liberan al final
+    anteriores = await ReservaModel.find(ReservaModel.eventoId == evento_id, NotIn(ReservaModel.id, ids)).to_list()
+    if anteriores:
+        await ReservaModel.find(In(ReservaModel.id, [r.id for r in anteriores])).delete()
+        await recalcular_ocupacion((r.instalacionId, r.fecha) for r in anteriores)
+    return reservas
+
+
+# ✅ Liberar las reservas de un evento
+async def liberar_reservas(evento_id: ObjectId):
+    reservas = await ReservaModel.find(ReservaModel.eventoId == evento_id).to_list()
+    if reservas:
+        await ReservaModel.find(ReservaModel.eventoId == evento_id).delete()
+        await recalcular_ocupacion((r.instalacionId, r.fecha) for r in reservas)
+
+
+# ✅ Reconstruir la colección de reservas a partir de los eventos existentes
+async def reconstruir_reservas() -> int:
+    await ReservaModel.find_all().delete()
+
+    total = 0
+    coleccion = EventoModel.get_motor_collection()
+    async for evento in coleccion.find({}, {"realizacion": 1}):
+        try:
+            realizacion = Realizacion(**evento["realizacion"])
+            reservas = construir_reservas(evento["_id"], realizacion)
+        except (KeyError, ValueError, HTTPException) as e:
+            logger.warning("Evento %s sin realización válida: %s", evento["_id"], getattr(e, "detail", e))
+            continue
+        await ReservaModel.insert_many(reservas)
+        total += len(reservas)
+
+    await reconstruir_ocupacion()
+    return total
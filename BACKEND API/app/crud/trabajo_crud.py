@@ -0,0 +1,55 @@
+from typing import List, Optional, Tuple
+from fastapi import HTTPException, status
+from bson import ObjectId
+
+from app.models.trabajo import TrabajoModel, EstadoTrabajoEnum
+
+# Los datos internos del trabajo (archivos pendientes) no se devuelven
+PROYECCION_TRABAJO = {
+    campo: 1
+    for campo in ["tipo", "estado", "eventoId", "resultado", "error", "intentos", "creadoEn", "iniciadoEn", "terminadoEn"]
+}
+
+
+# ✅ Obtener un trabajo por ID
+async def obtener_trabajo(id: str) -> dict:
+    if not ObjectId.is_valid(id):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ID inválido")
+
+    trabajo = await TrabajoModel.get_motor_collection().find_one({"_id": ObjectId(id)}, PROYECCION_TRABAJO)
+    if not trabajo:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trabajo no encontrado")
+    return trabajo
+
+
+# ✅ Listar trabajos (paginación por cursor sobre _id)
+async def listar_trabajos(
+    limite: int = 50,
+    despues: Optional[str] = None,
+    evento_id: Optional[str] = None,
+    estado: Optional[EstadoTrabajoEnum] = None,
+    tipo: Optional[str] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    filtro = {}
+    if despues:
+        if not ObjectId.is_valid(despues):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido")
+        filtro["_id"] = {"$gt": ObjectId(despues)}
+    if evento_id:
+        if not ObjectId.is_valid(evento_id):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="eventoId inválido")
+        filtro["eventoId"] = ObjectId(evento_id)
+    if estado:
+        filtro["estado"] = estado.value
+    if tipo:
+        filtro["tipo"] = tipo
+
+    # Se pide un documento de más para saber si existe una página siguiente
+    cursor = TrabajoModel.get_motor_collection().find(filtro, PROYECCION_TRABAJO).sort("_id", 1).limit(limite + 1)
+    trabajos = await cursor.to_list(length=limite + 1)
+
+    siguiente = None
+    if len(trabajos) > limite:
+        trabajos = trabajos[:limite]
+        siguiente = str(trabajos[-1]["_id"])
+    return trabajos, siguiente
@@ -4,6 +4,9 @@ from app.models.facultad import FacultadModel
 from app.models.usuarios import UsuarioModel
 from app.models.instalacion import InstalacionModel
 from app.models.evaluaciones import EvaluacionModel
+from app.models.reserva import ReservaModel
+from app.models.ocupacion import OcupacionModel
+from app.models.trabajo import TrabajoModel
 
 document_models = [
     EventoModel,
@@ -12,4 +15,7 @@ document_models = [
     UsuarioModel,
     InstalacionModel,
     EvaluacionModel,
+    ReservaModel,
+    OcupacionModel,
+    TrabajoModel,
 ]
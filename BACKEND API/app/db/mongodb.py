@@ -1,16 +1,35 @@
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorGridFSBucket
 from beanie import init_beanie
 from app.core.config import settings
 from app.db.modelsregistry import document_models
+from app.db.monitoreo import MonitorPool, MonitorComandos
 
 class DataBase:
     client: AsyncIOMotorClient = None
+    adjuntos: AsyncIOMotorGridFSBucket = None
 
 db = DataBase()
 
 async def connect_to_mongo():
-    db.client = AsyncIOMotorClient(settings.MONGO_CONNECTION_STRING)
+    opciones = {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "waitQueueTimeoutMS": settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "readPreference": settings.MONGO_READ_PREFERENCE,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    }
+    if settings.MONGO_COMPRESSORS:
+        # Los compresores sin su paquete instalado se descartan con una advertencia del driver
+        opciones["compressors"] = ",".join(settings.MONGO_COMPRESSORS)
+
+    db.client = AsyncIOMotorClient(
+        settings.MONGO_CONNECTION_STRING,
+        event_listeners=[MonitorPool(), MonitorComandos()],
+        **opciones
+    )
     await init_beanie(database=db.client[settings.MONGO_DB_NAME], document_models=document_models)
+    # PDFs de avales, certificados y actas (colecciones adjuntos.files / adjuntos.chunks)
+    db.adjuntos = AsyncIOMotorGridFSBucket(db.client[settings.MONGO_DB_NAME], bucket_name="adjuntos")
 
 async def close_mongo_connection():
     db.client.close()
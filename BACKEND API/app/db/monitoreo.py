@@ -0,0 +1,110 @@
+from pymongo import common, monitoring
+
+from app.core.metricas import registro
+from app.core.instrumentacion import sumar_mongo
+
+# 🔹 Pool de conexiones (CMAP)
+espera_checkout = registro.histograma(
+    "mongo_pool_checkout_espera_segundos",
+    "Tiempo esperando una conexión libre del pool",
+    ["servidor"],
+)
+fallos_checkout = registro.contador(
+    "mongo_pool_checkout_fallos_total",
+    "Checkouts fallidos (timeout = waitQueueTimeoutMS agotado)",
+    ["servidor", "motivo"],
+)
+conexiones_en_uso = registro.medidor(
+    "mongo_pool_conexiones_en_uso",
+    "Conexiones prestadas a una operación en este momento",
+    ["servidor"],
+)
+conexiones_abiertas = registro.medidor(
+    "mongo_pool_conexiones_abiertas",
+    "Conexiones abiertas (en uso y libres)",
+    ["servidor"],
+)
+tamano_maximo_pool = registro.medidor(
+    "mongo_pool_tamano_maximo",
+    "maxPoolSize configurado para el pool",
+    ["servidor"],
+)
+limpiezas_pool = registro.contador(
+    "mongo_pool_limpiezas_total",
+    "Veces que el driver vació el pool (errores de red o failover)",
+    ["servidor"],
+)
+
+# 🔹 Comandos
+latencia_comandos = registro.histograma(
+    "mongo_comando_duracion_segundos",
+    "Latencia de cada comando enviado a MongoDB",
+    ["comando", "resultado"],
+)
+
+
+def servidor(evento) -> str:
+    host, puerto = evento.address
+    return f"{host}:{puerto}"
+
+
+class MonitorPool(monitoring.ConnectionPoolListener):
+    """Publica en /metrics la espera de checkout y las conexiones en uso por servidor.
+
+    El driver llama a estos métodos desde sus propios hilos; las métricas ya son seguras entre hilos.
+    """
+
+    def pool_created(self, event):
+        # event.options solo trae las opciones distintas del valor por defecto del driver
+        tamano_maximo = event.options.get("maxPoolSize", common.MAX_POOL_SIZE)
+        tamano_maximo_pool.fijar(tamano_maximo, servidor=servidor(event))
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        limpiezas_pool.incrementar(servidor=servidor(event))
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        conexiones_abiertas.incrementar(1, servidor=servidor(event))
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        conexiones_abiertas.incrementar(-1, servidor=servidor(event))
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        espera_checkout.observar(event.duration, servidor=servidor(event))
+        fallos_checkout.incrementar(servidor=servidor(event), motivo=event.reason)
+
+    def connection_checked_out(self, event):
+        espera_checkout.observar(event.duration, servidor=servidor(event))
+        conexiones_en_uso.incrementar(1, servidor=servidor(event))
+
+    def connection_checked_in(self, event):
+        conexiones_en_uso.incrementar(-1, servidor=servidor(event))
+
+
+class MonitorComandos(monitoring.CommandListener):
+    """Histograma de latencia por nombre de comando (find, insert, aggregate...).
+
+    También suma la duración al tiempo de Mongo de la petición en curso (Server-Timing).
+    """
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        latencia_comandos.observar(event.duration_micros / 1e6, comando=event.command_name, resultado="ok")
+        sumar_mongo(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        latencia_comandos.observar(event.duration_micros / 1e6, comando=event.command_name, resultado="error")
+        sumar_mongo(event.duration_micros / 1e6)
@@ -1,11 +1,20 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse
+from fastapi.responses import PlainTextResponse, RedirectResponse
 from contextlib import asynccontextmanager
+import asyncio
 
-from app.db.mongodb import connect_to_mongo, close_mongo_connection
+from app.db.mongodb import db, connect_to_mongo, close_mongo_connection
 from app.api.v1.api import api_router_v1
 from app.core.config import settings
+from app.core.respuestas import RespuestaJSON
+from app.core.metricas import registro
+from app.core.instrumentacion import MiddlewareLatencia
+from app.core.compresion import MiddlewareCompresion
+from app.services.usuario_service import escuchar_cambios_usuarios
+from app.services.cambios_service import difusor_cambios
+from app.services.trabajo_service import cola_trabajos
+from app.services.instalacion_service import catalogo_instalaciones
 
 
 @asynccontextmanager
@@ -14,7 +23,23 @@ async def lifespan(app: FastAPI):
     print("🔌 Conectando a MongoDB...")
     await connect_to_mongo()
     print("✅ Beanie inicializado correctamente.")
+    # ✅ Catálogo de instalaciones en memoria, cargado antes de la primera validación
+    await catalogo_instalaciones.cargar()
+    tarea_catalogo = asyncio.create_task(catalogo_instalaciones.escuchar())
+    # ✅ Invalidación de la caché de roles con el change stream de usuarios
+    tarea_usuarios = asyncio.create_task(escuchar_cambios_usuarios())
+    # ✅ Un change stream compartido para el flujo de eventos (/eventos/stream)
+    tarea_cambios = asyncio.create_task(difusor_cambios.escuchar())
+    # ✅ Trabajador de la cola de trabajos (PDFs en línea), salvo que se ejecute aparte
+    tarea_trabajos = asyncio.create_task(cola_trabajos.trabajar()) if settings.TRABAJOS_EN_PROCESO else None
     yield
+    tarea_usuarios.cancel()
+    tarea_cambios.cancel()
+    tarea_catalogo.cancel()
+    if tarea_trabajos:
+        # Los trabajos a medio procesar vuelven a la cola antes de cerrar la conexión
+        tarea_trabajos.cancel()
+        await asyncio.gather(tarea_trabajos, return_exceptions=True)
     # ✅ Cierre limpio al apagar servidor
     await close_mongo_connection()
     print("🔒 Conexión Mongo cerrada.")
@@ -25,6 +50,7 @@ app = FastAPI(
     description="Una API para gestionar Eventos de un sistema académico.",
     version=settings.APP_VERSION,
     lifespan=lifespan,
+    default_response_class=RespuestaJSON,
 )
 
 app.add_middleware(
@@ -33,10 +59,45 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # El navegador solo deja leer estos encabezados si se exponen (If-Match necesita el ETag)
+    expose_headers=["ETag", "Last-Modified", "X-Cursor-Siguiente", "X-Resultados-Truncados", "X-Trabajo-Id", "Location"],
 )
 
+# ✅ Compresión zstd / br / gzip (dentro de la latencia, que así mide los bytes ya comprimidos)
+app.add_middleware(MiddlewareCompresion)
+
+# ✅ Latencia por ruta, fases (mongo / validación / serialización) y Server-Timing
+app.add_middleware(MiddlewareLatencia)
+
 app.include_router(api_router_v1, prefix="/api/v1")
 
 @app.get("/")
 async def root():
     return RedirectResponse(url="/docs")
+
+
+# ✅ Métricas del proceso en formato de texto de Prometheus (pool de Mongo, comandos)
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metricas():
+    return PlainTextResponse(registro.exponer(), media_type="text/plain; version=0.0.4")
+
+
+# ✅ Salud: responde 503 si MongoDB no contesta
+@app.get("/health", tags=["Salud"])
+async def salud():
+    try:
+        await db.client.admin.command("ping")
+    except Exception as e:
+        return RespuestaJSON({"estado": "error", "mongo": str(e)}, status_code=503)
+
+    opciones = db.client.options.pool_options
+    return {
+        "estado": "ok",
+        "mongo": "ok",
+        "pool": {
+            "maxPoolSize": opciones.max_pool_size,
+            "minPoolSize": opciones.min_pool_size,
+            "waitQueueTimeoutMS": settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            "readPreference": db.client.read_preference.mongos_mode,
+        },
+    }
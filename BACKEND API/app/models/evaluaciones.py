@@ -1,5 +1,6 @@
 from beanie import Document
 from pydantic import Field, ConfigDict
+from pymongo import IndexModel, ASCENDING, DESCENDING
 from enum import Enum
 from typing import Optional
 from datetime import datetime
@@ -16,12 +17,20 @@ class EvaluacionModel(Document):
     estado: EstadoEvaluacionEnum
     fechaEvaluacion: datetime
     justificacion: Optional[str] = None
-    actaAprovacion: Optional[bytes] = None
+    actaAprovacionId: Optional[PyObjectId] = None  # archivo en GridFS
     eventoId: PyObjectId
     usuarioId: int 
+    # Control de concurrencia optimista y validadores HTTP (ETag / Last-Modified)
+    version: int = 0
+    actualizadoEn: Optional[datetime] = None
 
     class Settings:
         name = "evaluacion"
+        indexes = [
+            IndexModel([("eventoId", ASCENDING), ("fechaEvaluacion", DESCENDING)], name="evento_fecha"),
+            IndexModel([("usuarioId", ASCENDING), ("fechaEvaluacion", DESCENDING)], name="usuario_fecha"),
+            IndexModel([("estado", ASCENDING), ("_id", ASCENDING)], name="estado_id"),
+        ]
 
     model_config = ConfigDict(
         arbitrary_types_allowed=True,
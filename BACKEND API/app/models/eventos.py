@@ -1,9 +1,12 @@
 from beanie import Document
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, model_validator
+from pymongo import IndexModel, ASCENDING
 from typing import List, Optional
 from datetime import datetime
 from enum import Enum
 from app.schemas.common import PyObjectId
+from app.core.horario import calcular_intervalo
+from app.core.busqueda import terminos_documento
 
 
 # 🔹 ENUMS
@@ -45,12 +48,25 @@ class Realizacion(BaseModel):
     fecha: datetime
     horaInicio: str
     horaFin: str
+    # Calculados a partir de fecha, horaInicio y horaFin: instantes UTC y minutos desde la medianoche local
+    inicio: Optional[datetime] = None
+    fin: Optional[datetime] = None
+    inicioMinutos: Optional[int] = None
+    finMinutos: Optional[int] = None
+
+    @model_validator(mode="after")
+    def calcular_inicio_fin(self):
+        intervalo = calcular_intervalo(self.fecha, self.horaInicio, self.horaFin)
+        if intervalo:
+            for campo, valor in intervalo.items():
+                setattr(self, campo, valor)
+        return self
 
 
 
 class Organizador(BaseModel):
     usuarioId: int
-    avalPDF: bytes
+    avalPDFId: Optional[PyObjectId] = None  # archivo en GridFS
     tipoAval: TipoAvalEnum
     tipo: UsuarioTipo
 
@@ -61,7 +77,7 @@ class Organizacion(BaseModel):
     organizacionId: PyObjectId
     participante: OrganizacionParticipante
     nombreParticipante: str
-    certificadoParticipacion: bytes
+    certificadoParticipacionId: Optional[PyObjectId] = None  # archivo en GridFS
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
@@ -76,9 +92,34 @@ class EventoModel(Document):
     organizador: List[Organizador]
     organizacion: Optional[List[Organizacion]] = None
     capacidad: int
+    # Control de concurrencia optimista y validadores HTTP (ETag / Last-Modified)
+    version: int = 0
+    actualizadoEn: Optional[datetime] = None
+    # Palabras normalizadas de nombre y organizaciones para GET /buscar (no se devuelven en la API)
+    terminos: List[str] = Field(default_factory=list, exclude=True)
+
+    @model_validator(mode="after")
+    def calcular_terminos(self):
+        self.terminos = terminos_documento("evento", self)
+        return self
 
     class Settings:
         name = "evento"
+        indexes = [
+            IndexModel([("realizacion.fecha", ASCENDING)], name="fecha"),
+            # Rangos por instante ("eventos de las próximas dos horas") y solapamientos: inicio < fin2 y fin > inicio2
+            IndexModel([("realizacion.inicio", ASCENDING), ("realizacion.fin", ASCENDING)], name="inicio_fin"),
+            IndexModel(
+                [("realizacion.instalaciones.instalacionId", ASCENDING), ("realizacion.fecha", ASCENDING)],
+                name="instalacion_fecha",
+            ),
+            # Filtros del listado paginado por _id
+            IndexModel([("estado", ASCENDING), ("tipo", ASCENDING), ("_id", ASCENDING)], name="estado_tipo_id"),
+            IndexModel([("tipo", ASCENDING), ("_id", ASCENDING)], name="tipo_id"),
+            IndexModel([("organizador.usuarioId", ASCENDING)], name="organizador"),
+            # Búsqueda por prefijo: una expresión regular anclada (^palabra) recorre un rango del índice
+            IndexModel([("terminos", ASCENDING)], name="terminos"),
+        ]
 
     model_config = ConfigDict(
         arbitrary_types_allowed=True,
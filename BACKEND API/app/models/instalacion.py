@@ -1,5 +1,6 @@
 from beanie import Document
 from pydantic import Field, ConfigDict
+from pymongo import IndexModel, ASCENDING
 from enum import Enum
 from typing import Optional
 
@@ -19,6 +20,9 @@ class InstalacionModel(Document):
 
     class Settings:
         name = "instalacion"
+        indexes = [
+            IndexModel([("tipo", ASCENDING), ("capacidad", ASCENDING)], name="tipo_capacidad"),
+        ]
 
     model_config = ConfigDict(
         arbitrary_types_allowed=True,
@@ -0,0 +1,27 @@
+from beanie import Document
+from pydantic import Field, ConfigDict
+from pymongo import IndexModel, ASCENDING
+from typing import List, Optional
+from datetime import datetime
+from app.schemas.common import PyObjectId
+
+
+# 🔹 Mapa de ocupación de una instalación en un día: 288 franjas de 5 minutos,
+# guardadas en 9 bloques de 32 bits (bit i del bloque j = franja 32*j + i)
+class OcupacionModel(Document):
+    id: Optional[PyObjectId] = Field(default_factory=PyObjectId, alias="_id")
+    instalacionId: str
+    fecha: datetime
+    bloques: List[int]
+
+    class Settings:
+        name = "ocupacion"
+        indexes = [
+            IndexModel([("instalacionId", ASCENDING), ("fecha", ASCENDING)], name="instalacion_fecha", unique=True),
+        ]
+
+    model_config = ConfigDict(
+        arbitrary_types_allowed=True,
+        populate_by_name=True,
+        from_attributes=True
+    )
@@ -1,7 +1,9 @@
 from beanie import Document
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, model_validator
+from pymongo import IndexModel, ASCENDING
 from typing import List
 from app.schemas.common import PyObjectId
+from app.core.busqueda import terminos_documento
 
 
 class Ubicacion(BaseModel): 
@@ -17,9 +19,19 @@ class OrganizacionModel(Document):
     sectorEconomico: str
     actividadPrincipal: str
     telefonos: List[str]
+    # Palabras normalizadas de nombre y sector para GET /buscar (no se devuelven en la API)
+    terminos: List[str] = Field(default_factory=list, exclude=True)
+
+    @model_validator(mode="after")
+    def calcular_terminos(self):
+        self.terminos = terminos_documento("organizacion", self)
+        return self
 
     class Settings:
         name = "organizacion"  # ✅ coincide con tu colección real
+        indexes = [
+            IndexModel([("terminos", ASCENDING)], name="terminos"),
+        ]
 
     model_config = ConfigDict(
         arbitrary_types_allowed=True,
@@ -0,0 +1,39 @@
+from beanie import Document
+from pydantic import Field, ConfigDict
+from pymongo import IndexModel, ASCENDING
+from typing import Optional
+from datetime import datetime
+from app.schemas.common import PyObjectId
+
+
+# 🔹 Reserva materializada de una instalación para un evento
+class ReservaModel(Document):
+    id: Optional[PyObjectId] = Field(default_factory=PyObjectId, alias="_id")
+    eventoId: PyObjectId
+    instalacionId: str
+    fecha: datetime
+    inicioMinutos: int
+    finMinutos: int
+
+    class Settings:
+        name = "reserva"
+        indexes = [
+            IndexModel(
+                [
+                    ("instalacionId", ASCENDING),
+                    ("fecha", ASCENDING),
+                    ("inicioMinutos", ASCENDING),
+                    ("finMinutos", ASCENDING),
+                ],
+                name="instalacion_fecha_intervalo",
+            ),
+            IndexModel([("eventoId", ASCENDING)], name="evento"),
+            # Estadísticas de ocupación por rango de fechas
+            IndexModel([("fecha", ASCENDING), ("instalacionId", ASCENDING)], name="fecha_instalacion"),
+        ]
+
+    model_config = ConfigDict(
+        arbitrary_types_allowed=True,
+        populate_by_name=True,
+        from_attributes=True
+    )
@@ -0,0 +1,55 @@
+from beanie import Document
+from pydantic import Field, ConfigDict
+from pymongo import IndexModel, ASCENDING
+from typing import Optional
+from datetime import datetime
+from enum import Enum
+from app.schemas.common import PyObjectId
+from app.core.config import settings
+
+
+class EstadoTrabajoEnum(str, Enum):
+    PENDIENTE = "pendiente"
+    EN_PROCESO = "enProceso"
+    COMPLETADO = "completado"
+    FALLIDO = "fallido"
+
+
+# 🔹 Trabajo en segundo plano: lo toma el primer trabajador libre (en la API o en scripts.trabajador)
+class TrabajoModel(Document):
+    id: Optional[PyObjectId] = Field(default_factory=PyObjectId, alias="_id")
+    tipo: str
+    estado: EstadoTrabajoEnum = EstadoTrabajoEnum.PENDIENTE
+    eventoId: Optional[PyObjectId] = None
+    datos: dict = {}
+    resultado: Optional[dict] = None
+    error: Optional[str] = None
+    intentos: int = 0
+    trabajador: Optional[str] = None
+    creadoEn: datetime = Field(default_factory=datetime.utcnow)
+    # No se toma antes de esta fecha (espera entre reintentos)
+    disponibleEn: datetime = Field(default_factory=datetime.utcnow)
+    iniciadoEn: Optional[datetime] = None
+    # Si el trabajador no termina antes de esta fecha, otro puede retomarlo
+    venceEn: Optional[datetime] = None
+    terminadoEn: Optional[datetime] = None
+
+    class Settings:
+        name = "trabajo"
+        indexes = [
+            IndexModel([("estado", ASCENDING), ("disponibleEn", ASCENDING)], name="estado_disponible"),
+            IndexModel([("estado", ASCENDING), ("venceEn", ASCENDING)], name="estado_vence"),
+            IndexModel([("eventoId", ASCENDING), ("_id", ASCENDING)], name="evento_id"),
+            # Los trabajos terminados se borran solos pasado el periodo de retención
+            IndexModel(
+                [("terminadoEn", ASCENDING)],
+                name="retencion",
+                expireAfterSeconds=settings.TRABAJOS_RETENCION_DIAS * 24 * 3600,
+            ),
+        ]
+
+    model_config = ConfigDict(
+        arbitrary_types_allowed=True,
+        populate_by_name=True,
+        from_attributes=True
+    )
@@ -1,5 +1,6 @@
 from beanie import Document
 from pydantic import BaseModel, Field, EmailStr, ConfigDict
+from pymongo import IndexModel, ASCENDING
 from typing import Optional, List
 from enum import Enum
 from datetime import datetime
@@ -53,6 +54,9 @@ class UsuarioModel(Document):
 
     class Settings:
         name = "usuario"
+        indexes = [
+            IndexModel([("vinculacion.facultadId", ASCENDING), ("vinculacion.rol", ASCENDING)], name="facultad_rol"),
+        ]
 
     model_config = ConfigDict(
         arbitrary_types_allowed=True,
@@ -1,11 +1,11 @@
 from pydantic import BaseModel, ConfigDict, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from app.models.evaluaciones import EstadoEvaluacionEnum
 from app.schemas.common import PyObjectId
 
 
-# 🧩 Esquema para creación
+# 🧩 Esquema para creación (el acta puede enviarse en base64 y se guarda en GridFS)
 class EvaluacionCrear(BaseModel):
     estado: EstadoEvaluacionEnum
     fechaEvaluacion: datetime
@@ -14,7 +14,7 @@ class EvaluacionCrear(BaseModel):
     eventoId: PyObjectId
     usuarioId: int
 
-    model_config = ConfigDict(arbitrary_types_allowed=True)
+    model_config = ConfigDict(arbitrary_types_allowed=True, val_json_bytes="base64")
 
 
 # 🧱 Esquema base común (para heredar)
@@ -22,7 +22,7 @@ class EvaluacionBase(BaseModel):
     estado: EstadoEvaluacionEnum
     fechaEvaluacion: datetime
     justificacion: Optional[str] = None
-    actaAprovacion: Optional[bytes] = None
+    actaAprovacionId: Optional[PyObjectId] = None
     eventoId: PyObjectId
     usuarioId: int
 
@@ -38,7 +38,7 @@ class EvaluacionActualizar(BaseModel):
     eventoId: Optional[PyObjectId] = None
     usuarioId: Optional[int] = None
 
-    model_config = ConfigDict(arbitrary_types_allowed=True)
+    model_config = ConfigDict(arbitrary_types_allowed=True, val_json_bytes="base64")
 
 
 # 📤 Esquema para salida / lectura
@@ -50,3 +50,52 @@ class Evaluacion(EvaluacionBase):
         populate_by_name=True,
         arbitrary_types_allowed=True
     )
+
+
+# 📤 Respuesta de PATCH: solo los campos modificados y los validadores
+class EvaluacionModificada(BaseModel):
+    id: PyObjectId = Field(..., alias="_id")
+    estado: Optional[EstadoEvaluacionEnum] = None
+    fechaEvaluacion: Optional[datetime] = None
+    justificacion: Optional[str] = None
+    actaAprovacionId: Optional[PyObjectId] = None
+    eventoId: Optional[PyObjectId] = None
+    usuarioId: Optional[int] = None
+    version: int
+    actualizadoEn: datetime
+
+    model_config = ConfigDict(populate_by_name=True, arbitrary_types_allowed=True)
+
+
+# 📊 Resumen de las evaluaciones de un evento
+class ResumenEvaluaciones(BaseModel):
+    total: int
+    aprobadas: int
+    rechazadas: int
+    ultimaEvaluacion: Optional[datetime] = None
+    estadoUltimaEvaluacion: Optional[EstadoEvaluacionEnum] = None
+
+
+# 📤 Evaluaciones de un evento con su resumen
+class EvaluacionesEvento(BaseModel):
+    eventoId: PyObjectId
+    resumen: ResumenEvaluaciones
+    evaluaciones: List[Evaluacion]
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+
+# 🧩 Una decisión del lote
+class EvaluacionLoteElemento(BaseModel):
+    eventoId: PyObjectId
+    estado: EstadoEvaluacionEnum
+    justificacion: Optional[str] = None
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+
+# 🧩 Evaluar varios eventos en una petición (mismo evaluador y fecha)
+class EvaluacionLote(BaseModel):
+    usuarioId: int
+    fechaEvaluacion: datetime
+    evaluaciones: List[EvaluacionLoteElemento] = Field(..., min_length=1)
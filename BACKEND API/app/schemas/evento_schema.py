@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
 from datetime import datetime
 from app.models.eventos import (
@@ -9,6 +9,7 @@ from app.models.eventos import (
     UsuarioTipo,
 )
 from app.schemas.common import PyObjectId
+from app.schemas.evaluacion_schema import Evaluacion, ResumenEvaluaciones
 
 
 # 🔹 Subschemas (idénticos al modelo para compatibilidad con Beanie)
@@ -24,12 +25,23 @@ class RealizacionSchema(BaseModel):
     horaFin: str
 
 
+# Los instantes UTC y los minutos los calcula el servidor a partir de fecha, horaInicio y horaFin
+class RealizacionRespuesta(RealizacionSchema):
+    inicio: Optional[datetime] = None
+    fin: Optional[datetime] = None
+    inicioMinutos: Optional[int] = None
+    finMinutos: Optional[int] = None
+
+
+# Los PDFs pueden enviarse en línea (base64) al crear; se guardan en GridFS
 class OrganizadorSchema(BaseModel):
     usuarioId: int
     avalPDF: Optional[bytes] = None
     tipoAval: TipoAvalEnum
     tipo: UsuarioTipo
 
+    model_config = ConfigDict(val_json_bytes="base64")
+
 
 class OrganizacionSchema(BaseModel):
     organizacionId: PyObjectId
@@ -37,16 +49,37 @@ class OrganizacionSchema(BaseModel):
     nombreParticipante: str
     certificadoParticipacion: Optional[bytes] = None
 
+    model_config = ConfigDict(val_json_bytes="base64")
 
-# 🔹 Base para creación
-class EventoCreate(BaseModel):
+
+# En las respuestas solo viaja la referencia al archivo
+class OrganizadorRespuesta(BaseModel):
+    usuarioId: int
+    avalPDFId: Optional[PyObjectId] = None
+    tipoAval: TipoAvalEnum
+    tipo: UsuarioTipo
+
+
+class OrganizacionRespuesta(BaseModel):
+    organizacionId: PyObjectId
+    participante: OrganizacionParticipante
+    nombreParticipante: str
+    certificadoParticipacionId: Optional[PyObjectId] = None
+
+
+# 🔹 Campos comunes
+class EventoBase(BaseModel):
     nombre: str
     estado: EstadoEventoEnum = EstadoEventoEnum.REGISTRADO
     tipo: TipoEventoEnum
     realizacion: RealizacionSchema
+    capacidad: int
+
+
+# 🔹 Base para creación
+class EventoCreate(EventoBase):
     organizador: List[OrganizadorSchema]
     organizacion: Optional[List[OrganizacionSchema]] = None
-    capacidad: int
 
 
 # 🔹 Para actualización parcial
@@ -60,9 +93,34 @@ class EventoUpdate(BaseModel):
     capacidad: Optional[int] = None
 
 
+# 🔹 Para listados con proyección (solo se devuelven los campos pedidos)
+class EventoResumen(BaseModel):
+    id: PyObjectId = Field(..., alias="_id")
+    nombre: Optional[str] = None
+    estado: Optional[EstadoEventoEnum] = None
+    tipo: Optional[TipoEventoEnum] = None
+    realizacion: Optional[RealizacionRespuesta] = None
+    organizador: Optional[List[OrganizadorRespuesta]] = None
+    organizacion: Optional[List[OrganizacionRespuesta]] = None
+    capacidad: Optional[int] = None
+    # Solo con expand=evaluaciones
+    evaluaciones: Optional[List[Evaluacion]] = None
+    resumenEvaluaciones: Optional[ResumenEvaluaciones] = None
+
+    class Config:
+        populate_by_name = True
+        from_attributes = True
+
+
 # 🔹 Para respuesta (GET)
-class EventoResponse(EventoCreate):
+class EventoResponse(EventoBase):
     id: PyObjectId = Field(..., alias="_id")
+    realizacion: RealizacionRespuesta
+    organizador: List[OrganizadorRespuesta]
+    organizacion: Optional[List[OrganizacionRespuesta]] = None
+    # Solo con expand=evaluaciones
+    evaluaciones: Optional[List[Evaluacion]] = None
+    resumenEvaluaciones: Optional[ResumenEvaluaciones] = None
 
     class Config:
         populate_by_name = True
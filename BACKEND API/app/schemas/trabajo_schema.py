@@ -0,0 +1,24 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+from app.models.trabajo import EstadoTrabajoEnum
+from app.schemas.common import PyObjectId
+
+
+# 🔹 Para respuesta (GET /trabajos)
+class TrabajoRespuesta(BaseModel):
+    id: PyObjectId = Field(..., alias="_id")
+    tipo: str
+    estado: EstadoTrabajoEnum
+    eventoId: Optional[PyObjectId] = None
+    # adjuntos_evento: un elemento por PDF con estado valido, rechazado (y motivo) o descartado
+    resultado: Optional[dict] = None
+    error: Optional[str] = None
+    intentos: int
+    creadoEn: datetime
+    iniciadoEn: Optional[datetime] = None
+    terminadoEn: Optional[datetime] = None
+
+    class Config:
+        populate_by_name = True
+        from_attributes = True
@@ -0,0 +1,272 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+from bson import Timestamp
+from pydantic import BaseModel
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app.core.config import settings
+from app.core.metricas import registro
+from app.db.mongodb import db
+
+logger = logging.getLogger(__name__)
+
+OPERACIONES = ["insert", "update", "replace", "delete"]
+
+# Código de MongoDB cuando el punto de reanudación (o de inicio) ya salió del oplog
+HISTORIAL_PERDIDO = 286
+# Códigos de un servidor que no admite change streams (standalone)
+SIN_CHANGE_STREAMS = {20, 40573}
+
+suscriptores_flujo = registro.medidor("flujo_suscriptores", "Clientes suscritos al flujo de cambios (SSE y WebSocket)")
+cambios_flujo = registro.contador(
+    "flujo_cambios_total",
+    "Cambios difundidos a los suscriptores por colección y operación",
+    ("coleccion", "operacion"),
+)
+desbordes_flujo = registro.contador("flujo_desbordes_total", "Suscriptores desconectados por no leer a tiempo")
+
+
+@dataclass
+class FiltroCambios:
+    colecciones: Set[str]
+    estados: Set[str] = field(default_factory=set)
+    tipos: Set[str] = field(default_factory=set)
+
+    def acepta(self, cambio: dict) -> bool:
+        if cambio["coleccion"] not in self.colecciones:
+            return False
+        # estado y tipo son de los eventos; sin documento (eliminaciones) no se puede filtrar
+        documento = cambio.get("documento")
+        if cambio["coleccion"] != "evento" or documento is None:
+            return True
+        if self.estados and documento.get("estado") not in self.estados:
+            return False
+        if self.tipos and documento.get("tipo") not in self.tipos:
+            return False
+        return True
+
+
+# 🔹 Marcas que el difusor intercala entre los cambios
+DESBORDE = {"control": "desborde"}
+REINICIO = {"control": "reinicio"}
+
+
+class Suscripcion:
+    def __init__(self, filtro: FiltroCambios):
+        self.filtro = filtro
+        self.cola: asyncio.Queue = asyncio.Queue(maxsize=settings.FLUJO_COLA_MAX)
+
+    def entregar(self, cambio: dict):
+        if not self.filtro.acepta(cambio):
+            return
+        try:
+            self.cola.put_nowait(cambio)
+        except asyncio.QueueFull:
+            # Cliente lento: se vacía la cola y se le pide reconectar con su último ID
+            while not self.cola.empty():
+                self.cola.get_nowait()
+            self.cola.put_nowait(DESBORDE)
+            desbordes_flujo.incrementar()
+
+
+class DifusorCambios:
+    """Un solo change stream por proceso sobre evento y evaluacion, repartido a todos los suscriptores.
+
+    Los últimos cambios se conservan en memoria para reanudar desde el ID de un cambio (Last-Event-ID).
+    Sin change streams (MongoDB standalone) se difunden las escrituras hechas por este proceso.
+    Hasta saber cuál de los dos modos aplica, las escrituras locales se retienen en `retenidos`.
+    """
+
+    def __init__(self):
+        self.modo = "pendiente"
+        self.retenidos: deque = deque(maxlen=settings.FLUJO_HISTORIAL)
+        self.campos: Dict[str, List[str]] = {}
+        self.suscripciones: Set[Suscripcion] = set()
+        self.historial: deque = deque(maxlen=settings.FLUJO_HISTORIAL)
+        self._secuencia = 0
+        self._prefijo_local = format(int(time.time()), "x")
+
+    # 🔹 Cada colección registra los campos que se pueden difundir (nunca binarios en línea)
+    def registrar(self, coleccion: str, campos: List[str]):
+        self.campos[coleccion] = campos
+
+    def pipeline(self) -> List[dict]:
+        proyeccion = {"operationType": 1, "ns": 1, "documentKey": 1, "clusterTime": 1}
+        for campos in self.campos.values():
+            proyeccion.update({f"fullDocument.{campo}": 1 for campo in campos})
+        return [
+            {"$match": {"ns.coll": {"$in": list(self.campos)}, "operationType": {"$in": OPERACIONES}}},
+            {"$project": proyeccion},
+        ]
+
+    def publicar(self, cambio: dict):
+        self.historial.append(cambio)
+        cambios_flujo.incrementar(coleccion=cambio["coleccion"], operacion=cambio["operacion"])
+        for suscripcion in list(self.suscripciones):
+            suscripcion.entregar(cambio)
+
+    # ✅ Publicador en proceso: solo cuando no hay change stream (si no, el cambio llegaría dos veces)
+    def publicar_local(self, coleccion: str, operacion: str, documento_id: Any, documento: Optional[BaseModel | dict] = None):
+        if self.modo == "changeStream":
+            return
+
+        if documento is not None:
+            # Un diccionario de Motor (PATCH) trae solo los campos modificados
+            datos = documento.model_dump(mode="json", by_alias=True) if isinstance(documento, BaseModel) else documento
+            documento = {"_id": datos.get("_id"), **proyectar(datos, self.campos.get(coleccion, []))}
+
+        cambio = {
+            "coleccion": coleccion,
+            "operacion": operacion,
+            "documentoId": documento_id,
+            "documento": documento,
+            "fecha": datetime.utcnow(),
+        }
+        # Antes de abrir el change stream: si se abre, él mismo repetirá esta escritura (ventana de arranque)
+        if self.modo == "pendiente":
+            self.retenidos.append(cambio)
+            return
+        self.publicar_con_id(cambio)
+
+    def publicar_con_id(self, cambio: dict):
+        self._secuencia += 1
+        self.publicar({"id": f"{self._prefijo_local}-{self._secuencia}", **cambio})
+
+    # 🔹 Modo definitivo: con change stream se descartan los retenidos; sin él se difunden
+    def fijar_modo(self, modo: str):
+        if self.modo == "pendiente" and modo == "local":
+            self.publicar_retenidos()
+        self.retenidos.clear()
+        self.modo = modo
+
+    def publicar_retenidos(self):
+        while self.retenidos:
+            self.publicar_con_id(self.retenidos.popleft())
+
+    # ✅ Tarea de fondo: el change stream compartido
+    async def escuchar(self):
+        token = None
+        ventana = True
+        try:
+            while True:
+                try:
+                    opciones = {"full_document": "updateLookup"}
+                    if token:
+                        opciones["resume_after"] = token
+                    elif ventana:
+                        # Al arrancar se leen los últimos minutos para poder reanudar a los clientes de antes del reinicio
+                        inicio = int(time.time()) - settings.FLUJO_VENTANA_ARRANQUE_SEGUNDOS
+                        opciones["start_at_operation_time"] = Timestamp(inicio, 0)
+
+                    async with db.client[settings.MONGO_DB_NAME].watch(self.pipeline(), **opciones) as flujo:
+                        self.fijar_modo("changeStream")
+                        async for evento in flujo:
+                            token = evento["_id"]
+                            self.publicar(cambio_desde_flujo(evento))
+                except OperationFailure as e:
+                    if e.code == HISTORIAL_PERDIDO:
+                        # El oplog no llega tan atrás: se sigue desde ahora, sin token ni ventana de arranque
+                        logger.warning("El flujo de cambios perdió su punto de reanudación: %s", e)
+                        token, ventana = None, False
+                        if self.modo == "pendiente":
+                            # Sin ventana el flujo ya no repetirá lo retenido
+                            self.publicar_retenidos()
+                        continue
+                    if e.code in SIN_CHANGE_STREAMS:
+                        # Un servidor standalone no soporta change streams: se difunden las escrituras locales
+                        logger.warning("Change streams no disponibles, el flujo de eventos solo ve este proceso: %s", e)
+                        return
+                    logger.warning("El servidor rechazó el flujo de cambios, reintentando: %s", e)
+                    await asyncio.sleep(5)
+                except PyMongoError as e:
+                    logger.warning("Flujo de cambios interrumpido, reintentando: %s", e)
+                    await asyncio.sleep(5)
+        finally:
+            # Si termina sin haber abierto el flujo (standalone, error inesperado o apagado), se difunde lo retenido
+            if self.modo == "pendiente":
+                self.fijar_modo("local")
+
+    # 🔹 Posición actual del historial ("" si está vacío): anclar con ella al cliente al recibir la petición
+    # evita perder los cambios que lleguen antes de que el generador empiece a leer
+    def ultimo_id(self) -> str:
+        return self.historial[-1]["id"] if self.historial else ""
+
+    # 🔹 Cambios posteriores a un ID del historial (None si ya no está en memoria)
+    def pendientes_desde(self, desde: str, filtro: FiltroCambios) -> Optional[List[dict]]:
+        if desde == "":
+            return [c for c in self.historial if filtro.acepta(c)]
+        ids = [c["id"] for c in self.historial]
+        if desde not in ids:
+            return None
+        return [c for c in list(self.historial)[ids.index(desde) + 1:] if filtro.acepta(c)]
+
+    # ✅ Suscribirse: primero lo pendiente desde el último ID visto, después los cambios en vivo.
+    # Entrega None cada FLUJO_LATIDO_SEGUNDOS sin cambios para que la conexión no quede inactiva.
+    async def suscribir(self, filtro: FiltroCambios, desde: Optional[str] = None) -> AsyncIterator[Optional[dict]]:
+        suscripcion = Suscripcion(filtro)
+        # Registrar y tomar el historial sin await de por medio: la cola solo recibe cambios posteriores
+        self.suscripciones.add(suscripcion)
+        suscriptores_flujo.fijar(len(self.suscripciones))
+        try:
+            if desde is not None:
+                pendientes = self.pendientes_desde(desde, filtro)
+                if pendientes is None:
+                    # El cliente debe recargar el estado completo con GET /eventos
+                    yield REINICIO
+                else:
+                    for cambio in pendientes:
+                        yield cambio
+
+            while True:
+                try:
+                    cambio = await asyncio.wait_for(suscripcion.cola.get(), settings.FLUJO_LATIDO_SEGUNDOS)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield cambio
+                if cambio is DESBORDE:
+                    return
+        finally:
+            self.suscripciones.discard(suscripcion)
+            suscriptores_flujo.fijar(len(self.suscripciones))
+
+
+# 🔹 Lo mismo que un $project de inclusión con rutas con punto (también dentro de arreglos)
+def proyectar(datos: Any, rutas: List[str]) -> Any:
+    if isinstance(datos, list):
+        return [proyectar(d, rutas) for d in datos]
+    if not isinstance(datos, dict):
+        return datos
+
+    hijos: Dict[str, List[str]] = {}
+    for ruta in rutas:
+        campo, _, resto = ruta.partition(".")
+        hijos.setdefault(campo, [])
+        if resto:
+            hijos[campo].append(resto)
+    return {
+        campo: proyectar(datos[campo], subrutas) if subrutas else datos[campo]
+        for campo, subrutas in hijos.items() if campo in datos
+    }
+
+
+def cambio_desde_flujo(evento: dict) -> dict:
+    tiempo = evento.get("clusterTime")
+    return {
+        "id": evento["_id"]["_data"],
+        "coleccion": evento["ns"]["coll"],
+        "operacion": evento["operationType"],
+        "documentoId": evento["documentKey"]["_id"],
+        "documento": evento.get("fullDocument"),
+        "fecha": tiempo.as_datetime() if tiempo else datetime.utcnow(),
+    }
+
+
+# ✅ Difusor único del proceso
+difusor_cambios = DifusorCambios()
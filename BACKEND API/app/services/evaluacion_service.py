@@ -0,0 +1,266 @@
+import logging
+from datetime import datetime
+from typing import Awaitable, Callable, Optional, Tuple, TypeVar
+
+from bson import ObjectId
+from fastapi import HTTPException, status
+from pymongo import ReadPreference, ReturnDocument
+from pymongo.errors import OperationFailure
+from pymongo.read_concern import ReadConcern
+from pymongo.write_concern import WriteConcern
+
+from app.core.config import settings
+from app.db.mongodb import db
+from app.models.eventos import EventoModel, EstadoEventoEnum
+from app.models.evaluaciones import EvaluacionModel, EstadoEvaluacionEnum
+from app.schemas.evaluacion_schema import EvaluacionCrear, EvaluacionLote
+from app.services.usuario_service import validar_rol_evaluador
+from app.services.cambios_service import difusor_cambios
+from app.crud.adjunto_crud import eliminar_adjuntos
+from app.crud.evaluacion_crud import invalidar_evaluacion, preparar_evaluacion
+from app.crud.evento_crud import construir_proyeccion, invalidar_evento
+
+logger = logging.getLogger(__name__)
+
+# 🔹 Estado del evento tras cada decisión: un rechazo lo devuelve a revisión, una aprobación lo cierra
+TRANSICIONES = {
+    EstadoEvaluacionEnum.APROBADO: EstadoEventoEnum.APROVADO,
+    EstadoEvaluacionEnum.RECHAZADO: EstadoEventoEnum.EN_REVISION,
+}
+ESTADOS_EVALUABLES = [EstadoEventoEnum.REGISTRADO.value, EstadoEventoEnum.EN_REVISION.value]
+
+# Código de MongoDB en un servidor standalone: "Transaction numbers are only allowed on a replica set member or mongos"
+SIN_TRANSACCIONES = 20
+
+T = TypeVar("T")
+
+
+class FlujoEvaluacion:
+    """Inserta (o elimina) la evaluación y cambia el estado del evento como una sola unidad.
+
+    En un replica set se usa una transacción multi-documento (with_transaction reintenta los
+    errores transitorios y los commits de resultado desconocido). En un servidor standalone se
+    cambia el estado con una escritura condicional y se revierte si la inserción falla; al eliminar,
+    la evaluación se vuelve a insertar si no se pudo corregir el estado del evento.
+    """
+
+    def __init__(self):
+        self.transacciones = True
+
+    # 🔹 Cambiar el estado solo si el evento admite evaluaciones (devuelve el evento anterior)
+    async def transicionar_evento(self, evento_id: ObjectId, estado: EstadoEvaluacionEnum, ahora: datetime, sesion=None) -> dict:
+        coleccion = EventoModel.get_motor_collection()
+        anterior = await coleccion.find_one_and_update(
+            {"_id": evento_id, "estado": {"$in": ESTADOS_EVALUABLES}},
+            {"$set": {"estado": TRANSICIONES[estado].value, "actualizadoEn": ahora}, "$inc": {"version": 1}},
+            projection={**construir_proyeccion(None), "version": 1, "actualizadoEn": 1},
+            return_document=ReturnDocument.BEFORE,
+            session=sesion
+        )
+        if anterior is not None:
+            return anterior
+
+        actual = await coleccion.find_one({"_id": evento_id}, {"estado": 1}, session=sesion)
+        if not actual:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Evento no encontrado")
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"El evento está en estado '{actual['estado']}' y ya no admite evaluaciones."
+        )
+
+    # 🔹 Devolver el evento al estado de su evaluación más reciente (sin evaluaciones: registrado).
+    # Devuelve el evento modificado, o None si ya estaba en ese estado o no existe.
+    async def recalcular_evento(self, evento_id: ObjectId, ahora: datetime, sesion=None) -> Optional[dict]:
+        ultima = await EvaluacionModel.get_motor_collection().find_one(
+            {"eventoId": evento_id}, {"estado": 1}, sort=[("_id", -1)], session=sesion
+        )
+        estado = TRANSICIONES[EstadoEvaluacionEnum(ultima["estado"])] if ultima else EstadoEventoEnum.REGISTRADO
+        return await EventoModel.get_motor_collection().find_one_and_update(
+            {"_id": evento_id, "estado": {"$ne": estado.value}},
+            {"$set": {"estado": estado.value, "actualizadoEn": ahora}, "$inc": {"version": 1}},
+            projection={**construir_proyeccion(None), "version": 1, "actualizadoEn": 1},
+            return_document=ReturnDocument.AFTER,
+            session=sesion
+        )
+
+    async def transaccion(self, operacion: Callable[..., Awaitable]):
+        async with await db.client.start_session() as sesion:
+            await sesion.with_transaction(
+                operacion,
+                read_concern=ReadConcern("snapshot"),
+                write_concern=WriteConcern("majority"),
+                read_preference=ReadPreference.PRIMARY
+            )
+
+    # 🔹 En una transacción si el servidor las admite; si no (standalone), con el flujo compensado
+    async def aplicar(
+        self,
+        en_transaccion: Callable[[], Awaitable[T]],
+        sin_transaccion: Callable[[], Awaitable[T]],
+    ) -> T:
+        if self.transacciones:
+            try:
+                return await en_transaccion()
+            except OperationFailure as e:
+                if e.code != SIN_TRANSACCIONES:
+                    raise
+                logger.warning("El servidor no admite transacciones, se usa el flujo compensado: %s", e)
+                self.transacciones = False
+        return await sin_transaccion()
+
+    async def en_transaccion(self, evaluacion: EvaluacionModel, ahora: datetime) -> dict:
+        resultado = {}
+
+        async def operacion(sesion):
+            resultado["evento"] = await self.transicionar_evento(evaluacion.eventoId, evaluacion.estado, ahora, sesion)
+            await evaluacion.insert(session=sesion)
+
+        await self.transaccion(operacion)
+        return resultado["evento"]
+
+    async def sin_transaccion(self, evaluacion: EvaluacionModel, ahora: datetime) -> dict:
+        anterior = await self.transicionar_evento(evaluacion.eventoId, evaluacion.estado, ahora)
+        try:
+            await evaluacion.insert()
+        except Exception:
+            # Se devuelve el estado anterior solo si nadie volvió a modificar el evento
+            await EventoModel.get_motor_collection().update_one(
+                {"_id": evaluacion.eventoId, "version": anterior.get("version", 0) + 1},
+                {"$set": {"estado": anterior["estado"], "actualizadoEn": datetime.utcnow()}, "$inc": {"version": 1}}
+            )
+            await invalidar_evento(evaluacion.eventoId)
+            raise
+        return anterior
+
+    # ✅ Registrar una evaluación (el evaluador ya fue validado)
+    async def registrar(self, data: EvaluacionCrear) -> EvaluacionModel:
+        evaluacion = await preparar_evaluacion(data)
+        ahora = datetime.utcnow()
+        try:
+            anterior = await self.aplicar(
+                lambda: self.en_transaccion(evaluacion, ahora),
+                lambda: self.sin_transaccion(evaluacion, ahora),
+            )
+        except Exception:
+            await eliminar_adjuntos(evaluacion.actaAprovacionId)
+            raise
+
+        await invalidar_evento(evaluacion.eventoId)
+        evento = EventoModel.model_validate({
+            **anterior,
+            "estado": TRANSICIONES[evaluacion.estado],
+            "version": anterior.get("version", 0) + 1,
+            "actualizadoEn": ahora,
+        })
+        difusor_cambios.publicar_local("evento", "update", evento.id, evento)
+        difusor_cambios.publicar_local("evaluacion", "insert", evaluacion.id, evaluacion)
+        return evaluacion
+
+    async def eliminar_en_transaccion(self, evaluacion_id: ObjectId, ahora: datetime) -> Tuple[Optional[dict], Optional[dict]]:
+        resultado = {}
+
+        async def operacion(sesion):
+            documento = await EvaluacionModel.get_motor_collection().find_one_and_delete(
+                {"_id": evaluacion_id}, session=sesion
+            )
+            resultado["evaluacion"] = documento
+            resultado["evento"] = await self.recalcular_evento(documento["eventoId"], ahora, sesion) if documento else None
+
+        await self.transaccion(operacion)
+        return resultado["evaluacion"], resultado["evento"]
+
+    async def eliminar_sin_transaccion(self, evaluacion_id: ObjectId, ahora: datetime) -> Tuple[Optional[dict], Optional[dict]]:
+        coleccion = EvaluacionModel.get_motor_collection()
+        documento = await coleccion.find_one_and_delete({"_id": evaluacion_id})
+        if documento is None:
+            return None, None
+        try:
+            evento = await self.recalcular_evento(documento["eventoId"], ahora)
+        except Exception:
+            # Si no se pudo corregir el estado del evento, la evaluación vuelve a su lugar
+            await coleccion.insert_one(documento)
+            raise
+        return documento, evento
+
+    # ✅ Eliminar una evaluación: el evento vuelve al estado de la evaluación más reciente que le quede
+    async def eliminar(self, id: str) -> dict:
+        if not ObjectId.is_valid(id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="El ID enviado no es un ObjectId válido"
+            )
+        evaluacion_id = ObjectId(id)
+        ahora = datetime.utcnow()
+        documento, evento = await self.aplicar(
+            lambda: self.eliminar_en_transaccion(evaluacion_id, ahora),
+            lambda: self.eliminar_sin_transaccion(evaluacion_id, ahora),
+        )
+        if documento is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Evaluación no encontrada"
+            )
+
+        await invalidar_evaluacion(evaluacion_id)
+        difusor_cambios.publicar_local("evaluacion", "delete", evaluacion_id)
+        if evento is not None:
+            await invalidar_evento(evento["_id"])
+            difusor_cambios.publicar_local("evento", "update", evento["_id"], EventoModel.model_validate(evento))
+        await eliminar_adjuntos(documento.get("actaAprovacionId"))
+        return {"mensaje": "Evaluación eliminada correctamente"}
+
+
+flujo_evaluacion = FlujoEvaluacion()
+
+
+# ✅ Evaluar un evento: valida evaluador y evento, crea la evaluación y cambia el estado del evento
+async def evaluar_evento(data: EvaluacionCrear) -> EvaluacionModel:
+    await validar_rol_evaluador(data.usuarioId)
+    return await flujo_evaluacion.registrar(data)
+
+
+# ✅ Eliminar una evaluación y devolver el evento al estado que le corresponde
+async def eliminar_evaluacion(id: str) -> dict:
+    return await flujo_evaluacion.eliminar(id)
+
+
+# ✅ Evaluar varios eventos en una petición (cada uno en su propia transacción)
+async def evaluar_eventos(lote: EvaluacionLote) -> dict:
+    if len(lote.evaluaciones) > settings.EVALUACION_LOTE_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"El lote supera el máximo de {settings.EVALUACION_LOTE_MAX} evaluaciones."
+        )
+    await validar_rol_evaluador(lote.usuarioId)
+
+    resultados = []
+    for indice, elemento in enumerate(lote.evaluaciones):
+        reporte: dict = {"indice": indice, "eventoId": str(elemento.eventoId)}
+        try:
+            evaluacion = await flujo_evaluacion.registrar(EvaluacionCrear(
+                estado=elemento.estado,
+                fechaEvaluacion=lote.fechaEvaluacion,
+                justificacion=elemento.justificacion,
+                eventoId=elemento.eventoId,
+                usuarioId=lote.usuarioId,
+            ))
+            reporte.update({
+                "estado": "evaluado",
+                "id": str(evaluacion.id),
+                "estadoEvento": TRANSICIONES[elemento.estado].value,
+            })
+        except HTTPException as e:
+            reporte.update({"estado": "error", "errores": [e.detail]})
+        except Exception:
+            # Un fallo de MongoDB en un elemento no corta el lote: los anteriores ya quedaron registrados
+            logger.exception("No se pudo registrar la evaluación %d del lote (evento %s)", indice, elemento.eventoId)
+            reporte.update({"estado": "error", "errores": ["No se pudo registrar la evaluación; vuelva a intentarlo."]})
+        resultados.append(reporte)
+
+    evaluados = sum(1 for r in resultados if r["estado"] == "evaluado")
+    return {
+        "total": len(resultados),
+        "evaluados": evaluados,
+        "fallidos": len(resultados) - evaluados,
+        "resultados": resultados,
+    }
@@ -0,0 +1,114 @@
+import asyncio
+import logging
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app.core.config import settings
+from app.models.instalacion import InstalacionModel
+
+logger = logging.getLogger(__name__)
+
+
+class InstalacionCatalogo(NamedTuple):
+    id: str
+    tipo: str
+    capacidad: int
+    ubicacion: str
+
+
+class CatalogoInstalaciones:
+    """Todas las instalaciones en memoria, por ID y por tipo (ordenadas por capacidad).
+
+    Las validaciones de los eventos y GET /instalaciones se resuelven aquí sin consultar MongoDB.
+    Se recarga entero con cada cambio del change stream de `instalacion` o, en un servidor
+    standalone, cada CATALOGO_INSTALACIONES_SEGUNDOS.
+    """
+
+    def __init__(self):
+        self.instalaciones: Dict[str, InstalacionCatalogo] = {}
+        self.por_tipo: Dict[str, List[InstalacionCatalogo]] = {}
+        self.capacidades: Dict[str, List[int]] = {}
+        self.cargado_en: Optional[datetime] = None
+        self.modo = "sinCargar"
+        self.bloqueo = asyncio.Lock()
+
+    async def cargar(self):
+        documentos = await InstalacionModel.get_motor_collection().find(
+            {}, {"tipo": 1, "capacidad": 1, "ubicacion": 1}
+        ).to_list(length=None)
+        instalaciones = {
+            d["_id"]: InstalacionCatalogo(d["_id"], d.get("tipo"), d.get("capacidad", 0), d.get("ubicacion"))
+            for d in documentos
+        }
+        por_tipo: Dict[str, List[InstalacionCatalogo]] = {}
+        for instalacion in sorted(instalaciones.values(), key=lambda i: (i.capacidad, i.id)):
+            por_tipo.setdefault(instalacion.tipo, []).append(instalacion)
+
+        # Se reemplaza todo sin await de por medio: cada petición ve el catálogo anterior o el nuevo
+        self.instalaciones = instalaciones
+        self.por_tipo = por_tipo
+        self.capacidades = {tipo: [i.capacidad for i in lista] for tipo, lista in por_tipo.items()}
+        self.cargado_en = datetime.utcnow()
+
+    # 🔹 Carga perezosa (procesos sin lifespan, como scripts o pruebas)
+    async def asegurar(self):
+        if self.cargado_en is not None:
+            return
+        async with self.bloqueo:
+            if self.cargado_en is None:
+                await self.cargar()
+
+    def obtener(self, instalacion_id: str) -> Optional[InstalacionCatalogo]:
+        return self.instalaciones.get(instalacion_id)
+
+    # ✅ Instalaciones de un tipo (o de todos) con al menos cierta capacidad, ordenadas por ID
+    def filtrar(self, tipo: Optional[str] = None, capacidad_minima: Optional[int] = None) -> List[InstalacionCatalogo]:
+        tipos = [tipo] if tipo else list(self.por_tipo)
+        resultado = []
+        for t in tipos:
+            lista = self.por_tipo.get(t, [])
+            desde = bisect_left(self.capacidades.get(t, []), capacidad_minima) if capacidad_minima else 0
+            resultado.extend(lista[desde:])
+        return sorted(resultado, key=lambda i: i.id)
+
+    def estadisticas(self) -> dict:
+        return {
+            "instalaciones": len(self.instalaciones),
+            "porTipo": {tipo: len(lista) for tipo, lista in self.por_tipo.items()},
+            "modo": self.modo,
+            "cargadoEn": self.cargado_en,
+        }
+
+    # ✅ Mantener el catálogo al día: change stream o, si no hay, recarga periódica
+    async def escuchar(self):
+        while True:
+            try:
+                async with InstalacionModel.get_motor_collection().watch() as cambios:
+                    self.modo = "changeStream"
+                    # Lo ocurrido antes de abrir el stream no se vio: se recarga
+                    await self.cargar()
+                    async for _ in cambios:
+                        await self.cargar()
+            except OperationFailure as e:
+                logger.warning(
+                    "Change streams no disponibles para el catálogo de instalaciones, se recarga cada %s s: %s",
+                    settings.CATALOGO_INSTALACIONES_SEGUNDOS, e
+                )
+                break
+            except PyMongoError as e:
+                logger.warning("Change stream de instalaciones interrumpido, reintentando: %s", e)
+                await asyncio.sleep(5)
+
+        self.modo = "periodico"
+        while True:
+            await asyncio.sleep(settings.CATALOGO_INSTALACIONES_SEGUNDOS)
+            try:
+                await self.cargar()
+            except PyMongoError as e:
+                logger.warning("No se pudo recargar el catálogo de instalaciones: %s", e)
+
+
+catalogo_instalaciones = CatalogoInstalaciones()
@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional
+
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+
+from app.core.config import settings
+from app.core.metricas import registro
+from app.models.trabajo import TrabajoModel, EstadoTrabajoEnum
+from app.schemas.common import PyObjectId
+
+logger = logging.getLogger(__name__)
+
+Manejador = Callable[[TrabajoModel], Awaitable[dict]]
+
+trabajos_terminados = registro.contador(
+    "trabajos_total",
+    "Trabajos en segundo plano terminados por tipo y resultado (completado, reintento, fallido)",
+    ("tipo", "resultado"),
+)
+duracion_trabajos = registro.histograma(
+    "trabajo_duracion_segundos", "Duración de cada intento de un trabajo en segundo plano", ("tipo",)
+)
+
+
+class ColaTrabajos:
+    """Cola de trabajos persistida en la colección `trabajo`.
+
+    Un trabajo se toma con find_one_and_update (un solo trabajador lo obtiene) y queda a su nombre
+    hasta `venceEn`; si el proceso muere, otro lo retoma al vencer el plazo. Los trabajadores de la
+    API se despiertan al encolar; uno aparte (scripts.trabajador) consulta cada pocos segundos.
+    """
+
+    def __init__(self):
+        self.manejadores: Dict[str, Manejador] = {}
+        self.nombre = f"{socket.gethostname()}-{os.getpid()}"
+        self.aviso = asyncio.Event()
+
+    def registrar(self, tipo: str, manejador: Manejador):
+        self.manejadores[tipo] = manejador
+
+    # ✅ Encolar un trabajo (lo procesa el primer trabajador libre)
+    async def encolar(self, tipo: str, datos: dict, evento_id: Optional[PyObjectId] = None) -> TrabajoModel:
+        trabajo = TrabajoModel(tipo=tipo, datos=datos, eventoId=evento_id)
+        await trabajo.insert()
+        self.aviso.set()
+        return trabajo
+
+    # 🔹 Tomar el trabajo pendiente más antiguo, o uno cuyo trabajador no terminó a tiempo
+    async def reclamar(self) -> Optional[TrabajoModel]:
+        ahora = datetime.utcnow()
+        documento = await TrabajoModel.get_motor_collection().find_one_and_update(
+            {
+                "tipo": {"$in": list(self.manejadores)},
+                "$or": [
+                    {"estado": EstadoTrabajoEnum.PENDIENTE.value, "disponibleEn": {"$lte": ahora}},
+                    {"estado": EstadoTrabajoEnum.EN_PROCESO.value, "venceEn": {"$lt": ahora}},
+                ],
+            },
+            {
+                "$set": {
+                    "estado": EstadoTrabajoEnum.EN_PROCESO.value,
+                    "trabajador": self.nombre,
+                    "iniciadoEn": ahora,
+                    "venceEn": ahora + timedelta(seconds=settings.TRABAJOS_PLAZO_SEGUNDOS),
+                },
+                "$inc": {"intentos": 1},
+            },
+            sort=[("disponibleEn", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+        return TrabajoModel.model_validate(documento) if documento else None
+
+    async def terminar(self, trabajo: TrabajoModel, cambios: dict):
+        # Solo si sigue a nombre de este trabajador (si venció, ya lo tomó otro)
+        await TrabajoModel.get_motor_collection().update_one(
+            {"_id": trabajo.id, "trabajador": self.nombre, "estado": EstadoTrabajoEnum.EN_PROCESO.value},
+            {"$set": {"venceEn": None, **cambios}},
+        )
+
+    # ✅ Ejecutar un trabajo tomado: completado, reintento con espera creciente o fallido
+    async def ejecutar(self, trabajo: TrabajoModel):
+        inicio = time.perf_counter()
+        try:
+            resultado = await self.manejadores[trabajo.tipo](trabajo)
+        except asyncio.CancelledError:
+            # Apagado: se devuelve a la cola sin gastar el intento
+            await self.terminar(trabajo, {"estado": EstadoTrabajoEnum.PENDIENTE.value, "intentos": trabajo.intentos - 1})
+            raise
+        except Exception as e:
+            error = e.detail if isinstance(e, HTTPException) else f"{type(e).__name__}: {e}"
+            logger.warning("Falló el trabajo %s (%s), intento %d: %s", trabajo.id, trabajo.tipo, trabajo.intentos, error)
+            if trabajo.intentos >= settings.TRABAJOS_MAX_INTENTOS:
+                cambios = {"estado": EstadoTrabajoEnum.FALLIDO.value, "terminadoEn": datetime.utcnow()}
+                trabajos_terminados.incrementar(tipo=trabajo.tipo, resultado="fallido")
+            else:
+                espera = timedelta(seconds=settings.TRABAJOS_SONDEO_SEGUNDOS * 2 ** trabajo.intentos)
+                cambios = {"estado": EstadoTrabajoEnum.PENDIENTE.value, "disponibleEn": datetime.utcnow() + espera}
+                trabajos_terminados.incrementar(tipo=trabajo.tipo, resultado="reintento")
+            await self.terminar(trabajo, {**cambios, "error": error})
+        else:
+            await self.terminar(trabajo, {
+                "estado": EstadoTrabajoEnum.COMPLETADO.value,
+                "resultado": resultado,
+                "error": None,
+                "terminadoEn": datetime.utcnow(),
+            })
+            trabajos_terminados.incrementar(tipo=trabajo.tipo, resultado="completado")
+        finally:
+            duracion_trabajos.observar(time.perf_counter() - inicio, tipo=trabajo.tipo)
+
+    # ✅ Procesar lo pendiente y volver (para ejecutar desde cron o en pruebas); devuelve cuántos se tomaron
+    async def procesar_pendientes(self) -> int:
+        total = 0
+        while (trabajo := await self.reclamar()) is not None:
+            await self.ejecutar(trabajo)
+            total += 1
+        return total
+
+    async def ciclo(self):
+        while True:
+            self.aviso.clear()
+            try:
+                trabajo = await self.reclamar()
+            except Exception as e:
+                logger.warning("No se pudo consultar la cola de trabajos: %s", e)
+                trabajo = None
+
+            if trabajo is None:
+                try:
+                    await asyncio.wait_for(self.aviso.wait(), settings.TRABAJOS_SONDEO_SEGUNDOS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            # Si no se pudo registrar el resultado, el trabajo se retoma cuando venza su plazo
+            try:
+                await self.ejecutar(trabajo)
+            except Exception as e:
+                logger.warning("No se pudo registrar el resultado del trabajo %s (%s): %s", trabajo.id, trabajo.tipo, e)
+
+    # ✅ Trabajador: varios ciclos concurrentes hasta que se cancela la tarea
+    async def trabajar(self, concurrencia: Optional[int] = None):
+        logger.info("Trabajador %s escuchando la cola (%s)", self.nombre, ", ".join(self.manejadores))
+        await asyncio.gather(*(self.ciclo() for _ in range(concurrencia or settings.TRABAJOS_CONCURRENCIA)))
+
+
+cola_trabajos = ColaTrabajos()
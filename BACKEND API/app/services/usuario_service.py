@@ -0,0 +1,149 @@
+import asyncio
+import logging
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from beanie.operators import In
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ConfigDict, Field
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app.core.cache import cache_lecturas
+from app.models.usuarios import (
+    UsuarioModel,
+    Vinculacion,
+    RolUsuarioEnum,
+    EstadoVinculacionEnum
+)
+
+
+# 🔹 Proyección mínima de un usuario para validar roles
+class UsuarioRoles(BaseModel):
+    id: int = Field(alias="_id")
+    nombre: str
+    apellidos: str
+    vinculacion: List[Vinculacion]
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    @property
+    def roles_activos(self) -> Set[RolUsuarioEnum]:
+        return {v.rol for v in self.vinculacion if v.estado == EstadoVinculacionEnum.ACTIVO}
+
+    @property
+    def nombre_completo(self) -> str:
+        return f"{self.nombre} {self.apellidos}"
+
+
+logger = logging.getLogger(__name__)
+
+# Los roles casi nunca cambian: se guardan en la caché compartida (prefijo "usuario") con su propio TTL
+PREFIJO_CACHE = "usuario"
+
+
+# ✅ Resolver varios usuarios con una sola consulta $in (solo los que no están en caché)
+async def resolver_usuarios(ids: Iterable[int]) -> Dict[int, UsuarioRoles]:
+    ids = list(dict.fromkeys(ids))
+    resueltos = {}
+    pendientes = []
+    for usuario_id, datos in zip(ids, await cache_lecturas.consultar_varios(PREFIJO_CACHE, ids)):
+        if datos is not None:
+            resueltos[usuario_id] = UsuarioRoles.model_validate_json(datos)
+        else:
+            pendientes.append(usuario_id)
+
+    if pendientes:
+        usuarios = await UsuarioModel.find(
+            In(UsuarioModel.id, pendientes),
+            projection_model=UsuarioRoles
+        ).to_list()
+        for usuario in usuarios:
+            resueltos[usuario.id] = usuario
+        await cache_lecturas.guardar_varios(
+            PREFIJO_CACHE,
+            {u.id: u.__pydantic_serializer__.to_json(u, by_alias=True) for u in usuarios}
+        )
+    return resueltos
+
+
+# 🔹 Hook explícito para cuando se modifica un usuario (None vacía toda la caché)
+async def invalidar_usuario(usuario_id: Optional[int] = None):
+    if usuario_id is None:
+        await cache_lecturas.invalidar(PREFIJO_CACHE)
+    else:
+        await cache_lecturas.invalidar(PREFIJO_CACHE, usuario_id)
+
+
+# 🔹 Escucha el change stream de `usuario` e invalida las entradas modificadas
+async def escuchar_cambios_usuarios():
+    while True:
+        try:
+            async with UsuarioModel.get_motor_collection().watch() as cambios:
+                # Lo ocurrido mientras no había stream no se vio: se empieza de cero
+                await invalidar_usuario()
+                async for cambio in cambios:
+                    if cambio["operationType"] in ("drop", "rename", "dropDatabase", "invalidate"):
+                        await invalidar_usuario()
+                    else:
+                        await invalidar_usuario(cambio["documentKey"]["_id"])
+        except OperationFailure as e:
+            # Un servidor standalone no soporta change streams: solo queda el TTL
+            logger.warning("Change streams no disponibles para la caché de roles: %s", e)
+            return
+        except PyMongoError as e:
+            logger.warning("Change stream de usuarios interrumpido, reintentando: %s", e)
+            await asyncio.sleep(5)
+
+
+async def obtener_usuario(usuario_id: int) -> Optional[UsuarioRoles]:
+    return (await resolver_usuarios([usuario_id])).get(usuario_id)
+
+
+# 🔹 Problemas de una lista de organizadores ya resueltos: (no encontrados, roles inválidos)
+def errores_organizadores(usuario_ids: Iterable[int], usuarios: Dict[int, UsuarioRoles]) -> Tuple[List[str], List[str]]:
+    no_encontrados = []
+    errores = []
+    for usuario_id in dict.fromkeys(usuario_ids):
+        usuario = usuarios.get(usuario_id)
+        if not usuario:
+            no_encontrados.append(f"Usuario con ID {usuario_id} no encontrado.")
+            continue
+
+        roles_activos = usuario.roles_activos
+
+        # ❌ Si tiene rol de secretaria activa → no puede organizar
+        if RolUsuarioEnum.SECRETARIA in roles_activos:
+            errores.append(f"El usuario {usuario.nombre_completo} no puede organizar eventos (rol: secretaria académica).")
+
+        # ✅ Solo estudiante o docente pueden organizar
+        elif not roles_activos & {RolUsuarioEnum.ESTUDIANTE, RolUsuarioEnum.DOCENTE}:
+            errores.append(f"El usuario {usuario.nombre_completo} debe ser estudiante o docente para organizar eventos.")
+    return no_encontrados, errores
+
+
+# ✅ Validar que todos los organizadores sean estudiantes o docentes activos
+async def validar_roles_organizadores(usuario_ids: Iterable[int]):
+    usuario_ids = list(dict.fromkeys(usuario_ids))
+    usuarios = await resolver_usuarios(usuario_ids)
+    no_encontrados, errores = errores_organizadores(usuario_ids, usuarios)
+
+    # Se devuelven todos los problemas juntos; 404 solo si todos son usuarios inexistentes
+    if no_encontrados or errores:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST if errores else status.HTTP_404_NOT_FOUND,
+            detail=no_encontrados + errores
+        )
+
+
+# ✅ Validar que el evaluador sea una secretaria académica activa
+async def validar_rol_evaluador(usuario_id: int):
+    usuario = await obtener_usuario(usuario_id)
+    if not usuario:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Usuario con ID {usuario_id} no encontrado"
+        )
+
+    if RolUsuarioEnum.SECRETARIA not in usuario.roles_activos:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Solo una secretaria académica puede realizar una evaluación"
+        )
@@ -0,0 +1 @@
+"""Benchmark de carga de la API (python -m bench). No forma parte de la aplicación."""
@@ -0,0 +1,224 @@
+"""Benchmark de la API: siembra una base sintética, ejecuta la aplicación en el mismo proceso
+con httpx.AsyncClient y guarda rendimiento y latencia de cada endpoint en un JSON.
+
+Uso (desde la carpeta BACKEND API):
+    python -m bench --eventos 10000                       # mongomock-motor en memoria
+    python -m bench --motor mongodb --eventos 1000000     # MongoDB real (MONGO_CONNECTION_STRING)
+    python -m bench --comparar bench/resultados/<anterior>.json
+
+Con --motor mongodb la base indicada en --base se vacía y se vuelve a sembrar.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+CARPETA_RESULTADOS = Path(__file__).resolve().parent / "resultados"
+
+
+def argumentos() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m bench", description=__doc__.splitlines()[0])
+    parser.add_argument("--motor", choices=["mongomock", "mongodb"], default="mongomock",
+                        help="mongomock: en memoria (requiere mongomock-motor); mongodb: servidor real")
+    parser.add_argument("--base", default="bench_eventos", help="Base de datos del benchmark (se vacía)")
+    parser.add_argument("--eventos", type=int, default=10000, help="Eventos a sembrar")
+    parser.add_argument("--usuarios", type=int, help="Usuarios a sembrar (por defecto, eventos / 10)")
+    parser.add_argument("--instalaciones", type=int, default=200, help="Instalaciones a sembrar")
+    parser.add_argument("--sin-sembrar", action="store_true", help="Reutilizar los datos de una ejecución anterior")
+    parser.add_argument("--peticiones", type=int, default=500, help="Peticiones medidas por escenario")
+    parser.add_argument("--calentamiento", type=int, default=20, help="Peticiones previas sin medir por escenario")
+    parser.add_argument("--concurrencia", type=int, default=10, help="Peticiones simultáneas")
+    parser.add_argument("--escenarios", nargs="*", help="Solo los escenarios cuyo nombre empiece por alguno de estos")
+    parser.add_argument("--salida", type=Path, help="Archivo de resultados (por defecto bench/resultados/<commit>-<fecha>.json)")
+    parser.add_argument("--comparar", type=Path, help="Resultados anteriores con los que comparar")
+    parser.add_argument("--umbral", type=float, default=0.2,
+                        help="Variación relativa de p95 o de peticiones/s que cuenta como regresión (0.2 = 20%%)")
+    return parser.parse_args()
+
+
+# 🔹 Estadísticas de latencia (en milisegundos)
+def percentil(ordenadas: List[float], p: float) -> float:
+    if not ordenadas:
+        return 0.0
+    indice = min(len(ordenadas) - 1, max(0, round(p / 100 * len(ordenadas)) - 1))
+    return round(ordenadas[indice] * 1000, 3)
+
+
+def resumen(latencias: List[float], codigos: Counter, inesperadas: int, duracion: float) -> dict:
+    ordenadas = sorted(latencias)
+    return {
+        "peticiones": len(latencias),
+        "inesperadas": inesperadas,
+        "codigos": {str(c): n for c, n in sorted(codigos.items())},
+        "duracionSegundos": round(duracion, 3),
+        "peticionesPorSegundo": round(len(latencias) / duracion, 2) if duracion else 0.0,
+        "latenciaMs": {
+            "media": round(sum(ordenadas) / len(ordenadas) * 1000, 3) if ordenadas else 0.0,
+            "p50": percentil(ordenadas, 50),
+            "p90": percentil(ordenadas, 90),
+            "p95": percentil(ordenadas, 95),
+            "p99": percentil(ordenadas, 99),
+            "max": percentil(ordenadas, 100),
+        },
+    }
+
+
+# ✅ Ejecutar un escenario con N trabajadores que comparten la cuota de peticiones
+async def medir(cliente, escenario, ctx, peticiones: int, concurrencia: int) -> dict:
+    latencias: List[float] = []
+    codigos: Counter = Counter()
+    inesperadas = 0
+    turnos = iter(range(peticiones))
+
+    async def trabajador():
+        nonlocal inesperadas
+        for _ in turnos:
+            peticion = escenario.preparar(ctx)
+            if peticion is None:
+                return
+            inicio = time.perf_counter()
+            respuesta = await cliente.request(**peticion)
+            latencias.append(time.perf_counter() - inicio)
+            codigos[respuesta.status_code] += 1
+            if respuesta.status_code not in escenario.esperado:
+                inesperadas += 1
+            if escenario.al_responder:
+                escenario.al_responder(ctx, respuesta)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabajador() for _ in range(concurrencia)))
+    return resumen(latencias, codigos, inesperadas, time.perf_counter() - inicio)
+
+
+def commit_actual() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# ✅ Comparar con una ejecución anterior: devuelve True si algún escenario empeoró más que el umbral
+def comparar(anterior: dict, actual: dict, umbral: float) -> bool:
+    regresion = False
+    print(f"\nComparación con {anterior.get('commit')} ({anterior.get('fecha')}):")
+    for nombre, medido in actual["escenarios"].items():
+        previo = anterior.get("escenarios", {}).get(nombre)
+        if not previo or "latenciaMs" not in previo or "latenciaMs" not in medido:
+            continue
+        p95_antes, p95 = previo["latenciaMs"]["p95"], medido["latenciaMs"]["p95"]
+        rps_antes, rps = previo["peticionesPorSegundo"], medido["peticionesPorSegundo"]
+        empeora = (p95_antes and p95 > p95_antes * (1 + umbral)) or (rps_antes and rps < rps_antes * (1 - umbral))
+        regresion = regresion or bool(empeora)
+        print(
+            f"  {'❌' if empeora else '✅'} {nombre:<34} p95 {p95_antes:>9.2f} → {p95:>9.2f} ms"
+            f"   {rps_antes:>8.1f} → {rps:>8.1f} pet/s"
+        )
+    return regresion
+
+
+async def principal(args: argparse.Namespace) -> int:
+    # La configuración se lee al importar la aplicación: la base del benchmark va primero
+    os.environ["MONGO_DB_NAME"] = args.base
+    os.environ.setdefault("MONGO_CONNECTION_STRING", "mongodb://localhost:27017")
+
+    import httpx
+    from contextlib import AsyncExitStack
+    from app.main import app
+    from app.core.config import settings
+    from app.db.mongodb import db
+    from app.services.evaluacion_service import flujo_evaluacion
+    from bench.semillas import Generador, sembrar
+    from bench.escenarios import ESCENARIOS, crear_contexto
+
+    async with AsyncExitStack() as pila:
+        if args.motor == "mongomock":
+            try:
+                from mongomock_motor import AsyncMongoMockClient
+            except ImportError:
+                print("El motor mongomock requiere el paquete mongomock-motor (pip install mongomock-motor).")
+                return 2
+            from beanie import init_beanie
+            from app.db.modelsregistry import document_models
+
+            db.client = AsyncMongoMockClient()
+            await init_beanie(database=db.client[settings.MONGO_DB_NAME], document_models=document_models)
+            # mongomock no tiene sesiones: el flujo de evaluación usa el camino de un servidor standalone
+            flujo_evaluacion.transacciones = False
+        else:
+            # El mismo arranque que en producción: conexión, Beanie, GridFS y change streams
+            await pila.enter_async_context(app.router.lifespan_context(app))
+        base = db.client[settings.MONGO_DB_NAME]
+
+        dataset = {}
+        if not args.sin_sembrar or args.motor == "mongomock":
+            print(f"🌱 Sembrando {args.eventos} eventos en '{args.base}' ({args.motor})...")
+            inicio = time.perf_counter()
+            generador = Generador(args.eventos, args.usuarios or args.eventos // 10, args.instalaciones)
+            dataset = await sembrar(base, generador)
+            print(f"   {dataset} en {time.perf_counter() - inicio:.1f} s")
+        ctx = await crear_contexto(base)
+
+        cliente = await pila.enter_async_context(
+            httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None)
+        )
+        escenarios = {}
+        for escenario in ESCENARIOS:
+            if args.escenarios and not any(escenario.nombre.startswith(e) for e in args.escenarios):
+                continue
+            if escenario.requiere == "mongodb" and args.motor != "mongodb":
+                escenarios[escenario.nombre] = {"omitido": "requiere MongoDB ($bit, GridFS, transacciones o $lookup con pipeline)"}
+                print(f"  ⏭️  {escenario.nombre:<34} omitido con {args.motor}")
+                continue
+
+            await medir(cliente, escenario, ctx, args.calentamiento, args.concurrencia)
+            medido = await medir(cliente, escenario, ctx, args.peticiones, args.concurrencia)
+            escenarios[escenario.nombre] = medido
+            latencia = medido["latenciaMs"]
+            print(
+                f"  {'⚠️ ' if medido['inesperadas'] else '✅'} {escenario.nombre:<34} "
+                f"{medido['peticionesPorSegundo']:>8.1f} pet/s   p50 {latencia['p50']:>8.2f}   "
+                f"p95 {latencia['p95']:>8.2f}   p99 {latencia['p99']:>8.2f} ms   {medido['codigos']}"
+            )
+
+    commit = commit_actual()
+    resultado = {
+        "commit": commit,
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "entorno": {"python": platform.python_version(), "plataforma": platform.platform(), "motor": args.motor},
+        "parametros": {
+            "eventos": args.eventos,
+            "usuarios": args.usuarios or args.eventos // 10,
+            "instalaciones": args.instalaciones,
+            "peticiones": args.peticiones,
+            "calentamiento": args.calentamiento,
+            "concurrencia": args.concurrencia,
+        },
+        "dataset": dataset,
+        "escenarios": escenarios,
+    }
+
+    salida = args.salida or CARPETA_RESULTADOS / f"{commit or 'sin-commit'}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    salida.parent.mkdir(parents=True, exist_ok=True)
+    salida.write_text(json.dumps(resultado, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"\n📄 Resultados en {salida}")
+
+    if args.comparar:
+        anterior = json.loads(args.comparar.read_text(encoding="utf-8"))
+        if comparar(anterior, resultado, args.umbral):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(principal(argumentos())))
@@ -0,0 +1,303 @@
+"""Una petición representativa por endpoint de evento_routes y evaluacion_routes.
+
+El flujo /eventos/stream no se mide: es una conexión de larga duración, no una petición.
+"""
+import base64
+import itertools
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+E = "/api/v1/eventos/eventos"
+V = "/api/v1/evaluaciones/evaluaciones"
+I = "/api/v1/instalaciones"
+B = "/api/v1/buscar"
+X = "/api/v1/export"
+
+PDF = b"%PDF-1.4\n" + b"0" * 64 * 1024 + b"\n%%EOF"
+MUESTRA = 2000
+
+# Días de realización de los eventos creados durante el benchmark (no se cruzan con los sembrados)
+FECHA_CREADOS = datetime(2099, 1, 1)
+ORGANIZACION = "65af10b1c1a4d3f9c0a1a001"
+
+
+@dataclass
+class Contexto:
+    """IDs tomados de la base sembrada y lo que van creando los escenarios."""
+
+    azar: random.Random
+    eventos: List[str]
+    evaluables: List[str]
+    descartables: List[str]
+    evaluaciones: List[str]
+    evaluaciones_descartables: List[str]
+    instalaciones: List[dict]
+    evaluador: int
+    organizadores: List[int]
+    etags: Dict[str, str] = field(default_factory=dict)
+    creados: List[str] = field(default_factory=list)
+    # Rutas de los PDFs subidos, para los escenarios de descarga
+    avales: List[str] = field(default_factory=list)
+    certificados: List[str] = field(default_factory=list)
+    evaluaciones_creadas: List[str] = field(default_factory=list)
+    actas: List[str] = field(default_factory=list)
+    contador: itertools.count = field(default_factory=itertools.count)
+
+    def evento(self) -> str:
+        return self.azar.choice(self.eventos)
+
+    def evaluacion(self) -> str:
+        return self.azar.choice(self.evaluaciones)
+
+    # 🔹 Cuerpo de POST /eventos en un día propio, para que nunca choque con otra reserva
+    def evento_nuevo(self, aval: Optional[bytes] = None) -> dict:
+        n = next(self.contador)
+        instalacion = self.instalaciones[n % len(self.instalaciones)]
+        capacidad = min(instalacion["capacidad"], 20)
+        return {
+            "nombre": f"Evento de benchmark {n}",
+            "tipo": "academico",
+            "realizacion": {
+                "instalaciones": [{"instalacionId": instalacion["_id"], "capacidadInstalacion": capacidad}],
+                "fecha": (FECHA_CREADOS + timedelta(days=n)).isoformat(),
+                "horaInicio": "08:00",
+                "horaFin": "10:00",
+            },
+            "organizador": [{
+                "usuarioId": self.organizadores[0], "tipoAval": "directorPrograma", "tipo": "principal",
+                # PDF en línea: se procesa en segundo plano (202)
+                **({"avalPDF": base64.b64encode(aval).decode()} if aval else {}),
+            }],
+            "organizacion": [{"organizacionId": ORGANIZACION, "participante": "otro", "nombreParticipante": "Benchmark"}],
+            "capacidad": capacidad,
+        }
+
+
+async def crear_contexto(base: AsyncIOMotorDatabase, semilla: int = 7) -> Contexto:
+    async def ids(coleccion: str, filtro: dict, cantidad: int = MUESTRA) -> List[str]:
+        cursor = base[coleccion].find(filtro, {"_id": 1}).sort("_id", 1).limit(cantidad)
+        return [str(d["_id"]) async for d in cursor]
+
+    # Las eliminaciones usan la mitad de la muestra; las lecturas, la otra
+    eventos = await ids("evento", {}, 2 * MUESTRA)
+    evaluaciones = await ids("evaluacion", {}, 2 * MUESTRA)
+    eliminables = {*eventos[::2], *evaluaciones[::2]}
+
+    evaluadores = await base["usuario"].find(
+        {"vinculacion": {"$elemMatch": {"rol": "secretariaAcademica", "estado": "activo"}}}, {"_id": 1}
+    ).to_list(length=1)
+    organizadores = await base["usuario"].find(
+        {"vinculacion": {"$elemMatch": {"rol": {"$in": ["estudiante", "docente"]}, "estado": "activo"}}}, {"_id": 1}
+    ).to_list(length=MUESTRA)
+
+    return Contexto(
+        azar=random.Random(semilla),
+        eventos=eventos[1::2],
+        evaluables=[
+            e for e in await ids("evento", {"estado": {"$in": ["registrado", "enRevision"]}}, 2 * MUESTRA)
+            if e not in eliminables
+        ],
+        descartables=eventos[::2],
+        evaluaciones=evaluaciones[1::2],
+        evaluaciones_descartables=evaluaciones[::2],
+        instalaciones=await base["instalacion"].find({}, {"capacidad": 1}).to_list(length=None),
+        evaluador=evaluadores[0]["_id"],
+        organizadores=[u["_id"] for u in organizadores],
+    )
+
+
+@dataclass
+class Escenario:
+    nombre: str
+    # Argumentos de httpx.AsyncClient.request; None si ya no quedan datos para la petición
+    preparar: Callable[[Contexto], Optional[dict]]
+    esperado: Tuple[int, ...] = (200,)
+    al_responder: Optional[Callable[[Contexto, httpx.Response], None]] = None
+    # "mongodb": usa $bit, GridFS o transacciones, que mongomock no implementa
+    requiere: Optional[str] = None
+
+
+def tomar(lista: list) -> Optional[object]:
+    return lista.pop() if lista else None
+
+
+def guardar_etag(ctx: Contexto, respuesta: httpx.Response):
+    if "etag" in respuesta.headers:
+        ctx.etags[str(respuesta.url.path)] = respuesta.headers["etag"]
+
+
+# 🔹 Revalidar un recurso ya leído (304 si no cambió desde entonces)
+def condicional(ctx: Contexto, prefijo: str) -> Optional[dict]:
+    rutas = [r for r in ctx.etags if r.startswith(prefijo)]
+    if not rutas:
+        return None
+    ruta = ctx.azar.choice(rutas)
+    return {"method": "GET", "url": ruta, "headers": {"If-None-Match": ctx.etags[ruta]}}
+
+
+def guardar_id(lista: str):
+    def guardar(ctx: Contexto, respuesta: httpx.Response):
+        if respuesta.status_code in (201, 202):
+            getattr(ctx, lista).append(respuesta.json()["_id"])
+    return guardar
+
+
+def guardar_ruta(lista: str):
+    def guardar(ctx: Contexto, respuesta: httpx.Response):
+        if respuesta.status_code == 200:
+            getattr(ctx, lista).append(respuesta.url.path)
+    return guardar
+
+
+def si_hay(valor, construir: Callable) -> Optional[dict]:
+    return None if valor is None else construir(valor)
+
+
+def elegir(ctx: Contexto, lista: list) -> Optional[object]:
+    return ctx.azar.choice(lista) if lista else None
+
+
+def subir_pdf(ruta: str) -> dict:
+    return {"method": "PUT", "url": ruta, "content": PDF, "headers": {"Content-Type": "application/pdf"}}
+
+
+ESCENARIOS: List[Escenario] = [
+    # 🔹 Eventos: lecturas
+    Escenario("eventos.listar", lambda ctx: {"method": "GET", "url": f"{E}/", "params": {"limit": 50}}),
+    Escenario("eventos.listar_filtrado", lambda ctx: {
+        "method": "GET", "url": f"{E}/",
+        "params": {
+            "estado": ctx.azar.choice(["registrado", "enRevision", "aprovado"]),
+            "tipo": ctx.azar.choice(["academico", "ludico"]),
+            "desde": "2025-01-01", "hasta": "2025-03-31", "limit": 50,
+        },
+    }),
+    Escenario("eventos.listar_campos", lambda ctx: {
+        "method": "GET", "url": f"{E}/", "params": {"fields": "nombre,estado,realizacion", "limit": 200},
+    }),
+    Escenario("eventos.listar_expandido", lambda ctx: {
+        "method": "GET", "url": f"{E}/", "params": {"expand": "evaluaciones", "limit": 20},
+    }, requiere="mongodb"),
+    Escenario("eventos.obtener", lambda ctx: {"method": "GET", "url": f"{E}/{ctx.evento()}"}, al_responder=guardar_etag),
+    Escenario("eventos.obtener_condicional", lambda ctx: condicional(ctx, E), esperado=(200, 304)),
+    Escenario("eventos.obtener_expandido", lambda ctx: {
+        "method": "GET", "url": f"{E}/{ctx.evento()}", "params": {"expand": "evaluaciones"},
+    }, requiere="mongodb"),
+    Escenario("eventos.evaluaciones", lambda ctx: {"method": "GET", "url": f"{E}/{ctx.evento()}/evaluaciones"}),
+
+    # 🔹 Eventos: escrituras
+    Escenario(
+        "eventos.crear", lambda ctx: {"method": "POST", "url": f"{E}/", "json": ctx.evento_nuevo()},
+        esperado=(201,), al_responder=guardar_id("creados"), requiere="mongodb",
+    ),
+    Escenario(
+        "eventos.crear_con_pdf", lambda ctx: {"method": "POST", "url": f"{E}/", "json": ctx.evento_nuevo(PDF)},
+        esperado=(202,), al_responder=guardar_id("creados"), requiere="mongodb",
+    ),
+    Escenario(
+        "eventos.importar", lambda ctx: {"method": "POST", "url": f"{E}/bulk", "json": [ctx.evento_nuevo() for _ in range(20)]},
+        requiere="mongodb",
+    ),
+    # PUT reemplaza el evento completo (y sus reservas): se usa sobre los creados por el benchmark
+    Escenario(
+        "eventos.actualizar", lambda ctx: si_hay(elegir(ctx, ctx.creados), lambda id: {
+            "method": "PUT", "url": f"{E}/{id}", "json": ctx.evento_nuevo(),
+        }),
+        requiere="mongodb",
+    ),
+    # PATCH de un campo: una sola escritura y una respuesta con solo lo modificado
+    Escenario("eventos.parchear", lambda ctx: {
+        "method": "PATCH", "url": f"{E}/{ctx.evento()}", "json": {"nombre": f"Evento {next(ctx.contador)}"},
+    }),
+    Escenario(
+        "eventos.subir_aval", lambda ctx: si_hay(elegir(ctx, ctx.creados), lambda id: subir_pdf(
+            f"{E}/{id}/organizadores/{ctx.organizadores[0]}/aval"
+        )),
+        al_responder=guardar_ruta("avales"), requiere="mongodb",
+    ),
+    Escenario(
+        "eventos.descargar_aval", lambda ctx: si_hay(elegir(ctx, ctx.avales), lambda ruta: {"method": "GET", "url": ruta}),
+        requiere="mongodb",
+    ),
+    Escenario(
+        "eventos.subir_certificado", lambda ctx: si_hay(elegir(ctx, ctx.creados), lambda id: subir_pdf(
+            f"{E}/{id}/organizaciones/{ORGANIZACION}/certificado"
+        )),
+        al_responder=guardar_ruta("certificados"), requiere="mongodb",
+    ),
+    Escenario(
+        "eventos.descargar_certificado",
+        lambda ctx: si_hay(elegir(ctx, ctx.certificados), lambda ruta: {"method": "GET", "url": ruta}),
+        requiere="mongodb",
+    ),
+    Escenario("eventos.eliminar", lambda ctx: si_hay(tomar(ctx.descartables), lambda id: {
+        "method": "DELETE", "url": f"{E}/{id}",
+    })),
+
+    # 🔹 Instalaciones (catálogo en memoria)
+    Escenario("instalaciones.listar", lambda ctx: {
+        "method": "GET", "url": f"{I}/",
+        "params": {"tipo": ctx.azar.choice(["auditorio", "salon", "laboratorio"]), "capacidadMinima": 30},
+    }),
+
+    # 🔹 Búsqueda: palabras incompletas, como las envía el autocompletado
+    Escenario("buscar.prefijo", lambda ctx: {
+        "method": "GET", "url": f"{B}/",
+        "params": {"q": ctx.azar.choice(["sem", "conci", "econo", "tecnol", "torneo fut", "programacion"])},
+    }),
+
+    # 🔹 Exportación completa transmitida (Parquet depende de pyarrow: no se mide)
+    Escenario("exportar.eventos_ndjson", lambda ctx: {"method": "GET", "url": f"{X}/eventos"}),
+    Escenario("exportar.eventos_csv", lambda ctx: {"method": "GET", "url": f"{X}/eventos", "params": {"formato": "csv"}}),
+    Escenario("exportar.evaluaciones_csv", lambda ctx: {
+        "method": "GET", "url": f"{X}/evaluaciones", "params": {"formato": "csv"},
+    }),
+
+    # 🔹 Evaluaciones (los rechazos dejan el evento en revisión: se puede volver a evaluar)
+    Escenario("evaluaciones.crear", lambda ctx: {
+        "method": "POST", "url": f"{V}/",
+        "json": {
+            "estado": "rechazado", "fechaEvaluacion": datetime.utcnow().isoformat(), "justificacion": "Benchmark",
+            "eventoId": ctx.azar.choice(ctx.evaluables), "usuarioId": ctx.evaluador,
+        },
+    }, esperado=(201,), al_responder=guardar_id("evaluaciones_creadas")),
+    Escenario("evaluaciones.lote", lambda ctx: {
+        "method": "POST", "url": f"{V}/lote",
+        "json": {
+            "usuarioId": ctx.evaluador, "fechaEvaluacion": datetime.utcnow().isoformat(),
+            "evaluaciones": [
+                {"eventoId": e, "estado": "rechazado", "justificacion": "Benchmark"}
+                for e in ctx.azar.sample(ctx.evaluables, k=min(10, len(ctx.evaluables)))
+            ],
+        },
+    }),
+    Escenario("evaluaciones.listar", lambda ctx: {"method": "GET", "url": f"{V}/", "params": {"limit": 50}}),
+    Escenario("evaluaciones.listar_filtrado", lambda ctx: {
+        "method": "GET", "url": f"{V}/", "params": {"eventoId": ctx.evento(), "estado": "rechazado"},
+    }),
+    Escenario("evaluaciones.obtener", lambda ctx: {"method": "GET", "url": f"{V}/{ctx.evaluacion()}"}, al_responder=guardar_etag),
+    Escenario("evaluaciones.obtener_condicional", lambda ctx: condicional(ctx, V), esperado=(200, 304)),
+    Escenario("evaluaciones.actualizar", lambda ctx: {
+        "method": "PUT", "url": f"{V}/{ctx.evaluacion()}", "json": {"justificacion": f"Revisada {next(ctx.contador)}"},
+    }),
+    Escenario("evaluaciones.parchear", lambda ctx: {
+        "method": "PATCH", "url": f"{V}/{ctx.evaluacion()}", "json": {"justificacion": f"Parche {next(ctx.contador)}"},
+    }),
+    Escenario(
+        "evaluaciones.subir_acta",
+        lambda ctx: si_hay(elegir(ctx, ctx.evaluaciones_creadas), lambda id: subir_pdf(f"{V}/{id}/acta")),
+        al_responder=guardar_ruta("actas"), requiere="mongodb",
+    ),
+    Escenario(
+        "evaluaciones.descargar_acta", lambda ctx: si_hay(elegir(ctx, ctx.actas), lambda ruta: {"method": "GET", "url": ruta}),
+        requiere="mongodb",
+    ),
+    Escenario("evaluaciones.eliminar", lambda ctx: si_hay(tomar(ctx.evaluaciones_descartables), lambda id: {
+        "method": "DELETE", "url": f"{V}/{id}",
+    })),
+]
@@ -0,0 +1,206 @@
+"""Datos sintéticos para el benchmark, generados a partir de los documentos de ejemplo
+de `BaseDatos y Inserts/inserts/*.json` (scripts de mongosh) y escalados a N eventos.
+"""
+import random
+import re
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from bson import ObjectId, json_util
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.horario import calcular_intervalo
+from app.core.busqueda import terminos_documento
+from app.crud.reserva_crud import reconstruir_reservas
+
+CARPETA_INSERTS = Path(__file__).resolve().parents[2] / "BaseDatos y Inserts" / "inserts"
+TAMANO_LOTE = 5000
+
+# Fechas de realización repartidas en tres años a partir de esta
+FECHA_INICIAL = datetime(2024, 1, 1)
+DIAS = 3 * 365
+
+
+# 🔹 Lectura de los scripts de mongosh: db.<coleccion>.insertMany([ ... ])
+def sin_comentarios(texto: str) -> str:
+    lineas = []
+    for linea in texto.splitlines():
+        en_cadena = False
+        for i, caracter in enumerate(linea):
+            if caracter == '"' and (i == 0 or linea[i - 1] != "\\"):
+                en_cadena = not en_cadena
+            elif not en_cadena and linea.startswith("//", i):
+                linea = linea[:i]
+                break
+        lineas.append(linea)
+    return "\n".join(lineas)
+
+
+def a_json_extendido(texto: str) -> str:
+    texto = re.sub(r'ObjectId\("([0-9a-f]{24})"\)', r'{"$oid": "\1"}', texto)
+    texto = re.sub(r'ISODate\("([^"]+)"\)', r'{"$date": "\1"}', texto)
+    texto = re.sub(r'BinData\(\s*(\d+)\s*,\s*"([^"]*)"\)', r'{"$binary": {"base64": "\2", "subType": "0\1"}}', texto)
+    # Claves sin comillas y comas finales
+    texto = re.sub(r'([{,]\s*)([A-Za-z_$][\w$]*)\s*:', r'\1"\2":', texto)
+    return re.sub(r",(\s*[}\]])", r"\1", texto)
+
+
+def leer_inserts(nombre: str) -> List[dict]:
+    texto = sin_comentarios((CARPETA_INSERTS / nombre).read_text(encoding="utf-8"))
+    inicio, fin = texto.index("["), texto.rindex("]")
+    return json_util.loads(a_json_extendido(texto[inicio:fin + 1]))
+
+
+def plantillas() -> Dict[str, List[dict]]:
+    return {
+        "usuario": leer_inserts("insertUsuario.json"),
+        "instalacion": leer_inserts("insertInstalacion.json"),
+        "organizacion": leer_inserts("insertOrganizacion.json"),
+        "facultad": leer_inserts("insertFacultad.json"),
+        "evento": leer_inserts("insertEvento.json"),
+        "evaluacion": leer_inserts("insertEvaluacion.json"),
+    }
+
+
+class Generador:
+    """Multiplica las plantillas: los IDs y las referencias entre colecciones se mantienen coherentes."""
+
+    def __init__(self, eventos: int, usuarios: int, instalaciones: int, semilla: int = 7):
+        self.base = plantillas()
+        self.total_eventos = eventos
+        self.total_usuarios = max(usuarios, len(self.base["usuario"]))
+        self.total_instalaciones = max(instalaciones, len(self.base["instalacion"]))
+        self.azar = random.Random(semilla)
+        self.instalaciones: List[dict] = []
+        self.evaluadores: List[int] = []
+        self.organizadores: List[int] = []
+        self.eventos: List[Tuple[ObjectId, str]] = []
+
+    # 🔹 Usuarios: los de ejemplo se repiten con IDs nuevos (se conservan sus vinculaciones y roles)
+    def usuarios(self) -> Iterator[dict]:
+        plantillas_usuario = self.base["usuario"]
+        for i in range(self.total_usuarios):
+            usuario = dict(plantillas_usuario[i % len(plantillas_usuario)])
+            usuario["_id"] = i + 1
+            usuario["email"] = f"usuario{i + 1}@bench.edu"
+            roles = {v.get("rol") for v in usuario.get("vinculacion", []) if v.get("estado") == "activo"}
+            if "secretariaAcademica" in roles:
+                self.evaluadores.append(usuario["_id"])
+            elif roles & {"estudiante", "docente"}:
+                self.organizadores.append(usuario["_id"])
+            yield usuario
+
+    def instalaciones_generadas(self) -> Iterator[dict]:
+        plantillas_instalacion = self.base["instalacion"]
+        for i in range(self.total_instalaciones):
+            instalacion = dict(plantillas_instalacion[i % len(plantillas_instalacion)])
+            copia = i // len(plantillas_instalacion)
+            if copia:
+                instalacion["_id"] = f"{instalacion['_id']}-{copia}"
+            self.instalaciones.append(instalacion)
+            yield instalacion
+
+    # 🔹 Eventos: nombre, tipo, horario y organización de las plantillas; fecha, instalaciones
+    # y organizadores al azar (los PDFs en línea no se copian: en la API viven en GridFS)
+    def eventos_generados(self) -> Iterator[dict]:
+        plantillas_evento = self.base["evento"]
+        for i in range(self.total_eventos):
+            plantilla = plantillas_evento[i % len(plantillas_evento)]
+            realizacion = plantilla["realizacion"]
+            instalaciones = self.azar.sample(self.instalaciones, k=len(realizacion["instalaciones"]))
+            asignadas = [
+                {"instalacionId": inst["_id"], "capacidadInstalacion": min(inst["capacidad"], orig["capacidadInstalacion"])}
+                for inst, orig in zip(instalaciones, realizacion["instalaciones"])
+            ]
+            fecha = FECHA_INICIAL + timedelta(days=self.azar.randrange(DIAS))
+            evento_id = ObjectId()
+            estado = self.azar.choice(["registrado", "enRevision", "aprovado"])
+            self.eventos.append((evento_id, estado))
+            evento = {
+                "_id": evento_id,
+                "nombre": f"{plantilla['nombre']} #{i + 1}",
+                "estado": estado,
+                "tipo": plantilla["tipo"],
+                "realizacion": {
+                    "instalaciones": asignadas,
+                    "fecha": fecha,
+                    "horaInicio": realizacion["horaInicio"],
+                    "horaFin": realizacion["horaFin"],
+                    **(calcular_intervalo(fecha, realizacion["horaInicio"], realizacion["horaFin"]) or {}),
+                },
+                "organizador": [
+                    {
+                        "usuarioId": self.azar.choice(self.organizadores),
+                        "avalPDFId": None,
+                        "tipoAval": o["tipoAval"],
+                        "tipo": o["tipo"],
+                    }
+                    for o in plantilla["organizador"]
+                ],
+                "organizacion": [
+                    {
+                        "organizacionId": o["organizacionId"],
+                        "participante": o["participante"],
+                        "nombreParticipante": o["nombreParticipante"],
+                        "certificadoParticipacionId": None,
+                    }
+                    for o in plantilla.get("organizacion") or []
+                ],
+                "capacidad": sum(a["capacidadInstalacion"] for a in asignadas),
+                "version": 0,
+            }
+            evento["terminos"] = terminos_documento("evento", evento)
+            yield evento
+
+    # 🔹 Evaluaciones: un rechazo por evento en revisión; un rechazo y una aprobación por evento aprobado
+    def evaluaciones_generadas(self) -> Iterator[dict]:
+        plantillas_evaluacion = self.base["evaluacion"]
+        decisiones = {"registrado": [], "enRevision": ["rechazado"], "aprovado": ["rechazado", "aprobado"]}
+        for i, (evento_id, estado) in enumerate(self.eventos):
+            for j, decision in enumerate(decisiones[estado]):
+                plantilla = plantillas_evaluacion[(i + j) % len(plantillas_evaluacion)]
+                yield {
+                    "_id": ObjectId(),
+                    "estado": decision,
+                    "fechaEvaluacion": evento_id.generation_time.replace(tzinfo=None) + timedelta(days=j),
+                    "justificacion": plantilla.get("justificacion") if decision == "rechazado" else None,
+                    "actaAprovacionId": None,
+                    "eventoId": evento_id,
+                    "usuarioId": self.azar.choice(self.evaluadores) if self.evaluadores else 1,
+                    "version": 0,
+                }
+
+
+def lotes(documentos: Iterator[dict], tamano: int = TAMANO_LOTE) -> Iterator[List[dict]]:
+    lote = []
+    for documento in documentos:
+        lote.append(documento)
+        if len(lote) == tamano:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+# ✅ Vaciar y poblar la base de datos del benchmark; devuelve cuántos documentos hay por colección
+async def sembrar(base: AsyncIOMotorDatabase, generador: Generador) -> Dict[str, int]:
+    colecciones = {
+        "usuario": generador.usuarios(),
+        "instalacion": generador.instalaciones_generadas(),
+        "organizacion": ({**o, "terminos": terminos_documento("organizacion", o)} for o in generador.base["organizacion"]),
+        "facultad": iter(generador.base["facultad"]),
+        "evento": generador.eventos_generados(),
+        "evaluacion": generador.evaluaciones_generadas(),
+    }
+    conteo = {}
+    for nombre, documentos in colecciones.items():
+        await base[nombre].delete_many({})
+        conteo[nombre] = 0
+        for lote in lotes(documentos):
+            await base[nombre].insert_many(lote, ordered=False)
+            conteo[nombre] += len(lote)
+
+    # Reservas y mapas de ocupación derivados de los eventos, como en producción
+    conteo["reserva"] = await reconstruir_reservas()
+    return conteo
@@ -0,0 +1,58 @@
+"""Calcula y guarda el campo `terminos` (palabras normalizadas para GET /buscar) en eventos y organizaciones:
+
+- evento.terminos        -> nombre y organizacion[].nombreParticipante
+- organizacion.terminos  -> nombre y sectorEconomico
+
+La API lo mantiene al crear y modificar eventos; este script es para los documentos que ya existían
+o que se insertaron por fuera de la API (por ejemplo, con los scripts de `BaseDatos y Inserts`).
+Sin --todas solo procesa los documentos que aún no tienen `terminos`.
+
+Uso (desde la carpeta BACKEND API):
+    python -m scripts.indexar_busqueda [--todas]
+"""
+import argparse
+import asyncio
+
+from pymongo import UpdateOne
+
+from app.db.mongodb import connect_to_mongo, close_mongo_connection
+from app.core.busqueda import CAMPOS_BUSQUEDA, terminos_documento
+from app.crud.busqueda_crud import COLECCIONES_BUSQUEDA
+
+TAMANO_LOTE = 1000
+
+
+async def indexar_coleccion(coleccion: str, todas: bool) -> int:
+    modelo, _ = COLECCIONES_BUSQUEDA[coleccion]
+    motor = modelo.get_motor_collection()
+    filtro = {} if todas else {"terminos": {"$exists": False}}
+
+    total, operaciones = 0, []
+    async for documento in motor.find(filtro, {ruta: 1 for ruta in CAMPOS_BUSQUEDA[coleccion]}):
+        operaciones.append(UpdateOne(
+            {"_id": documento["_id"]},
+            {"$set": {"terminos": terminos_documento(coleccion, documento)}}
+        ))
+        if len(operaciones) == TAMANO_LOTE:
+            total += (await motor.bulk_write(operaciones, ordered=False)).modified_count
+            operaciones = []
+
+    if operaciones:
+        total += (await motor.bulk_write(operaciones, ordered=False)).modified_count
+    return total
+
+
+async def main(todas: bool):
+    await connect_to_mongo()
+    try:
+        for coleccion in COLECCIONES_BUSQUEDA:
+            total = await indexar_coleccion(coleccion, todas)
+            print(f"✅ {coleccion}: {total} documentos actualizados.")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m scripts.indexar_busqueda")
+    parser.add_argument("--todas", action="store_true", help="Recalcular también los documentos que ya tienen términos")
+    asyncio.run(main(parser.parse_args().todas))
@@ -0,0 +1,86 @@
+"""Mueve a GridFS los PDFs que todavía están embebidos en los documentos.
+
+- evento.organizador[].avalPDF                    -> organizador[].avalPDFId
+- evento.organizacion[].certificadoParticipacion  -> organizacion[].certificadoParticipacionId
+- evaluacion.actaAprovacion                       -> actaAprovacionId
+
+Se puede ejecutar varias veces: solo procesa los documentos que aún tienen binarios.
+
+Uso (desde la carpeta BACKEND API):
+    python -m scripts.migrar_adjuntos_gridfs
+"""
+import asyncio
+
+from app.db.mongodb import connect_to_mongo, close_mongo_connection
+from app.crud.adjunto_crud import guardar_adjunto
+from app.models.eventos import EventoModel
+from app.models.evaluaciones import EvaluacionModel
+
+
+async def migrar_arreglo(evento: dict, arreglo: str, clave: str, binario: str, referencia: str, prefijo: str) -> bool:
+    cambiado = False
+    for subdocumento in evento.get(arreglo) or []:
+        contenido = subdocumento.pop(binario, None)
+        if contenido is None:
+            continue
+        subdocumento[referencia] = await guardar_adjunto(
+            bytes(contenido),
+            f"{prefijo}-{evento['_id']}-{subdocumento[clave]}.pdf",
+            {"eventoId": evento["_id"], clave: subdocumento[clave]}
+        )
+        cambiado = True
+    return cambiado
+
+
+async def migrar_eventos() -> int:
+    coleccion = EventoModel.get_motor_collection()
+    filtro = {"$or": [
+        {"organizador.avalPDF": {"$exists": True}},
+        {"organizacion.certificadoParticipacion": {"$exists": True}},
+    ]}
+
+    total = 0
+    async for evento in coleccion.find(filtro, {"organizador": 1, "organizacion": 1}):
+        avales = await migrar_arreglo(evento, "organizador", "usuarioId", "avalPDF", "avalPDFId", "aval")
+        certificados = await migrar_arreglo(
+            evento, "organizacion", "organizacionId", "certificadoParticipacion", "certificadoParticipacionId", "certificado"
+        )
+        if avales or certificados:
+            await coleccion.update_one(
+                {"_id": evento["_id"]},
+                {"$set": {"organizador": evento.get("organizador") or [], "organizacion": evento.get("organizacion")}}
+            )
+            total += 1
+    return total
+
+
+async def migrar_evaluaciones() -> int:
+    coleccion = EvaluacionModel.get_motor_collection()
+
+    total = 0
+    async for evaluacion in coleccion.find({"actaAprovacion": {"$exists": True}}, {"actaAprovacion": 1}):
+        cambios = {"$unset": {"actaAprovacion": ""}}
+        if evaluacion["actaAprovacion"] is not None:
+            acta_id = await guardar_adjunto(
+                bytes(evaluacion["actaAprovacion"]),
+                f"acta-{evaluacion['_id']}.pdf",
+                {"evaluacionId": evaluacion["_id"]}
+            )
+            cambios["$set"] = {"actaAprovacionId": acta_id}
+        await coleccion.update_one({"_id": evaluacion["_id"]}, cambios)
+        total += 1
+    return total
+
+
+async def main():
+    await connect_to_mongo()
+    try:
+        eventos = await migrar_eventos()
+        evaluaciones = await migrar_evaluaciones()
+        print(f"✅ {eventos} eventos y {evaluaciones} evaluaciones migrados a GridFS.")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
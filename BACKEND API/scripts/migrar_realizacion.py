@@ -0,0 +1,66 @@
+"""Calcula y guarda en cada evento los campos de horario de `realizacion`:
+
+- realizacion.inicio / realizacion.fin                -> instantes UTC (fecha + horaInicio/horaFin en ZONA_HORARIA)
+- realizacion.inicioMinutos / realizacion.finMinutos  -> minutos desde la medianoche local
+
+Se puede ejecutar varias veces: sin --todas solo procesa los eventos que aún no tienen `inicio`.
+Con --todas se recalculan todos (por ejemplo, después de cambiar ZONA_HORARIA).
+
+Uso (desde la carpeta BACKEND API):
+    python -m scripts.migrar_realizacion [--todas]
+"""
+import argparse
+import asyncio
+from typing import List, Tuple
+
+from pymongo import UpdateOne
+
+from app.db.mongodb import connect_to_mongo, close_mongo_connection
+from app.core.horario import calcular_intervalo
+from app.models.eventos import EventoModel
+
+TAMANO_LOTE = 1000
+
+
+async def migrar_eventos(todas: bool) -> Tuple[int, List]:
+    coleccion = EventoModel.get_motor_collection()
+    filtro = {} if todas else {"realizacion.inicio": {"$exists": False}}
+
+    total, invalidos, operaciones = 0, [], []
+    async for evento in coleccion.find(filtro, {"realizacion.fecha": 1, "realizacion.horaInicio": 1, "realizacion.horaFin": 1}):
+        realizacion = evento.get("realizacion") or {}
+        intervalo = None
+        if realizacion.get("fecha"):
+            intervalo = calcular_intervalo(realizacion["fecha"], realizacion.get("horaInicio"), realizacion.get("horaFin"))
+        if not intervalo:
+            invalidos.append(evento["_id"])
+            continue
+
+        operaciones.append(UpdateOne(
+            {"_id": evento["_id"]},
+            {"$set": {f"realizacion.{campo}": valor for campo, valor in intervalo.items()}}
+        ))
+        if len(operaciones) == TAMANO_LOTE:
+            total += (await coleccion.bulk_write(operaciones, ordered=False)).modified_count
+            operaciones = []
+
+    if operaciones:
+        total += (await coleccion.bulk_write(operaciones, ordered=False)).modified_count
+    return total, invalidos
+
+
+async def main(todas: bool):
+    await connect_to_mongo()
+    try:
+        total, invalidos = await migrar_eventos(todas)
+        print(f"✅ {total} eventos actualizados.")
+        if invalidos:
+            print(f"⚠️ {len(invalidos)} eventos sin fecha u hora válida (HH:MM): {', '.join(map(str, invalidos[:20]))}")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m scripts.migrar_realizacion")
+    parser.add_argument("--todas", action="store_true", help="Recalcular también los eventos ya migrados")
+    asyncio.run(main(parser.parse_args().todas))
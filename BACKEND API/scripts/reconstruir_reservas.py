@@ -0,0 +1,26 @@
+"""Reconstruye la colección `reserva` a partir de los eventos ya registrados,
+y con ella los mapas de ocupación diarios (colección `ocupacion`).
+
+Uso (desde la carpeta BACKEND API):
+    python -m scripts.reconstruir_reservas
+"""
+import asyncio
+import logging
+
+from app.db.mongodb import connect_to_mongo, close_mongo_connection
+from app.crud.reserva_crud import reconstruir_reservas
+
+
+async def main():
+    await connect_to_mongo()
+    try:
+        total = await reconstruir_reservas()
+        print(f"✅ {total} reservas creadas.")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    # Los eventos omitidos se informan con logging.warning
+    logging.basicConfig(level=logging.WARNING, format="⚠️ %(message)s")
+    asyncio.run(main())
@@ -0,0 +1,41 @@
+"""Trabajador de la cola de trabajos en segundo plano (colección `trabajo`), fuera del proceso de la API.
+
+Procesa los PDFs enviados en línea al crear o actualizar eventos: los valida, calcula su SHA-256
+y los asocia al evento. Para no procesarlos también en la API, configure TRABAJOS_EN_PROCESO=false.
+Se pueden ejecutar varios trabajadores a la vez: cada trabajo lo toma uno solo.
+
+Uso (desde la carpeta BACKEND API):
+    python -m scripts.trabajador                   # hasta Ctrl+C
+    python -m scripts.trabajador --hasta-vaciar    # procesa lo pendiente y termina (cron)
+"""
+import argparse
+import asyncio
+
+from app.db.mongodb import connect_to_mongo, close_mongo_connection
+from app.services.trabajo_service import cola_trabajos
+# Registra los manejadores de los trabajos de eventos
+import app.crud.evento_crud  # noqa: F401
+
+
+async def main(hasta_vaciar: bool, concurrencia: int | None):
+    await connect_to_mongo()
+    try:
+        if hasta_vaciar:
+            total = await cola_trabajos.procesar_pendientes()
+            print(f"✅ {total} trabajos procesados.")
+        else:
+            print(f"👷 Trabajador {cola_trabajos.nombre} esperando trabajos...")
+            await cola_trabajos.trabajar(concurrencia)
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m scripts.trabajador")
+    parser.add_argument("--hasta-vaciar", action="store_true", help="Procesar los trabajos pendientes y terminar")
+    parser.add_argument("--concurrencia", type=int, help="Trabajos a la vez (por defecto TRABAJOS_CONCURRENCIA)")
+    argumentos = parser.parse_args()
+    try:
+        asyncio.run(main(argumentos.hasta_vaciar, argumentos.concurrencia))
+    except KeyboardInterrupt:
+        print("🛑 Trabajador detenido.")